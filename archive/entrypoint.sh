@@ -6,6 +6,7 @@ echo "Running database migrations..."
 python manage.py migrate --noinput
 
 # Start the application using the PORT environment variable provided by Cloud Run.
-# Default to 8000 if PORT is not set.
+# Default to 8000 if PORT is not set. Workers, preloading and the warm-up hooks
+# are configured in gunicorn.conf.py.
 echo "Starting Gunicorn server on port ${PORT:-8000}..."
-exec gunicorn expense_tracker.wsgi:application --bind 0.0.0.0:${PORT:-8000} --workers 4 --worker-class sync --timeout 120
+exec gunicorn --config gunicorn.conf.py
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
 from django.contrib.sessions.models import Session
@@ -8,6 +9,32 @@ from django.utils.safestring import mark_safe
 from .models import Expense
 
 
+def _session_data(session):
+    """Decoded session data, decoded once per Session object."""
+    if not hasattr(session, '_decoded_data'):
+        session._decoded_data = session.get_decoded()
+    return session._decoded_data
+
+
+class SessionChangeList(ChangeList):
+    """Change list that loads the users of a page of sessions in one query."""
+
+    def get_results(self, request):
+        super().get_results(request)
+        user_ids = set()
+        for session in self.result_list:
+            try:
+                user_id = _session_data(session).get('_auth_user_id')
+                if user_id:
+                    user_ids.add(int(user_id))
+            except Exception:
+                # Shown as "Unable to decode" by the columns
+                continue
+        users = User.objects.only('id', 'email', 'username').in_bulk(user_ids)
+        for session in self.result_list:
+            session._session_users = users
+
+
 @admin.register(Session)
 class SessionAdmin(admin.ModelAdmin):
     """Session admin with user information display."""
@@ -23,23 +50,30 @@ class SessionAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+    def get_changelist(self, request, **kwargs):
+        return SessionChangeList
+
     def get_user_email(self, obj):
         """Extract and display user email from session data."""
         try:
-            session_data = obj.get_decoded()
+            session_data = _session_data(obj)
             user_id = session_data.get('_auth_user_id')
 
             if user_id:
-                try:
-                    user = User.objects.get(pk=user_id)
-                    url = f"/admin/auth/user/{user.id}/change/"
-                    return format_html(
-                        '<a href="{}">{}</a>',
-                        url,
-                        user.email or user.username,
-                    )
-                except User.DoesNotExist:
+                users = getattr(obj, '_session_users', None)
+                if users is not None:
+                    # Loaded for the whole page by SessionChangeList
+                    user = users.get(int(user_id))
+                else:
+                    user = User.objects.filter(pk=user_id).first()
+                if user is None:
                     return "(deleted)"
+                url = f"/admin/auth/user/{user.id}/change/"
+                return format_html(
+                    '<a href="{}">{}</a>',
+                    url,
+                    user.email or user.username,
+                )
             return "-"
         except Exception:
             return "Unable to decode"
@@ -49,7 +83,7 @@ class SessionAdmin(admin.ModelAdmin):
     def get_user_id(self, obj):
         """Extract and display user ID from session data."""
         try:
-            session_data = obj.get_decoded()
+            session_data = _session_data(obj)
             user_id = session_data.get('_auth_user_id')
 
             if user_id:
@@ -77,7 +111,7 @@ class SessionAdmin(admin.ModelAdmin):
     def get_decoded_session(self, obj):
         """Show decoded session data in readable format."""
         try:
-            session_data = obj.get_decoded()
+            session_data = _session_data(obj)
             formatted = "<br>".join(
                 f"<strong>{k}:</strong> {v}" for k, v in session_data.items()
             )
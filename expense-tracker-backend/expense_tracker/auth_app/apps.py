@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_app'
+
+    def ready(self):
+        from django.conf import settings
+
+        from utils import metrics
+
+        from . import signals  # noqa: F401
+
+        metrics.configure(
+            getattr(settings, 'METRICS_ENABLED', False),
+            getattr(settings, 'METRICS_DIR', '') or None,
+        )
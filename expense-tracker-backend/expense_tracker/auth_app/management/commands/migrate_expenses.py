@@ -0,0 +1,473 @@
+"""
+Copy expenses between the ORM database and DynamoDB.
+
+    python manage.py migrate_expenses --from orm --to dynamodb
+    python manage.py migrate_expenses --from dynamodb --to orm --workers 8 --max-rate 1000
+
+Rows are streamed rather than loaded: the ORM side with iterator() (a
+server-side cursor on PostgreSQL), DynamoDB with a parallel Scan of one
+segment per worker. Writes go through bulk_create and BatchWriteItem.
+Progress is saved to the --checkpoint file after every batch, so an
+interrupted run continues where it stopped with --resume. Afterwards both
+sides are compared per user by expense count and a checksum of the
+expenses' contents.
+
+Writes to DynamoDB are idempotent, as items are keyed by the ORM id. Pages
+written to the ORM get new ids, each page in one transaction; on resume,
+the first page of each scan segment is skipped if it is already present.
+Expenses only move between stores: users must already exist in the target
+database, and expenses of unknown users are skipped.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, transaction
+
+from auth_app.models import Expense
+
+STORES = ('orm', 'dynamodb')
+
+# Fields copied between stores, in the order used for checksums
+CONTENT_FIELDS = ('amount', 'category', 'description', 'timestamp', 'receipt_url')
+
+# Rows of one user summed into a checksum wrap at 64 bits
+_CHECKSUM_MODULUS = 2 ** 64
+
+# (expense count, checksum) per user id
+Checksums = Dict[int, Tuple[int, int]]
+
+
+def _item_timestamp(value) -> str:
+    """Normalize a datetime or stored string to the naive UTC ISO 8601 the DynamoDB items use."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _orm_timestamp(value: str) -> datetime:
+    """Parse a stored DynamoDB timestamp (naive UTC) into an aware datetime."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def row_digest(row: Dict) -> int:
+    """64-bit digest of an expense's contents, independent of the store it was read from."""
+    amount = Decimal(str(row['amount'])).quantize(Decimal('0.01'))
+    content = '\x1f'.join((
+        str(row['user_id']),
+        str(amount),
+        row['category'],
+        row['description'] or '',
+        _item_timestamp(row['timestamp']),
+        row['receipt_url'] or '',
+    ))
+    return int.from_bytes(hashlib.sha256(content.encode()).digest()[:8], 'big')
+
+
+def add_checksum(checksums: Checksums, row: Dict) -> None:
+    """Fold a row into its user's (count, checksum); order-independent, unlike a running hash."""
+    count, checksum = checksums.get(row['user_id'], (0, 0))
+    checksums[row['user_id']] = (count + 1, (checksum + row_digest(row)) % _CHECKSUM_MODULUS)
+
+
+class RateLimiter:
+    """Spread batches so all workers together write at most ``rate`` rows per second."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self, rows: int) -> None:
+        """Block until the caller may write ``rows`` rows."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + rows * self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Checkpoint:
+    """Migration progress in a JSON file, rewritten atomically after every batch."""
+
+    def __init__(self, path: Optional[str], source: str, target: str):
+        self.path = path
+        self.state = {'source': source, 'target': target, 'copied': 0, 'skipped': 0}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Continue from the saved state; it must be for the same direction."""
+        if not self.path or not os.path.exists(self.path):
+            raise CommandError('--resume needs an existing --checkpoint file')
+        with open(self.path) as f:
+            state = json.load(f)
+        if (state.get('source'), state.get('target')) != (self.state['source'], self.state['target']):
+            raise CommandError(
+                f"Checkpoint {self.path} is for {state.get('source')} -> {state.get('target')}"
+            )
+        self.state = state
+
+    def update(self, copied: int, skipped: int, segment: Optional[Dict] = None, **progress) -> Dict:
+        """
+        Record a finished batch and save; returns a snapshot of the state.
+
+        ``segment`` maps one scan segment to its new position and is merged
+        into the saved segments, which several workers update concurrently.
+        """
+        with self._lock:
+            self.state['copied'] += copied
+            self.state['skipped'] += skipped
+            self.state.update(progress)
+            if segment:
+                self.state.setdefault('segments', {}).update(segment)
+            if self.path:
+                temporary = f'{self.path}.tmp'
+                with open(temporary, 'w') as f:
+                    json.dump(self.state, f)
+                os.replace(temporary, self.path)
+            return dict(self.state)
+
+
+class OrmExpenseStore:
+    """Expenses in the Django database."""
+
+    fields = ('id', 'user_id', 'amount', 'category', 'description', 'timestamp', 'receipt_url', 'updated_at')
+
+    def __init__(self):
+        # SQLite takes one writer at a time; queue workers here instead of failing on the file lock
+        self._write_lock = threading.Lock() if connection.vendor == 'sqlite' else nullcontext()
+
+    def _rows(self, queryset, batch_size: int) -> Iterator[Dict]:
+        for values in queryset.values_list(*self.fields).iterator(chunk_size=batch_size):
+            row = dict(zip(self.fields, values))
+            row['expense_id'] = str(row.pop('id'))
+            yield row
+
+    def count(self) -> int:
+        return Expense.objects.filter(user__isnull=False).count()
+
+    def read_batches(self, after_pk: int, batch_size: int) -> Iterator[List[Dict]]:
+        """Stream expenses with an owner, in primary-key order, after ``after_pk``."""
+        queryset = Expense.objects.filter(user__isnull=False, pk__gt=after_pk).order_by('pk')
+        batch = []
+        for row in self._rows(queryset, batch_size):
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _already_written(self, rows: List[Dict]) -> bool:
+        """Whether every row (counting duplicates) is already in the table."""
+        existing = Counter(
+            row_digest(dict(zip(self.fields, values)))
+            for values in Expense.objects.filter(
+                user_id__in={row['user_id'] for row in rows},
+                timestamp__in={_orm_timestamp(row['timestamp']) for row in rows},
+            ).values_list(*self.fields)
+        )
+        return not Counter(map(row_digest, rows)) - existing
+
+    def write(self, rows: List[Dict], recheck: bool = False) -> Tuple[int, int]:
+        """
+        Insert a page in one transaction; returns (written, skipped for unknown users).
+
+        With recheck, a page that is already fully present is not inserted
+        again: after a stop between its commit and the checkpoint save, the
+        resumed scan reads that page a second time.
+        """
+        with self._write_lock:
+            return self._write(rows, recheck)
+
+    def _write(self, rows: List[Dict], recheck: bool) -> Tuple[int, int]:
+        users = set(User.objects.filter(pk__in={row['user_id'] for row in rows}).values_list('pk', flat=True))
+        known = [row for row in rows if row['user_id'] in users]
+        if not known or (recheck and self._already_written(known)):
+            return 0, len(rows) - len(known)
+
+        expenses = [
+            Expense(
+                user_id=row['user_id'],
+                amount=row['amount'],
+                category=row['category'],
+                description=row['description'],
+                receipt_url=row['receipt_url'],
+                timestamp=_orm_timestamp(row['timestamp']),
+                updated_at=_orm_timestamp(row.get('updated_at') or row['timestamp']),
+            )
+            for row in known
+        ]
+        with transaction.atomic():
+            # bulk_create overwrites the auto_now(_add) timestamps; restore the source's
+            timestamps = [(expense.timestamp, expense.updated_at) for expense in expenses]
+            Expense.objects.bulk_create(expenses)
+            for expense, (timestamp, updated_at) in zip(expenses, timestamps):
+                expense.timestamp, expense.updated_at = timestamp, updated_at
+            Expense.objects.bulk_update(expenses, ['timestamp', 'updated_at'])
+        return len(expenses), len(rows) - len(known)
+
+    def checksums(self, batch_size: int) -> Checksums:
+        checksums: Checksums = {}
+        for row in self._rows(Expense.objects.filter(user__isnull=False), batch_size):
+            add_checksum(checksums, row)
+        return checksums
+
+
+class DynamoDBExpenseStore:
+    """Expenses in the DynamoDB table used by DynamoDBExpenseRepository."""
+
+    def __init__(self, table_name: str, endpoint_url: Optional[str], region: Optional[str]):
+        self.table_name = table_name
+        self.aws = {
+            'region_name': region,
+            'aws_access_key_id': getattr(settings, 'AWS_ACCESS_KEY_ID', None),
+            'aws_secret_access_key': getattr(settings, 'AWS_SECRET_ACCESS_KEY', None),
+            'endpoint_url': endpoint_url,
+        }
+
+    @property
+    def table(self):
+        """The calling thread's Table; boto3 resources are not thread-safe."""
+        from cloud_app.implementations.utils.aws_clients import client_provider
+
+        return client_provider.get_resource('dynamodb', **self.aws).Table(self.table_name)
+
+    @staticmethod
+    def _row(item: Dict) -> Optional[Dict]:
+        if not str(item.get('user_id', '')).isdigit():
+            return None
+        row = {field: item.get(field) for field in CONTENT_FIELDS}
+        row['expense_id'] = item['expense_id']
+        row['user_id'] = int(item['user_id'])
+        row['updated_at'] = item.get('updated_at')
+        return row
+
+    def count(self) -> int:
+        # Refreshed by DynamoDB about every six hours; good enough for progress
+        return self.table.item_count
+
+    def scan_segment(
+        self, segment: int, total_segments: int, start_key: Optional[Dict], batch_size: int
+    ) -> Iterator[Tuple[List[Dict], int, Optional[Dict]]]:
+        """
+        Stream one parallel Scan segment page by page.
+
+        Yields (rows, items without a numeric user_id, LastEvaluatedKey);
+        the key is None on the segment's last page.
+        """
+        kwargs = {'Segment': segment, 'TotalSegments': total_segments, 'Limit': batch_size}
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        while True:
+            response = self.table.scan(**kwargs)
+            items = response.get('Items', [])
+            rows = [row for row in map(self._row, items) if row is not None]
+            last_key = response.get('LastEvaluatedKey')
+            yield rows, len(items) - len(rows), last_key
+            if last_key is None:
+                return
+            kwargs['ExclusiveStartKey'] = last_key
+
+    def write(self, rows: List[Dict], recheck: bool = False) -> Tuple[int, int]:
+        """Put rows keyed by their ORM id, in BatchWriteItem requests of 25; rewrites are harmless."""
+        with self.table.batch_writer(overwrite_by_pkeys=['expense_id']) as batch:
+            for row in rows:
+                batch.put_item(Item={
+                    'expense_id': row['expense_id'],
+                    'user_id': str(row['user_id']),
+                    'amount': Decimal(str(row['amount'])),
+                    'category': row['category'],
+                    'description': row['description'] or '',
+                    'timestamp': _item_timestamp(row['timestamp']),
+                    'receipt_url': row['receipt_url'],
+                    'updated_at': _item_timestamp(row['updated_at'] or row['timestamp']),
+                })
+        return len(rows), 0
+
+    def checksums(self, batch_size: int) -> Checksums:
+        checksums: Checksums = {}
+        for rows, _, _ in self.scan_segment(0, 1, None, batch_size):
+            for row in rows:
+                add_checksum(checksums, row)
+        return checksums
+
+
+class Command(BaseCommand):
+    help = 'Copy expenses between the ORM database and DynamoDB, resumably, then verify both sides.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='source', choices=STORES, required=True)
+        parser.add_argument('--to', dest='target', choices=STORES, required=True)
+        parser.add_argument('--batch-size', type=int, default=500, help='rows read and written per batch')
+        parser.add_argument('--workers', type=int, default=4, help='concurrent writers / scan segments')
+        parser.add_argument('--max-rate', type=float, help='rows per second across all workers')
+        parser.add_argument('--checkpoint', help='JSON file recording progress after every batch')
+        parser.add_argument('--resume', action='store_true', help='continue from --checkpoint')
+        parser.add_argument('--verify-only', action='store_true', help='only compare the two sides')
+        parser.add_argument('--no-verify', action='store_true', help='skip the comparison afterwards')
+        parser.add_argument('--dynamodb-table', default=getattr(settings, 'DYNAMODB_TABLE_NAME', None))
+        parser.add_argument('--dynamodb-endpoint', default=getattr(settings, 'DYNAMODB_ENDPOINT_URL', None))
+        parser.add_argument('--aws-region', default=getattr(settings, 'AWS_REGION', None))
+
+    def handle(self, *args, **options):
+        if options['source'] == options['target']:
+            raise CommandError('--from and --to must differ')
+        if not options['dynamodb_table']:
+            raise CommandError('Set --dynamodb-table or DYNAMODB_TABLE_NAME')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+
+        dynamodb = DynamoDBExpenseStore(
+            options['dynamodb_table'], options['dynamodb_endpoint'], options['aws_region']
+        )
+        stores = {'orm': OrmExpenseStore(), 'dynamodb': dynamodb}
+        source, target = stores[options['source']], stores[options['target']]
+
+        if not options['verify_only']:
+            checkpoint = Checkpoint(options['checkpoint'], options['source'], options['target'])
+            if options['resume']:
+                checkpoint.load()
+                self.stdout.write(
+                    f"Resuming from {options['checkpoint']} ({checkpoint.state['copied']} rows copied)"
+                )
+            self.limiter = RateLimiter(options['max_rate'])
+            self.started = time.perf_counter()
+            self.start_copied = checkpoint.state['copied']
+            self.total = source.count()
+
+            if options['source'] == 'orm':
+                self._copy_from_orm(source, target, checkpoint, options)
+            else:
+                self._copy_from_dynamodb(source, target, checkpoint, options)
+            state = checkpoint.state
+            self.stdout.write(f"Copied {state['copied']} expenses, skipped {state['skipped']}")
+            if state['skipped'] and options['target'] == 'orm':
+                self.stdout.write(self.style.WARNING('Skipped expenses belong to users missing from the database'))
+
+        if options['verify_only'] or not options['no_verify']:
+            self._verify(source, target, options['batch_size'])
+
+    def _write(self, target, rows: List[Dict], recheck: bool = False) -> Tuple[int, int]:
+        self.limiter.acquire(len(rows))
+        try:
+            return target.write(rows, recheck)
+        finally:
+            close_old_connections()
+
+    def _progress(self, state: Dict) -> None:
+        copied = state['copied'] - self.start_copied
+        rate = copied / (time.perf_counter() - self.started)
+        self.stdout.write(f"  {state['copied']}/~{self.total} rows, {rate:,.0f} rows/s")
+
+    def _copy_from_orm(self, source: OrmExpenseStore, target, checkpoint: Checkpoint, options) -> None:
+        """
+        Stream ORM rows in this thread and write batches from a pool.
+
+        Batches can finish out of order, so the checkpoint records the
+        highest primary key below which every batch has been written.
+        """
+        after_pk = checkpoint.state.get('last_pk', 0)
+        pending = {}  # sequence -> (last pk, finished?)
+        next_to_commit = [0]
+
+        def finish(sequence: int, written: int, skipped: int) -> None:
+            with lock:
+                pending[sequence] = (pending[sequence][0], True)
+                last_pk = None
+                while next_to_commit[0] in pending and pending[next_to_commit[0]][1]:
+                    last_pk = pending.pop(next_to_commit[0])[0]
+                    next_to_commit[0] += 1
+                # Saved under the lock so a later watermark is never overwritten by an earlier one
+                progress = {'last_pk': last_pk} if last_pk is not None else {}
+                state = checkpoint.update(written, skipped, **progress)
+            self._progress(state)
+
+        lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            running = set()
+            for sequence, batch in enumerate(source.read_batches(after_pk, options['batch_size'])):
+                with lock:
+                    pending[sequence] = (int(batch[-1]['expense_id']), False)
+
+                def copy(sequence=sequence, batch=batch):
+                    finish(sequence, *self._write(target, batch))
+
+                running.add(executor.submit(copy))
+                # Bound memory: read ahead at most one batch per worker
+                if len(running) >= options['workers'] * 2:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    self._raise_failures(done, executor)
+            done, _ = wait(running)
+            self._raise_failures(done, executor)
+
+    def _copy_from_dynamodb(self, source: DynamoDBExpenseStore, target, checkpoint: Checkpoint, options) -> None:
+        """Scan one segment per worker, each writing its own pages and recording its position."""
+        workers = options['workers']
+        # Scan segments are fixed by their total, so a resumed run must keep it
+        if checkpoint.state.setdefault('total_segments', workers) != workers:
+            raise CommandError(f"The checkpoint was written with --workers {checkpoint.state['total_segments']}")
+        segments = dict(checkpoint.state.get('segments', {}))
+
+        def copy_segment(segment: int) -> None:
+            position = segments.get(str(segment), {})
+            if position.get('done'):
+                return
+            recheck = options['resume']
+            for rows, unreadable, last_key in source.scan_segment(
+                segment, workers, position.get('start_key'), options['batch_size']
+            ):
+                written, skipped = self._write(target, rows, recheck) if rows else (0, 0)
+                recheck = False
+                self._progress(checkpoint.update(written, skipped + unreadable, segment={
+                    str(segment): {'start_key': last_key, 'done': last_key is None},
+                }))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(copy_segment, segment) for segment in range(workers)]
+            done, _ = wait(futures)
+            self._raise_failures(done, executor)
+
+    @staticmethod
+    def _raise_failures(done, executor) -> None:
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise CommandError(f'Batch failed; rerun with --resume to continue: {error}') from error
+
+    def _verify(self, source, target, batch_size: int) -> None:
+        """Compare per-user counts and content checksums; raise if any user differs."""
+        expected = source.checksums(batch_size)
+        actual = target.checksums(batch_size)
+        mismatched = sorted(
+            user_id for user_id in expected.keys() | actual.keys()
+            if expected.get(user_id) != actual.get(user_id)
+        )
+        for user_id in mismatched:
+            self.stdout.write(
+                f'  user {user_id}: {expected.get(user_id, (0, 0))[0]} in source, '
+                f'{actual.get(user_id, (0, 0))[0]} in target (checksums differ)'
+            )
+        if mismatched:
+            raise CommandError(f'{len(mismatched)} user(s) differ between source and target')
+        rows = sum(count for count, _ in expected.values())
+        self.stdout.write(self.style.SUCCESS(f'Verified {rows} expenses for {len(expected)} users'))
@@ -0,0 +1,44 @@
+"""
+Delete expense tombstones older than the sync retention.
+
+    python manage.py purge_tombstones
+    python manage.py purge_tombstones --days 60 --batch-size 5000
+
+Run it periodically (cron or a scheduled task). The retention defaults to
+SYNC_TOMBSTONE_RETENTION_DAYS, the same window decode_sync_token enforces, so
+no accepted sync token can need a purged tombstone. Rows are deleted in
+batches to keep each transaction short.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.models import ExpenseTombstone
+from auth_app.services.sync_service import tombstone_retention
+
+
+class Command(BaseCommand):
+    help = 'Delete expense tombstones older than the sync retention.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='retention in days (default SYNC_TOMBSTONE_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='rows deleted per statement')
+
+    def handle(self, *args, **options):
+        retention = timedelta(days=options['days']) if options['days'] is not None else tombstone_retention()
+        if retention < timedelta(0) or options['batch_size'] < 1:
+            raise CommandError('--days must not be negative and --batch-size must be positive')
+
+        cutoff = datetime.now(timezone.utc) - retention
+        expired = ExpenseTombstone.objects.filter(deleted_at__lt=cutoff)
+        purged = 0
+        while True:
+            batch = list(expired.values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            purged += ExpenseTombstone.objects.filter(pk__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged} tombstones deleted before {cutoff.isoformat()}'
+        ))
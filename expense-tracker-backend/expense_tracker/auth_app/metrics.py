@@ -0,0 +1,48 @@
+"""Application metrics exposed at /api/metrics/ (see utils.metrics)."""
+
+from utils.metrics import Counter, Histogram
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by URL name',
+    ['view', 'method'],
+)
+REQUESTS = Counter(
+    'http_requests',
+    'Requests by URL name and status code',
+    ['view', 'method', 'status'],
+)
+SERVICE_CALL_LATENCY = Histogram(
+    'service_call_duration_seconds',
+    'Expense repository, file storage and auth service call latency',
+    ['service', 'operation'],
+)
+AWS_CALL_LATENCY = Histogram(
+    'aws_call_duration_seconds',
+    'AWS API call latency including retries',
+    ['service', 'operation'],
+)
+AWS_CALL_ERRORS = Counter(
+    'aws_call_errors',
+    'AWS API calls that failed',
+    ['service', 'operation'],
+)
+DYNAMODB_CONSUMED_CAPACITY = Counter(
+    'dynamodb_consumed_capacity_units',
+    'DynamoDB capacity units consumed',
+    ['table', 'operation'],
+)
+S3_UPLOADED_BYTES = Counter(
+    's3_uploaded_bytes',
+    'Bytes uploaded to S3',
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests',
+    'Cache lookups by cache and result (hit or miss)',
+    ['cache', 'result'],
+)
+RATELIMIT_REJECTIONS = Counter(
+    'ratelimit_rejections',
+    'Requests rejected by django-ratelimit',
+    ['view'],
+)
@@ -0,0 +1,11 @@
+"""HTTP middleware for the expense tracker API."""
+
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware
+from .server_timing import ServerTimingMiddleware
+
+__all__ = [
+    'CompressionMiddleware',
+    'MetricsMiddleware',
+    'ServerTimingMiddleware',
+]
@@ -0,0 +1,207 @@
+"""Response compression with gzip, Brotli and Zstandard negotiation."""
+
+import gzip
+import zlib
+from typing import Dict, Optional, Sequence
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the installed packages
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed packages
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+DEFAULT_ENCODINGS = ('zstd', 'br', 'gzip')
+
+# Fast levels suited to per-request compression of dynamic JSON
+DEFAULT_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+# Responses smaller than this are sent as-is; headers would eat the savings
+DEFAULT_MIN_SIZE = 1024
+
+# Content type prefixes that are already compressed (receipt images, PDFs,
+# archives) or must reach the client unbuffered (server-sent events)
+DEFAULT_EXCLUDED_CONTENT_TYPES = (
+    'image/',
+    'video/',
+    'audio/',
+    'font/woff',
+    'application/pdf',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/zstd',
+    'application/octet-stream',
+    'text/event-stream',
+)
+
+
+def available_encodings() -> Sequence[str]:
+    """Encodings that can be produced with the installed libraries."""
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    preferred = getattr(settings, 'COMPRESSION_ENCODINGS', DEFAULT_ENCODINGS)
+    return [encoding for encoding in preferred if installed.get(encoding)]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Pick the response encoding for an Accept-Encoding header.
+
+    Returns:
+        The acceptable encoding with the highest q-value (ties go to the
+        earlier entry in encodings), or None to send the response as-is
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    """Compress a complete body."""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streams stay live."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == 'br':
+            self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress a chunk and flush it to a decodable boundary."""
+        if self.encoding == 'zstd':
+            return (
+                self._compressor.compress(chunk)
+                + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            )
+        if self.encoding == 'br':
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """End the compressed stream."""
+        if self.encoding == 'zstd':
+            return self._compressor.flush()
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses for clients that accept gzip, Brotli or Zstandard.
+
+    Settings:
+        COMPRESSION_ENCODINGS: Server preference order (default zstd, br, gzip)
+        COMPRESSION_LEVELS: Level per encoding
+        COMPRESSION_MIN_SIZE: Smallest body in bytes worth compressing
+        COMPRESSION_EXCLUDED_CONTENT_TYPES: Content type prefixes never compressed
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.encodings = available_encodings()
+        self.levels = {**DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        self.excluded_content_types = tuple(getattr(
+            settings, 'COMPRESSION_EXCLUDED_CONTENT_TYPES', DEFAULT_EXCLUDED_CONTENT_TYPES
+        ))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if content_type.startswith(self.excluded_content_types):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        # Don't compress bodies sent alongside new cookies (login, CSRF token):
+        # secrets next to reflected input are exposed to BREACH-style attacks
+        if response.cookies:
+            return response
+
+        # The representation depends on Accept-Encoding from here on
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            response.streaming_content = self._compress_stream(response, encoding, level)
+            # The compressed length isn't known in advance
+            del response['Content-Length']
+        else:
+            compressed = compress(encoding, response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed body is no longer byte-for-byte equal to the original
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _compress_stream(response, encoding: str, level: int):
+        compressor = StreamCompressor(encoding, level)
+        content = response.streaming_content
+
+        if response.is_async:
+            async def compressed():
+                async for chunk in content:
+                    yield compressor.compress(chunk)
+                yield compressor.finish()
+        else:
+            def compressed():
+                for chunk in content:
+                    yield compressor.compress(chunk)
+                yield compressor.finish()
+        return compressed()
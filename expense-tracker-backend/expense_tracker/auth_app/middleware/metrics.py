@@ -0,0 +1,63 @@
+"""Request latency and ratelimit metrics for /api/metrics/."""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django_ratelimit.exceptions import Ratelimited
+
+from utils import metrics
+
+from ..metrics import RATELIMIT_REJECTIONS, REQUEST_LATENCY, REQUESTS
+
+
+def _view_name(request) -> str:
+    """URL name of the matched route (the names in auth_app/urls.py)."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name or 'unnamed'
+
+
+class MetricsMiddleware:
+    """
+    Observe request latency per URL name and count ratelimit rejections.
+
+    Disabled unless settings.METRICS_ENABLED is true, in which case Django
+    drops it from the chain entirely.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _observe(self, request, response, start) -> None:
+        view = _view_name(request)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, view=view, method=request.method)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, Ratelimited):
+            RATELIMIT_REJECTIONS.inc(view=_view_name(request))
+        return None
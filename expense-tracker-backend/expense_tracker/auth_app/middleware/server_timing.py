@@ -0,0 +1,106 @@
+"""Per-request Server-Timing headers and timing log lines."""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from utils import perf
+
+logger = logging.getLogger(__name__)
+
+# Order of metrics in the header; anything else recorded follows
+METRIC_ORDER = ('db', 'repo', 'storage', 'auth', 'serialize')
+
+
+def _install_db_wrapper(connection, **kwargs) -> None:
+    if perf.db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(perf.db_execute_wrapper)
+
+
+def format_server_timing(timings: perf.RequestTimings, total_ms: float) -> str:
+    """Format collected timings as a Server-Timing header value."""
+    entries = []
+    for name, duration_ms, count in sorted(
+        timings.items(),
+        key=lambda item: METRIC_ORDER.index(item[0]) if item[0] in METRIC_ORDER else len(METRIC_ORDER),
+    ):
+        unit = 'queries' if name == 'db' else 'calls'
+        entries.append(f'{name};dur={duration_ms:.2f};desc="{count} {unit}"')
+    entries.append(f'total;dur={total_ms:.2f}')
+    return ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Time each request and report where the time went.
+
+    Reports database queries (count and time), calls into the expense
+    repository, file storage and auth service (the registry wraps them in
+    timing proxies when enabled), response serialization and the total, both
+    as a Server-Timing header and as a log line on the ``auth_app.middleware
+    .server_timing`` logger. Disabled unless settings.SERVER_TIMING is true,
+    in which case Django drops it from the chain entirely.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Time queries on this thread's open connections and every one opened later
+        for connection in connections.all(initialized_only=True):
+            _install_db_wrapper(connection)
+        connection_created.connect(_install_db_wrapper, dispatch_uid='server_timing_db_wrapper')
+
+    def _start(self):
+        return perf.start_request(), time.perf_counter()
+
+    def _finish(self, request, response, token, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        timings = perf.end_request(token)
+        response['Server-Timing'] = format_server_timing(timings, total_ms)
+        if logger.isEnabledFor(logging.INFO):
+            self._log(request, response, timings, total_ms)
+        return response
+
+    def _log(self, request, response, timings, total_ms):
+        metrics = {
+            f'{name}_ms': round(duration_ms, 2) for name, duration_ms, _ in timings.items()
+        }
+        metrics.update({f'{name}_calls': count for name, _, count in timings.items()})
+        metrics['total_ms'] = round(total_ms, 2)
+        logger.info(
+            f'{request.method} {request.path} {response.status_code} '
+            + ' '.join(f'{key}={value}' for key, value in metrics.items()),
+            extra={'timings': metrics, 'path': request.path, 'status': response.status_code},
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token, start = self._start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            perf.end_request(token)
+            raise
+        return self._finish(request, response, token, start)
+
+    async def __acall__(self, request):
+        token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            perf.end_request(token)
+            raise
+        return self._finish(request, response, token, start)
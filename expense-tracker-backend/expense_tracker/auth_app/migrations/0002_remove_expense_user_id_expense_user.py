@@ -4,47 +4,64 @@ import django.db.models.deletion
 from django.conf import settings
 from django.db import migrations, models
 
+from utils.batch_migration import run_in_batches
+
 
 def migrate_user_ids_to_foreign_key(apps, schema_editor):
     """Migrate existing user_id strings to User ForeignKey relationships."""
     Expense = apps.get_model('auth_app', 'Expense')
     User = apps.get_model('auth', 'User')
 
-    deleted_count = 0
-    migrated_count = 0
-
-    for expense in Expense.objects.all():
-        try:
-            # Try to convert user_id string to integer and find matching User
-            user_pk = int(expense.user_id)
+    def migrate_batch(expenses):
+        # One in_bulk lookup and one delete per batch instead of a get, save or delete per row
+        user_pks = {}
+        for expense in expenses:
             try:
-                user = User.objects.get(pk=user_pk)
-                expense.user = user
-                expense.save(update_fields=['user'])
-                migrated_count += 1
-            except User.DoesNotExist:
+                user_pks[expense.pk] = int(expense.user_id)
+            except (ValueError, TypeError):
+                pass
+        users = User.objects.in_bulk(set(user_pks.values()))
+
+        changed = []
+        orphaned = []
+        for expense in expenses:
+            if expense.pk not in user_pks:
+                # user_id is not a valid integer string - delete this orphaned expense
+                print(f"Warning: Deleting orphaned expense {expense.id} with invalid user_id='{expense.user_id}'")
+                orphaned.append(expense.pk)
+            elif user_pks[expense.pk] not in users:
                 # No matching user found - delete this orphaned expense
                 print(f"Warning: Deleting orphaned expense {expense.id} with user_id='{expense.user_id}' (user not found)")
-                expense.delete()
-                deleted_count += 1
-        except (ValueError, TypeError):
-            # user_id is not a valid integer string - delete this orphaned expense
-            print(f"Warning: Deleting orphaned expense {expense.id} with invalid user_id='{expense.user_id}'")
-            expense.delete()
-            deleted_count += 1
+                orphaned.append(expense.pk)
+            elif expense.user_id != user_pks[expense.pk]:
+                expense.user = users[user_pks[expense.pk]]
+                changed.append(expense)
+
+        # Rows whose column already holds the user's id need no write
+        if changed:
+            Expense.objects.bulk_update(changed, ['user'])
+        if orphaned:
+            Expense.objects.filter(pk__in=orphaned).delete()
+        return {'migrated': len(expenses) - len(orphaned), 'deleted': len(orphaned)}
+
+    totals = run_in_batches(Expense.objects.all(), migrate_batch, label='expenses')
 
     print("\nMigration summary:")
-    print(f"  Migrated: {migrated_count} expenses to User ForeignKey")
-    print(f"  Deleted: {deleted_count} orphaned expenses")
+    print(f"  Migrated: {totals['migrated']} expenses to User ForeignKey")
+    print(f"  Deleted: {totals['deleted']} orphaned expenses")
 
 
 def reverse_migrate(apps, schema_editor):
     """Reverse migration - restore user_id from ForeignKey if possible."""
     Expense = apps.get_model('auth_app', 'Expense')
 
-    for expense in Expense.objects.filter(user__isnull=False):
-        expense.user_id = str(expense.user.id)
-        expense.save(update_fields=['user_id'])
+    # The ForeignKey column already stores the id; rewrite it in bulk as the string it was
+    def restore_batch(expenses):
+        for expense in expenses:
+            expense.user_id = str(expense.user_id)
+        Expense.objects.bulk_update(expenses, ['user'])
+
+    run_in_batches(Expense.objects.filter(user__isnull=False), restore_batch, label='expenses')
 
 
 class Migration(migrations.Migration):
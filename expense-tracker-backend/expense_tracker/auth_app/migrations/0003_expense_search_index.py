@@ -0,0 +1,94 @@
+# Full-text search index over expense category and description
+
+from django.db import migrations
+
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+        category,
+        description,
+        content='expenses',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+# Keep the index in sync with the expenses table. SQLite drops these when a
+# later migration rebuilds the table, so such migrations re-create them.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO expenses_fts(rowid, category, description)
+        VALUES (new.id, new.category, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, category, description)
+        VALUES ('delete', old.id, old.category, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS expenses_fts_au
+    AFTER UPDATE OF category, description ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, category, description)
+        VALUES ('delete', old.id, old.category, old.description);
+        INSERT INTO expenses_fts(rowid, category, description)
+        VALUES (new.id, new.category, new.description);
+    END
+    """,
+]
+
+SQLITE_FORWARD = [
+    SQLITE_TABLE,
+    *SQLITE_TRIGGERS,
+    # Index rows that existed before this migration
+    "INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS expenses_fts_au',
+    'DROP TRIGGER IF EXISTS expenses_fts_ad',
+    'DROP TRIGGER IF EXISTS expenses_fts_ai',
+    'DROP TABLE IF EXISTS expenses_fts',
+]
+
+# Must match the expression used by SQLiteExpenseRepository.search so the
+# planner can use the index
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX IF NOT EXISTS expenses_search_vector_idx ON expenses
+    USING GIN (to_tsvector('english', coalesce(category, '') || ' ' || coalesce(description, '')))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS expenses_search_vector_idx',
+]
+
+
+def _run(schema_editor, statements_by_vendor):
+    statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Create the vendor-specific full-text index (no-op on other databases)."""
+    _run(schema_editor, {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the vendor-specific full-text index."""
+    _run(schema_editor, {'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0002_remove_expense_user_id_expense_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
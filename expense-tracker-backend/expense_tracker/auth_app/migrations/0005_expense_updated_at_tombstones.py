@@ -0,0 +1,59 @@
+# Delta sync: per-expense modification time and delete tombstones
+
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+search_index = import_module('auth_app.migrations.0003_expense_search_index')
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing expenses were last modified when they were created, as far as we know."""
+    Expense = apps.get_model('auth_app', 'Expense')
+    Expense.objects.update(updated_at=F('timestamp'))
+
+
+def restore_search_triggers(apps, schema_editor):
+    """SQLite adds the column by rebuilding the table, which drops its FTS triggers."""
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in search_index.SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0004_expense_list_indexes'),
+    ]
+
+    operations = [
+        # Runs last when unapplying, after RemoveField has rebuilt the table
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='expense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'updated_at'], name='expenses_user_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='ExpenseTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('expense_id', models.CharField(max_length=64)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'expense_tombstones',
+                'indexes': [models.Index(fields=['user_id', 'deleted_at'], name='tombstones_user_deleted_idx')],
+            },
+        ),
+    ]
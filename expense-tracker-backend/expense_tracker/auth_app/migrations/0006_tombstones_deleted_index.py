@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0005_expense_updated_at_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expensetombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstones_deleted_idx'),
+        ),
+    ]
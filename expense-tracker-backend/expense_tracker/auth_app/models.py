@@ -2,7 +2,6 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-import boto3
 from django.conf import settings
 from django.db import models
 
@@ -17,6 +16,9 @@ def get_dynamodb_table():
     """Get DynamoDB table (only used in production mode)."""
     global _dynamodb_resource, _dynamodb_table
     if _dynamodb_table is None:
+        # Imported here so local mode and management commands never load boto3
+        import boto3
+
         _dynamodb_resource = boto3.resource(
             'dynamodb',
             region_name=settings.AWS_REGION,
@@ -221,11 +223,40 @@ class Expense(models.Model):
     description = models.TextField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     receipt_url = models.URLField(blank=True, null=True)
+    # Bumped on every save; drives delta sync ("changes since")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'expenses'
         ordering = ['-timestamp']
+        # Serve the per-user list filters and sorts without scanning other users' rows
+        indexes = [
+            models.Index(fields=['user', '-timestamp'], name='expenses_user_ts_idx'),
+            models.Index(fields=['user', 'category'], name='expenses_user_category_idx'),
+            models.Index(fields=['user', 'amount'], name='expenses_user_amount_idx'),
+            models.Index(fields=['user', 'updated_at'], name='expenses_user_updated_idx'),
+        ]
 
     def __str__(self):
         user_display = self.user.email if self.user else "No User"
         return f"{user_display} - {self.amount} - {self.category}"
+
+
+class ExpenseTombstone(models.Model):
+    """Record of a deleted expense, so delta sync clients can drop their copy."""
+    # Plain column rather than a ForeignKey: tombstones are also written
+    # while a user's expenses are cascade-deleted together with the user
+    user_id = models.IntegerField()
+    expense_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'expense_tombstones'
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='tombstones_user_deleted_idx'),
+            # purge_tombstones deletes by age across all users
+            models.Index(fields=['deleted_at'], name='tombstones_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.expense_id} deleted {self.deleted_at}"
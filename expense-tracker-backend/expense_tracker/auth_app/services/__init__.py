@@ -1,13 +1,15 @@
 """Service abstractions for auth, expenses, and file storage."""
 
 from .auth_service import AuthService, get_auth_service
-from .expense_service import ExpenseRepository, get_expense_repository
+from .expense_service import ExpenseFilters, ExpenseRepository, get_expense_repository
 from .file_service import FileStorage, get_file_storage
 from .response_service import ErrorMapper, RequestValidator, ResponseBuilder
+from .serialization import FastJsonResponse
 
 __all__ = [
     'AuthService',
     'get_auth_service',
+    'ExpenseFilters',
     'ExpenseRepository',
     'get_expense_repository',
     'FileStorage',
@@ -15,4 +17,5 @@ __all__ = [
     'ErrorMapper',
     'ResponseBuilder',
     'RequestValidator',
+    'FastJsonResponse',
 ]
@@ -0,0 +1,56 @@
+"""Bounded thread pool for awaiting blocking service calls from async views."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+DEFAULT_MAX_WORKERS = 32
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide executor for blocking I/O.
+
+    Returns:
+        ThreadPoolExecutor with ASYNC_EXECUTOR_WORKERS threads (default 32),
+        which caps the concurrent boto3 calls one worker process makes
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ASYNC_EXECUTOR_WORKERS', DEFAULT_MAX_WORKERS),
+                    thread_name_prefix='service-io',
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable, *args, thread_sensitive: bool = False, **kwargs):
+    """
+    Await a blocking call without stalling the event loop.
+
+    Network-bound calls run in the bounded executor. Pass thread_sensitive
+    for Django ORM code, which must run on Django's shared sync thread.
+    Context variables are propagated either way.
+    """
+    if thread_sensitive:
+        return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs)
+    return await sync_to_async(func, thread_sensitive=False, executor=get_executor())(
+        *args, **kwargs
+    )
+
+
+def shutdown_executor() -> None:
+    """Stop the executor (used by tests and worker shutdown hooks)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
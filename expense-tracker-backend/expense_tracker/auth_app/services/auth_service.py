@@ -3,11 +3,17 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional, Tuple
 
-from django.conf import settings
+from .async_utils import run_blocking
+from .registry import AUTH_SERVICE, service_registry
 
 
 class AuthService(ABC):
-    """Abstract interface for authentication operations."""
+    """
+    Abstract interface for authentication operations.
+
+    Each operation has an ``a``-prefixed async variant that awaits the sync
+    method in the bounded executor unless an implementation overrides it.
+    """
 
     @abstractmethod
     def login(self, email: str, password: str) -> Tuple[Optional[Dict], Optional[str]]:
@@ -105,19 +111,55 @@ class AuthService(ABC):
         """
         pass
 
+    async def alogin(self, email: str, password: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Async variant of login."""
+        return await run_blocking(self.login, email, password)
+
+    async def asignup(self, email: str, password: str) -> Tuple[bool, Optional[str]]:
+        """Async variant of signup."""
+        return await run_blocking(self.signup, email, password)
+
+    async def aconfirm_signup(self, email: str, code: str) -> Tuple[bool, Optional[str]]:
+        """Async variant of confirm_signup."""
+        return await run_blocking(self.confirm_signup, email, code)
+
+    async def aforgot_password(self, email: str) -> Tuple[bool, Optional[str]]:
+        """Async variant of forgot_password."""
+        return await run_blocking(self.forgot_password, email)
+
+    async def aconfirm_forgot_password(
+        self, email: str, code: str, new_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Async variant of confirm_forgot_password."""
+        return await run_blocking(self.confirm_forgot_password, email, code, new_password)
+
+    async def averify_reset_code(self, email: str, code: str) -> Tuple[bool, Optional[str]]:
+        """Async variant of verify_reset_code."""
+        return await run_blocking(self.verify_reset_code, email, code)
+
+    async def achange_password(
+        self, user_id: str, old_password: str, new_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Async variant of change_password."""
+        return await run_blocking(self.change_password, user_id, old_password, new_password)
+
+    async def aget_user_profile(self, user_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Async variant of get_user_profile."""
+        return await run_blocking(self.get_user_profile, user_id)
+
+    async def aupdate_user_profile(
+        self, user_id: str, **kwargs
+    ) -> Tuple[Optional[Dict], Optional[str]]:
+        """Async variant of update_user_profile."""
+        return await run_blocking(self.update_user_profile, user_id, **kwargs)
+
 
 def get_auth_service() -> AuthService:
     """
-    Factory function to get appropriate auth service based on environment.
+    Get the process-wide auth service.
 
     Returns:
-        LocalAuthService if IS_LOCAL_DEMO=true, else CognitoAuthService
+        LocalAuthService if IS_LOCAL_DEMO=true, else CognitoAuthService, built once
+        when local_app or cloud_app is ready
     """
-    is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
-
-    if is_local_demo:
-        from local_app.implementations.local_auth_service import LocalAuthService
-        return LocalAuthService()
-    else:
-        from cloud_app.implementations.cognito_service import CognitoAuthService
-        return CognitoAuthService()
+    return service_registry.get(AUTH_SERVICE)
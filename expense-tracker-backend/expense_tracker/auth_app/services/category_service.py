@@ -0,0 +1,131 @@
+"""Per-user category dictionary with usage counts for autocomplete."""
+
+import bisect
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..metrics import CACHE_REQUESTS
+from .transaction_utils import after_commit
+
+DEFAULT_SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 50
+
+
+class CategoryDictionary:
+    """
+    Sorted-array category dictionary for one user.
+
+    Names are kept sorted by their lowercase form so a case-insensitive
+    prefix lookup is two binary searches plus a slice.
+    """
+
+    __slots__ = ('keys', 'names', 'counts')
+
+    def __init__(self, counts: Dict[str, int]):
+        entries = sorted(counts.items(), key=lambda item: (item[0].lower(), item[0]))
+        self.keys = [name.lower() for name, _ in entries]
+        self.names = [name for name, _ in entries]
+        self.counts = [count for _, count in entries]
+
+    def add(self, name: str, amount: int = 1) -> None:
+        """Increment the usage count for a category, inserting it if new."""
+        key = name.lower()
+        index = bisect.bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            if self.names[index] == name:
+                self.counts[index] += amount
+                return
+            index += 1
+        self.keys.insert(index, key)
+        self.names.insert(index, name)
+        self.counts.insert(index, amount)
+
+    def lookup(self, prefix: str, limit: int) -> List[Dict]:
+        """
+        Find categories starting with prefix (case-insensitive).
+
+        Returns:
+            Up to ``limit`` dicts with name and count, most used first
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        # The highest code point sorts after every character that can follow
+        # the prefix, including non-BMP ones such as emoji
+        end = bisect.bisect_right(self.keys, prefix + '\U0010ffff', lo=start)
+
+        matches = sorted(range(start, end), key=lambda i: -self.counts[i])
+        return [
+            {'name': self.names[i], 'count': self.counts[i]}
+            for i in matches[:limit]
+        ]
+
+
+class CategoryIndex:
+    """
+    Cached category dictionaries, maintained by the repository write paths.
+
+    Dictionaries are loaded from the expense repository on a cache miss and
+    dropped after every committed write, so the next lookup reloads exact
+    counts. Dropping is a single delete: unlike incrementing the cached copy
+    (get, add, set) it cannot lose a concurrent writer's update.
+    """
+
+    KEY_PREFIX = 'expense-categories:v1'
+
+    def __init__(self, timeout: Optional[int] = None):
+        self.timeout = timeout
+
+    def _key(self, user_id: int) -> str:
+        return f'{self.KEY_PREFIX}:{user_id}'
+
+    def get(self, user_id: int, loader: Callable[[int], Dict[str, int]]) -> CategoryDictionary:
+        """Return the user's dictionary, loading it from the repository on a miss."""
+        dictionary = cache.get(self._key(user_id))
+        CACHE_REQUESTS.inc(cache='categories', result='miss' if dictionary is None else 'hit')
+        if dictionary is None:
+            dictionary = CategoryDictionary(loader(user_id))
+            cache.set(self._key(user_id), dictionary, self.timeout)
+        return dictionary
+
+    def suggest(
+        self,
+        user_id: int,
+        prefix: str,
+        loader: Callable[[int], Dict[str, int]],
+        limit: int = DEFAULT_SUGGESTION_LIMIT,
+    ) -> List[Dict]:
+        """Return the most used categories starting with prefix."""
+        return self.get(user_id, loader).lookup(prefix, limit)
+
+    def record(self, user_id: int) -> None:
+        """
+        Account for a new expense in the user's category counts.
+
+        The cached dictionary is dropped once the write's transaction
+        commits; a rolled-back write leaves it untouched.
+        """
+        after_commit(lambda: self.invalidate(user_id))
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the user's cached dictionary."""
+        cache.delete(self._key(user_id))
+
+
+_category_index = None
+
+
+def get_category_index() -> CategoryIndex:
+    """
+    Get the process-wide category index.
+
+    Returns:
+        CategoryIndex using CATEGORY_CACHE_TIMEOUT seconds (default 1 hour)
+    """
+    global _category_index
+    if _category_index is None:
+        _category_index = CategoryIndex(
+            timeout=getattr(settings, 'CATEGORY_CACHE_TIMEOUT', 3600)
+        )
+    return _category_index
@@ -0,0 +1,197 @@
+"""Per-user expense change events, published by the repositories for server-sent events."""
+
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional
+
+from django.conf import settings
+
+from .serialization import dumps
+from .transaction_utils import after_commit
+
+logger = logging.getLogger(__name__)
+
+EVENT_CREATED = 'expense.created'
+EVENT_UPDATED = 'expense.updated'
+EVENT_DELETED = 'expense.deleted'
+
+# Events buffered per subscriber before the oldest are dropped
+DEFAULT_QUEUE_SIZE = 100
+
+
+class EventBroker(ABC):
+    """Abstract interface for per-user event publish/subscribe."""
+
+    @abstractmethod
+    def publish(self, user_id: int, event: Dict) -> None:
+        """
+        Deliver an event to the user's current subscribers.
+
+        Called from synchronous repository code in any thread.
+        """
+        pass
+
+    @abstractmethod
+    def listen(
+        self, user_id: int, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        """
+        Subscribe to a user's events until the iterator is closed.
+
+        Yields:
+            Each published event, or None after ``heartbeat`` idle seconds so
+            the caller can keep the connection alive
+        """
+        pass
+
+
+def _put_latest(queue: asyncio.Queue, event: Dict) -> None:
+    """Enqueue an event, dropping the oldest if a slow subscriber is full."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class InProcessEventBroker(EventBroker):
+    """
+    Broker for a single server process.
+
+    Each subscriber owns an asyncio queue on its event loop. Publishers
+    hand events to that loop thread-safely, so WSGI-style worker threads and
+    the ASGI loop can share one broker.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, set] = {}
+
+    def publish(self, user_id: int, event: Dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put_latest, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; it is being torn down
+                pass
+
+    async def listen(
+        self, user_id: int, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: int) -> int:
+        """Number of open subscriptions for a user."""
+        with self._lock:
+            return len(self._subscribers.get(user_id, ()))
+
+
+class RedisEventBroker(EventBroker):
+    """Broker over Redis pub/sub channels, so events reach every server instance."""
+
+    CHANNEL_PREFIX = 'expense-events:v1'
+
+    def __init__(self, url: str):
+        import redis
+
+        self.url = url
+        # Connection-pooled and thread-safe; shared by all publishing threads
+        self._client = redis.Redis.from_url(url)
+
+    def _channel(self, user_id: int) -> str:
+        return f'{self.CHANNEL_PREFIX}:{user_id}'
+
+    def publish(self, user_id: int, event: Dict) -> None:
+        self._client.publish(self._channel(user_id), dumps(event))
+
+    async def listen(
+        self, user_id: int, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._channel(user_id))
+        try:
+            while True:
+                # Returns None on timeout (and for the subscribe confirmation)
+                message = await pubsub.get_message(timeout=heartbeat)
+                yield json.loads(message['data']) if message else None
+        finally:
+            await pubsub.reset()
+            await client.connection_pool.disconnect()
+
+
+def encode_sse(event: Optional[Dict]) -> bytes:
+    """Format an event as a server-sent events message (None as a keep-alive comment)."""
+    if event is None:
+        return b': keep-alive\n\n'
+    return b'event: ' + event['type'].encode() + b'\ndata: ' + dumps(event) + b'\n\n'
+
+
+_event_broker = None
+_event_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> EventBroker:
+    """
+    Get the process-wide event broker.
+
+    Returns:
+        RedisEventBroker if EVENT_BROKER_URL is set, else InProcessEventBroker
+    """
+    global _event_broker
+    if _event_broker is None:
+        with _event_broker_lock:
+            if _event_broker is None:
+                url = getattr(settings, 'EVENT_BROKER_URL', '')
+                _event_broker = RedisEventBroker(url) if url else InProcessEventBroker()
+    return _event_broker
+
+
+def reset_event_broker() -> None:
+    """Drop the broker so the next call builds one (used by tests and after fork)."""
+    global _event_broker
+    with _event_broker_lock:
+        _event_broker = None
+
+
+def publish_expense_event(user_id: int, event_type: str, **payload) -> None:
+    """
+    Publish an expense change event for the user's subscribers.
+
+    Failures are logged and swallowed; a broker outage must not fail the write.
+    """
+    try:
+        get_event_broker().publish(int(user_id), {'type': event_type, **payload})
+    except Exception as e:
+        logger.warning(f'Failed to publish {event_type} for user {user_id}: {str(e)}', exc_info=True)
+
+
+def publish_expense_event_on_commit(user_id: int, event_type: str, **payload) -> None:
+    """
+    Publish an expense change event once the current transaction commits.
+
+    A rolled-back write publishes nothing, so subscribers never hear of a
+    change that did not happen (see after_commit).
+    """
+    after_commit(lambda: publish_expense_event(user_id, event_type, **payload))
@@ -1,13 +1,155 @@
 """Abstract expense repository interface and factory."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from datetime import datetime, time, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
 
-from django.conf import settings
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .async_utils import run_blocking
+from .registry import EXPENSE_REPOSITORY, service_registry
+
+# Accepted sort values mapped to (field, descending)
+SORT_OPTIONS = {
+    '-timestamp': ('timestamp', True),
+    'timestamp': ('timestamp', False),
+    '-amount': ('amount', True),
+    'amount': ('amount', False),
+    # Values used by the frontend sort dropdown
+    'date_desc': ('timestamp', True),
+    'date_asc': ('timestamp', False),
+    'amount_desc': ('amount', True),
+    'amount_asc': ('amount', False),
+}
+DEFAULT_SORT = '-timestamp'
+
+# Fields of an expense dictionary, in response order
+EXPENSE_FIELDS = (
+    'expense_id',
+    'user_id',
+    'amount',
+    'category',
+    'description',
+    'timestamp',
+    'receipt_url',
+)
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated sparse fieldset (the 'fields' query parameter).
+
+    expense_id is always included so clients can identify rows.
+
+    Returns:
+        Tuple of field names in canonical order, or None for all fields
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not value:
+        return None
+
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested.difference(EXPENSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    requested.add('expense_id')
+    return tuple(field for field in EXPENSE_FIELDS if field in requested)
+
+
+def _parse_bound(value: str, end_of_day: bool) -> datetime:
+    """Parse an ISO date or datetime query value into an aware UTC datetime."""
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+    if day is not None:
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    elif parsed is None:
+        raise ValueError(f'Invalid date: {value}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _parse_amount(value: str) -> Decimal:
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Invalid amount: {value}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid amount: {value}')
+    return amount
+
+
+@dataclass(frozen=True)
+class ExpenseFilters:
+    """Filtering and sorting options for listing a user's expenses."""
+
+    category: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    q: Optional[str] = None
+    sort: str = DEFAULT_SORT
+
+    @property
+    def sort_field(self) -> str:
+        return SORT_OPTIONS[self.sort][0]
+
+    @property
+    def sort_descending(self) -> bool:
+        return SORT_OPTIONS[self.sort][1]
+
+    @classmethod
+    def from_params(cls, params) -> 'ExpenseFilters':
+        """
+        Build filters from request query parameters.
+
+        Accepts category, from, to (ISO date or datetime; a bare 'to' date
+        includes the whole day), min_amount, max_amount, q and sort.
+
+        Raises:
+            ValueError: If a parameter is malformed
+        """
+        date_from = params.get('from')
+        date_to = params.get('to')
+        min_amount = params.get('min_amount')
+        max_amount = params.get('max_amount')
+        sort = params.get('sort') or DEFAULT_SORT
+
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f'Invalid sort: {sort}')
+
+        return cls(
+            category=params.get('category') or None,
+            date_from=_parse_bound(date_from, end_of_day=False) if date_from else None,
+            date_to=_parse_bound(date_to, end_of_day=True) if date_to else None,
+            min_amount=_parse_amount(min_amount) if min_amount else None,
+            max_amount=_parse_amount(max_amount) if max_amount else None,
+            q=(params.get('q') or '').strip() or None,
+            sort=sort,
+        )
 
 
 class ExpenseRepository(ABC):
-    """Abstract interface for expense storage operations."""
+    """
+    Abstract interface for expense storage operations.
+
+    Each operation has an ``a``-prefixed async variant for async views. The
+    defaults await the sync method via run_blocking; implementations with
+    native async I/O override them.
+    """
+
+    # Whether the default async variants must run on Django's sync thread;
+    # ORM-backed subclasses set True, network-bound ones keep the executor
+    async_thread_sensitive = False
 
     @abstractmethod
     def create(
@@ -22,12 +164,22 @@ class ExpenseRepository(ABC):
         pass
 
     @abstractmethod
-    def get_by_user(self, user_id: int) -> List[Dict]:
+    def get_by_user(
+        self,
+        user_id: int,
+        filters: Optional[ExpenseFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Dict]:
         """
-        Get all expenses for a user.
+        Get a user's expenses, optionally filtered, sorted and projected.
+
+        Args:
+            fields: Subset of EXPENSE_FIELDS to read and return (None for all)
 
         Returns:
-            List of expense dictionaries
+            List of expense dictionaries, newest first unless filters.sort says otherwise.
+            Values may be native types (Decimal amount, datetime timestamp) that
+            auth_app.services.serialization encodes without a conversion pass.
         """
         pass
 
@@ -42,12 +194,21 @@ class ExpenseRepository(ABC):
         pass
 
     @abstractmethod
-    def update_receipt_url(self, expense_id: str, receipt_url: str) -> bool:
+    def update_receipt_url(
+        self, expense_id: str, receipt_url: str, user_id: Optional[int] = None
+    ) -> bool:
         """
-        Link a receipt URL to an expense.
+        Link a receipt URL to an expense in one conditional write.
+
+        Publishes an expense.updated event carrying only expense_id,
+        user_id, receipt_url and updated_at.
+
+        Args:
+            user_id: Owner the expense must belong to; None skips the check
 
         Returns:
-            True if successful, False otherwise
+            True if updated, False if the expense does not exist, belongs to
+            another user, or the write failed
         """
         pass
 
@@ -68,23 +229,108 @@ class ExpenseRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def search(
+        self, user_id: int, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """
+        Full-text search over a user's expense categories and descriptions.
+
+        Returns:
+            (page of expense dictionaries ordered by relevance, total match count)
+        """
+        pass
+
+    @abstractmethod
+    def get_category_counts(self, user_id: int) -> Dict[str, int]:
+        """
+        Count a user's expenses per category.
+
+        Returns:
+            Mapping of category name to number of expenses
+        """
+        pass
+
+    @abstractmethod
+    def get_changes(
+        self, user_id: int, since: Optional[datetime] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Get a user's expenses created or modified since a point in time.
+
+        Args:
+            since: Aware UTC datetime from a sync token (None for a full snapshot)
+
+        Returns:
+            (expense dictionaries with updated_at, oldest change first;
+            ids of expenses deleted since then)
+        """
+        pass
+
+    async def acreate(
+        self, user_id: int, amount: float, category: str, description: str = ""
+    ) -> Dict:
+        """Async variant of create."""
+        return await self._run(self.create, user_id, amount, category, description)
+
+    async def aget_by_user(
+        self,
+        user_id: int,
+        filters: Optional[ExpenseFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Dict]:
+        """Async variant of get_by_user."""
+        return await self._run(self.get_by_user, user_id, filters, fields)
+
+    async def aget_by_id(self, expense_id: str) -> Optional[Dict]:
+        """Async variant of get_by_id."""
+        return await self._run(self.get_by_id, expense_id)
+
+    async def aupdate_receipt_url(
+        self, expense_id: str, receipt_url: str, user_id: Optional[int] = None
+    ) -> bool:
+        """Async variant of update_receipt_url."""
+        return await self._run(self.update_receipt_url, expense_id, receipt_url, user_id)
+
+    async def aadd_expense_with_receipt(
+        self,
+        user_id: int,
+        amount: float,
+        category: str,
+        description: str = "",
+        receipt_url: Optional[str] = None,
+    ) -> Dict:
+        """Async variant of add_expense_with_receipt."""
+        return await self._run(
+            self.add_expense_with_receipt, user_id, amount, category, description, receipt_url
+        )
+
+    async def asearch(
+        self, user_id: int, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """Async variant of search."""
+        return await self._run(self.search, user_id, query, limit, offset)
+
+    async def aget_category_counts(self, user_id: int) -> Dict[str, int]:
+        """Async variant of get_category_counts."""
+        return await self._run(self.get_category_counts, user_id)
+
+    async def aget_changes(
+        self, user_id: int, since: Optional[datetime] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """Async variant of get_changes."""
+        return await self._run(self.get_changes, user_id, since)
+
+    async def _run(self, func, *args):
+        return await run_blocking(func, *args, thread_sensitive=self.async_thread_sensitive)
+
 
 def get_expense_repository() -> ExpenseRepository:
     """
-    Factory function to get appropriate expense repository based on environment.
+    Get the process-wide expense repository.
 
     Returns:
-        SQLiteExpenseRepository if IS_LOCAL_DEMO=true, else DynamoDBExpenseRepository
+        SQLiteExpenseRepository if IS_LOCAL_DEMO=true, else DynamoDBExpenseRepository, built once
+        when local_app or cloud_app is ready
     """
-    is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
-
-    if is_local_demo:
-        from local_app.implementations.sqlite_expense_repo import (
-            SQLiteExpenseRepository,
-        )
-        return SQLiteExpenseRepository()
-    else:
-        from cloud_app.implementations.dynamodb_expense_repo import (
-            DynamoDBExpenseRepository,
-        )
-        return DynamoDBExpenseRepository()
+    return service_registry.get(EXPENSE_REPOSITORY)
@@ -2,11 +2,17 @@
 
 from abc import ABC, abstractmethod
 
-from django.conf import settings
+from .async_utils import run_blocking
+from .registry import FILE_STORAGE, service_registry
 
 
 class FileStorage(ABC):
-    """Abstract interface for file storage operations."""
+    """
+    Abstract interface for file storage operations.
+
+    Async variants (``aupload``, ``aget_url``) await the sync methods in the
+    bounded executor unless an implementation overrides them.
+    """
 
     @abstractmethod
     def upload(self, filename: str, file_data: bytes, user_id: int) -> str:
@@ -36,19 +42,21 @@ class FileStorage(ABC):
         """
         pass
 
+    async def aupload(self, filename: str, file_data: bytes, user_id: int) -> str:
+        """Async variant of upload."""
+        return await run_blocking(self.upload, filename, file_data, user_id)
+
+    async def aget_url(self, file_key: str) -> str:
+        """Async variant of get_url."""
+        return await run_blocking(self.get_url, file_key)
+
 
 def get_file_storage() -> FileStorage:
     """
-    Factory function to get appropriate file storage based on environment.
+    Get the process-wide file storage.
 
     Returns:
-        LocalFileStorage if IS_LOCAL_DEMO=true, else S3FileStorage
+        LocalFileStorage if IS_LOCAL_DEMO=true, else S3FileStorage, built once
+        when local_app or cloud_app is ready
     """
-    is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
-
-    if is_local_demo:
-        from local_app.implementations.local_file_storage import LocalFileStorage
-        return LocalFileStorage()
-    else:
-        from cloud_app.implementations.s3_file_storage import S3FileStorage
-        return S3FileStorage()
+    return service_registry.get(FILE_STORAGE)
@@ -0,0 +1,107 @@
+"""Process-wide registry of the service implementations views depend on."""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from utils import metrics
+from utils.perf import TimedProxy
+
+EXPENSE_REPOSITORY = 'expense_repository'
+FILE_STORAGE = 'file_storage'
+AUTH_SERVICE = 'auth_service'
+
+# Server-Timing metric each service's calls are reported under
+TIMING_NAMES = {
+    EXPENSE_REPOSITORY: 'repo',
+    FILE_STORAGE: 'storage',
+    AUTH_SERVICE: 'auth',
+}
+
+
+class ServiceRegistry:
+    """
+    Builds each registered service once and hands out the shared instance.
+
+    Implementation apps register builders from ``AppConfig.ready``, so the
+    per-request factories are a dictionary lookup instead of a settings check,
+    an import and a construction. Instances are shared across threads and
+    must not hold per-request state. With SERVER_TIMING or metrics enabled
+    they are wrapped in timing proxies.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+
+    def register(self, name: str, builder: Callable[[], Any], eager: bool = True) -> None:
+        """
+        Register the builder for a service, replacing any previous one.
+
+        Args:
+            name: Service name (e.g. EXPENSE_REPOSITORY)
+            builder: Zero-argument callable, usually the implementation class
+            eager: Build the instance now rather than on first use
+        """
+        with self._lock:
+            self._builders[name] = builder
+            self._instances.pop(name, None)
+        if eager:
+            self.get(name)
+
+    def get(self, name: str) -> Any:
+        """
+        Get the shared instance of a service, building it on first use.
+
+        Raises:
+            ImproperlyConfigured: If no implementation app registered the service
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                builder = self._builders.get(name)
+                if builder is None:
+                    raise ImproperlyConfigured(
+                        f'No {name} registered; add local_app or cloud_app to INSTALLED_APPS'
+                    )
+                instance = builder()
+                if getattr(settings, 'SERVER_TIMING', False) or metrics.is_enabled():
+                    from auth_app.metrics import SERVICE_CALL_LATENCY
+
+                    instance = TimedProxy(
+                        instance,
+                        TIMING_NAMES.get(name, name),
+                        histogram=SERVICE_CALL_LATENCY if metrics.is_enabled() else None,
+                    )
+                self._instances[name] = instance
+            return instance
+
+    def is_registered(self, name: str) -> bool:
+        """Whether a builder exists for the service."""
+        return name in self._builders
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """
+        Drop built instances so the next get() rebuilds them.
+
+        Builders stay registered. Used by tests and after forking worker
+        processes, where inherited clients must not be reused.
+
+        Args:
+            name: Service to reset, or None for all of them
+        """
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+service_registry = ServiceRegistry()
@@ -1,9 +1,23 @@
 """Unified response building and error handling."""
 
-from typing import Dict, Optional, Tuple
+import sys
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-from botocore.exceptions import ClientError
-from django.http import JsonResponse
+from .serialization import FastJsonResponse
+
+if TYPE_CHECKING:
+    from botocore.exceptions import ClientError
+
+
+def is_client_error(exception: Exception) -> bool:
+    """
+    Check for a botocore ClientError without importing botocore.
+
+    Only the cloud implementations load botocore. If it was never imported,
+    nothing can have raised a ClientError, so local mode skips the import.
+    """
+    exceptions = sys.modules.get('botocore.exceptions')
+    return exceptions is not None and isinstance(exception, exceptions.ClientError)
 
 
 class ErrorMapper:
@@ -24,7 +38,7 @@ class ErrorMapper:
     }
 
     @staticmethod
-    def map_cognito_error(error: ClientError) -> Tuple[str, int]:
+    def map_cognito_error(error: 'ClientError') -> Tuple[str, int]:
         """
         Map Cognito error codes to user-friendly messages and HTTP status codes.
 
@@ -66,7 +80,7 @@ class ErrorMapper:
         Returns:
             (error_message, status_code)
         """
-        if isinstance(exception, ClientError):
+        if is_client_error(exception):
             return ErrorMapper.map_cognito_error(exception)
 
         if isinstance(exception, ValueError):
@@ -84,7 +98,7 @@ class ResponseBuilder:
     @staticmethod
     def success(
         message: str, data: Optional[Dict] = None, status: int = 200
-    ) -> JsonResponse:
+    ) -> FastJsonResponse:
         """
         Build a success response.
 
@@ -94,7 +108,7 @@ class ResponseBuilder:
             status: HTTP status code
 
         Returns:
-            JsonResponse with success format
+            FastJsonResponse with success format
         """
         response_data = {
             'status': 'success',
@@ -103,10 +117,10 @@ class ResponseBuilder:
         if data:
             response_data['data'] = data
 
-        return JsonResponse(response_data, status=status)
+        return FastJsonResponse(response_data, status=status)
 
     @staticmethod
-    def error(message: str, status: int = 400) -> JsonResponse:
+    def error(message: str, status: int = 400) -> FastJsonResponse:
         """
         Build an error response.
 
@@ -115,9 +129,9 @@ class ResponseBuilder:
             status: HTTP status code
 
         Returns:
-            JsonResponse with error format
+            FastJsonResponse with error format
         """
-        return JsonResponse(
+        return FastJsonResponse(
             {
                 'status': 'error',
                 'error': message,
@@ -132,7 +146,7 @@ class ResponseBuilder:
         refresh_token: str,
         access_token: str,
         status: int = 200,
-    ) -> JsonResponse:
+    ) -> FastJsonResponse:
         """
         Build a success response with auth tokens.
 
@@ -144,9 +158,9 @@ class ResponseBuilder:
             status: HTTP status code
 
         Returns:
-            JsonResponse with tokens in body (access_token should be in cookie)
+            FastJsonResponse with tokens in body (access_token should be in cookie)
         """
-        return JsonResponse(
+        return FastJsonResponse(
             {
                 'status': 'success',
                 'message': message,
@@ -157,7 +171,7 @@ class ResponseBuilder:
         )
 
     @staticmethod
-    def validation_error(errors: Dict[str, str]) -> JsonResponse:
+    def validation_error(errors: Dict[str, str]) -> FastJsonResponse:
         """
         Build a validation error response.
 
@@ -165,9 +179,9 @@ class ResponseBuilder:
             errors: Dictionary of field -> error message
 
         Returns:
-            JsonResponse with validation errors
+            FastJsonResponse with validation errors
         """
-        return JsonResponse(
+        return FastJsonResponse(
             {
                 'status': 'error',
                 'error': 'Validation failed',
@@ -0,0 +1,211 @@
+"""Full-text search helpers shared by the expense repositories."""
+
+import bisect
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Fields that take part in full-text search and their ranking weights
+SEARCH_FIELD_WEIGHTS = {
+    'category': 2,
+    'description': 1,
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase search tokens.
+
+    Args:
+        text: Free text (category, description or a user query)
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def build_fts5_query(query: str) -> Optional[str]:
+    """
+    Build a safe SQLite FTS5 MATCH expression from user input.
+
+    Every token becomes a quoted prefix term, so FTS5 operators typed by
+    the user are treated as plain text. All terms must match.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable tokens
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Build a PostgreSQL to_tsquery expression with prefix matching.
+
+    Returns:
+        tsquery expression, or None if the query has no searchable tokens
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def parse_pagination(params) -> Tuple[int, int]:
+    """
+    Parse page and page_size query parameters.
+
+    Args:
+        params: QueryDict or mapping with optional 'page' and 'page_size'
+
+    Returns:
+        (page, page_size)
+
+    Raises:
+        ValueError: If either value is not a positive integer
+    """
+    try:
+        page = int(params.get('page', 1))
+        page_size = int(params.get('page_size', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('page and page_size must be integers')
+
+    if page < 1 or page_size < 1:
+        raise ValueError('page and page_size must be positive')
+
+    return page, min(page_size, MAX_PAGE_SIZE)
+
+
+class _UserIndex:
+    """Postings for a single user."""
+
+    __slots__ = ('built_at', 'postings', 'tokens', 'timestamps')
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        # token -> {expense_id: weight}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        # Sorted token list for prefix lookups
+        self.tokens: List[str] = []
+        # expense_id -> ISO timestamp, used to break ranking ties
+        self.timestamps: Dict[str, str] = {}
+
+
+class InvertedIndex:
+    """
+    In-process inverted index (token -> expense ids) partitioned by user.
+
+    Used by backends without native full-text search. Partitions are built
+    lazily from the backing store, kept current by the repository write
+    paths, and rebuilt after ``ttl_seconds`` to pick up writes made by
+    other processes.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._users: Dict[int, _UserIndex] = {}
+
+    def is_fresh(self, user_id: int) -> bool:
+        """Return True if the user's partition exists and is within its TTL."""
+        with self._lock:
+            user_index = self._users.get(user_id)
+            if user_index is None:
+                return False
+            return time.monotonic() - user_index.built_at < self.ttl_seconds
+
+    def build(self, user_id: int, expenses: Iterable[Dict]) -> None:
+        """Replace the user's partition with postings for the given expenses."""
+        user_index = _UserIndex()
+        for expense in expenses:
+            self._index_expense(user_index, expense)
+        user_index.tokens.sort()
+
+        with self._lock:
+            self._users[user_id] = user_index
+
+    def add(self, user_id: int, expense: Dict) -> None:
+        """Index a newly written expense if the user's partition is loaded."""
+        with self._lock:
+            user_index = self._users.get(user_id)
+            if user_index is not None:
+                self._index_expense(user_index, expense, keep_sorted=True)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user's partition, or every partition if user_id is None."""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def search(self, user_id: int, query: str) -> List[str]:
+        """
+        Find expenses matching every query token (prefix match).
+
+        Returns:
+            Expense ids ordered by relevance, newest first on ties
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            user_index = self._users.get(user_id)
+            if user_index is None:
+                return []
+
+            scores: Optional[Dict[str, int]] = None
+            for query_token in query_tokens:
+                token_scores: Dict[str, int] = {}
+                start = bisect.bisect_left(user_index.tokens, query_token)
+                for token in user_index.tokens[start:]:
+                    if not token.startswith(query_token):
+                        break
+                    for expense_id, weight in user_index.postings[token].items():
+                        token_scores[expense_id] = token_scores.get(expense_id, 0) + weight
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        expense_id: score + token_scores[expense_id]
+                        for expense_id, score in scores.items()
+                        if expense_id in token_scores
+                    }
+                if not scores:
+                    return []
+
+            timestamps = user_index.timestamps
+
+        # Stable sorts: newest first, then by descending score
+        ranked = sorted(scores, key=lambda eid: timestamps.get(eid, ''), reverse=True)
+        ranked.sort(key=lambda eid: scores[eid], reverse=True)
+        return ranked
+
+    @staticmethod
+    def _index_expense(user_index: _UserIndex, expense: Dict, keep_sorted: bool = False) -> None:
+        expense_id = str(expense['expense_id'])
+        user_index.timestamps[expense_id] = str(expense.get('timestamp') or '')
+
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            for token in tokenize(expense.get(field)):
+                postings = user_index.postings.get(token)
+                if postings is None:
+                    postings = user_index.postings[token] = {}
+                    if keep_sorted:
+                        bisect.insort(user_index.tokens, token)
+                    else:
+                        user_index.tokens.append(token)
+                postings[expense_id] = postings.get(expense_id, 0) + weight
@@ -0,0 +1,92 @@
+"""Fast JSON encoding for API responses."""
+
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+
+from utils.perf import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed packages
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class APIJSONEncoder(DjangoJSONEncoder):
+    """Stdlib encoder matching the fast path: Decimal as a number, datetimes as ISO 8601."""
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        if isinstance(o, (datetime, date, time)):
+            # Full precision and +00:00 offsets, like orjson (DjangoJSONEncoder
+            # truncates to milliseconds and writes UTC as Z)
+            return o.isoformat()
+        return super().default(o)
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Handle the types orjson does not serialize natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def get_json_backend() -> str:
+    """
+    Get the active JSON backend.
+
+    Returns:
+        'orjson' or 'stdlib', based on API_JSON_ENCODER ('auto' by default)
+        and whether orjson is installed
+    """
+    preference = getattr(settings, 'API_JSON_ENCODER', 'auto')
+    if preference == 'stdlib' or orjson is None:
+        return 'stdlib'
+    return 'orjson'
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serialize data to UTF-8 JSON bytes.
+
+    Decimal values are encoded as numbers and datetimes as ISO 8601 strings,
+    so repository rows can be encoded without converting them first. Falls
+    back to the stdlib encoder if orjson is unavailable or rejects the data
+    (for example integers wider than 64 bits).
+    """
+    if get_json_backend() == 'orjson':
+        try:
+            return orjson.dumps(data, default=_orjson_default)
+        except TypeError as e:
+            logger.debug(f'orjson could not encode response, using stdlib: {str(e)}')
+    return json.dumps(data, cls=APIJSONEncoder, separators=(',', ':')).encode()
+
+
+class FastJsonResponse(JsonResponse):
+    """
+    Drop-in JsonResponse that encodes with :func:`dumps`.
+
+    Accepts the same arguments as JsonResponse except ``encoder`` and
+    ``json_dumps_params``, which only apply to the stdlib encoder.
+    """
+
+    def __init__(self, data: Any, safe: bool = True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the '
+                'safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        with timed('serialize'):
+            content = dumps(data)
+        # Skip JsonResponse.__init__, which would encode with json.dumps
+        super(JsonResponse, self).__init__(content=content, **kwargs)
@@ -0,0 +1,63 @@
+"""Sync tokens for delta ("changes since") expense sync."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from django.conf import settings
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_sync_token(moment: datetime) -> str:
+    """Encode an aware datetime as an opaque sync token (epoch microseconds)."""
+    return str((moment - _EPOCH) // timedelta(microseconds=1))
+
+
+class SyncTokenExpired(ValueError):
+    """The token predates the tombstone retention; the client must resync in full."""
+
+
+def tombstone_retention() -> timedelta:
+    """How long tombstones are kept (SYNC_TOMBSTONE_RETENTION_DAYS, default 30)."""
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def decode_sync_token(token: str, now: Optional[datetime] = None) -> datetime:
+    """
+    Decode a sync token from encode_sync_token.
+
+    Tombstones older than the retention may have been purged, so a delta from
+    an older token could miss deletes; such tokens are refused.
+
+    Raises:
+        SyncTokenExpired: If the token is older than the tombstone retention
+        ValueError: If the token is malformed
+    """
+    try:
+        microseconds = int(token)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid sync token')
+    if microseconds < 0:
+        raise ValueError('Invalid sync token')
+    try:
+        moment = _EPOCH + timedelta(microseconds=microseconds)
+    except OverflowError:
+        raise ValueError('Invalid sync token')
+    now = now or datetime.now(timezone.utc)
+    if moment < now - tombstone_retention():
+        raise SyncTokenExpired('Sync token expired; sync again without a token')
+    return moment
+
+
+def next_sync_token(now: Optional[datetime] = None) -> str:
+    """
+    Build the token a client sends on its next sync.
+
+    Taken before reading changes and moved back by SYNC_TOKEN_OVERLAP_SECONDS
+    (default 5), so writes committed while the read runs, or stamped by a
+    server with a slightly slow clock, are sent again rather than missed.
+    Clients merge changes by expense_id, so repeats are harmless.
+    """
+    now = now or datetime.now(timezone.utc)
+    overlap = timedelta(seconds=getattr(settings, 'SYNC_TOKEN_OVERLAP_SECONDS', 5))
+    return encode_sync_token(now - overlap)
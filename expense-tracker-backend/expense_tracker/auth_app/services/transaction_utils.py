@@ -0,0 +1,22 @@
+"""Run write side effects (events, cache updates) only once the write has committed."""
+
+from typing import Callable
+
+from django.db import transaction
+
+
+def after_commit(func: Callable[[], None]) -> None:
+    """
+    Call func once the current transaction commits.
+
+    Inside an atomic block func waits for the outermost commit and is
+    dropped on rollback, so nothing outside the database reflects a write
+    that did not happen. Outside one the write has already been committed
+    (autocommit) and func runs at once; checking the flag rather than calling
+    on_commit directly never opens a connection, so executor threads used by
+    the async paths stay connection-free.
+    """
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+    else:
+        func()
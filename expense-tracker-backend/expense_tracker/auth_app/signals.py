@@ -0,0 +1,15 @@
+"""Model signal handlers for auth_app."""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Expense, ExpenseTombstone
+from .services.event_service import EVENT_DELETED, publish_expense_event_on_commit
+
+
+@receiver(post_delete, sender=Expense, dispatch_uid='record_expense_tombstone')
+def record_expense_tombstone(sender, instance, **kwargs):
+    """Record every expense delete (admin, cascades, repository) for sync and push clients."""
+    if instance.user_id is not None:
+        ExpenseTombstone.objects.create(user_id=instance.user_id, expense_id=str(instance.pk))
+        publish_expense_event_on_commit(instance.user_id, EVENT_DELETED, expense_id=str(instance.pk))
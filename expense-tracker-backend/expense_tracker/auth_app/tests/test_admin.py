@@ -2,9 +2,11 @@
 
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
 from django.test import TestCase
 
-from auth_app.admin import ExpenseAdmin, CustomUserAdmin
+from auth_app.admin import ExpenseAdmin, CustomUserAdmin, SessionAdmin
 from auth_app.models import Expense
 
 
@@ -195,3 +197,48 @@ class ExpenseAdminTest(TestCase):
         # Should be ordered by timestamp descending (newest first)
         self.assertEqual(expenses[0].id, newer_expense.id)
         self.assertEqual(expenses[-1].id, self.expense.id)  # oldest (first created)
+
+
+class SessionAdminTest(TestCase):
+    """Test the Session admin user columns."""
+
+    def setUp(self):
+        """Set up admin site and a user"""
+        self.admin = SessionAdmin(Session, AdminSite())
+        self.user = User.objects.create_user(username='session@example.com', email='session@example.com')
+
+    def create_session(self, user_id=None):
+        store = SessionStore()
+        if user_id is not None:
+            store['_auth_user_id'] = str(user_id)
+        store.create()
+        return Session.objects.get(session_key=store.session_key)
+
+    def test_user_email(self):
+        """Test the email links to the user"""
+        html = self.admin.get_user_email(self.create_session(self.user.pk))
+
+        self.assertIn('session@example.com', html)
+        self.assertIn(f'/admin/auth/user/{self.user.pk}/change/', html)
+
+    def test_user_email_preloaded(self):
+        """Test users preloaded by the changelist are used without a query"""
+        session = self.create_session(self.user.pk)
+        session._session_users = {self.user.pk: self.user}
+
+        with self.assertNumQueries(0):
+            self.assertIn('session@example.com', self.admin.get_user_email(session))
+
+    def test_deleted_user(self):
+        """Test sessions of deleted users"""
+        session = self.create_session(self.user.pk)
+        self.user.delete()
+
+        self.assertEqual(self.admin.get_user_email(session), '(deleted)')
+
+    def test_anonymous_session(self):
+        """Test sessions without a user"""
+        session = self.create_session()
+
+        self.assertEqual(self.admin.get_user_email(session), '-')
+        self.assertEqual(self.admin.get_user_id(session), '-')
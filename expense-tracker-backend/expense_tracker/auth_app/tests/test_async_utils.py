@@ -0,0 +1,59 @@
+"""Unit tests for async_utils module (bounded executor for blocking calls)."""
+
+import asyncio
+import contextvars
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_app.services import async_utils
+from auth_app.services.async_utils import get_executor, run_blocking, shutdown_executor
+from auth_app.services.file_service import FileStorage
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+class RecordingStorage(FileStorage):
+    """FileStorage that records the thread each call runs on."""
+
+    def upload(self, filename, file_data, user_id):
+        return f'{threading.current_thread().name}/{user_id}/{filename}'
+
+    def get_url(self, file_key):
+        return file_key
+
+
+class RunBlockingTest(SimpleTestCase):
+    """Test run_blocking and the async service defaults."""
+
+    def tearDown(self):
+        shutdown_executor()
+
+    def test_runs_in_executor_with_context(self):
+        """Test calls run on executor threads and see the caller's context variables"""
+        def work():
+            return threading.current_thread().name, request_id.get()
+
+        async def scenario():
+            request_id.set('abc')
+            return await run_blocking(work)
+
+        thread_name, value = asyncio.run(scenario())
+
+        self.assertTrue(thread_name.startswith('service-io'))
+        self.assertEqual(value, 'abc')
+
+    @override_settings(ASYNC_EXECUTOR_WORKERS=3)
+    def test_executor_is_bounded(self):
+        """Test the executor size comes from ASYNC_EXECUTOR_WORKERS"""
+        shutdown_executor()
+
+        self.assertEqual(get_executor()._max_workers, 3)
+        self.assertIs(get_executor(), async_utils._executor)
+
+    def test_default_async_variant(self):
+        """Test interface async defaults await the sync implementation in the executor"""
+        url = asyncio.run(RecordingStorage().aupload('r.jpg', b'data', 7))
+
+        self.assertTrue(url.startswith('service-io'))
+        self.assertTrue(url.endswith('/7/r.jpg'))
@@ -0,0 +1,148 @@
+"""Unit tests for utils.batch_migration and the batched 0002 data migration."""
+
+import importlib
+import io
+from contextlib import redirect_stdout
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+
+from auth_app.models import Expense
+from utils.batch_migration import iter_batches, run_in_batches
+from utils.testing import count_queries
+
+MIGRATION = 'auth_app.migrations.0002_remove_expense_user_id_expense_user'
+
+
+class BatchMigrationHelperTest(TestCase):
+    """Test iter_batches and run_in_batches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner@example.com', email='owner@example.com')
+        Expense.objects.bulk_create(
+            Expense(user=self.user, amount=index + 1, category='Food') for index in range(25)
+        )
+        self.pks = list(Expense.objects.order_by('pk').values_list('pk', flat=True))
+
+    def test_batches_in_pk_order(self):
+        """Test rows come back in primary-key order, batch_size at a time"""
+        batches = list(iter_batches(Expense.objects.all(), batch_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual([row.pk for batch in batches for row in batch], self.pks)
+
+    def test_handler_may_delete_its_batch(self):
+        """Test deleting rows inside the handler neither skips nor repeats rows"""
+        seen = []
+
+        def handle(batch):
+            seen.extend(row.pk for row in batch)
+            Expense.objects.filter(pk__in=[row.pk for row in batch[::2]]).delete()
+
+        run_in_batches(Expense.objects.all(), handle, batch_size=10, stdout=io.StringIO())
+
+        self.assertEqual(seen, self.pks)
+        self.assertEqual(Expense.objects.count(), 12)
+
+    def test_counts_summed_and_progress_written(self):
+        """Test handler counts are summed across batches and each batch reports progress"""
+        def handle(batch):
+            for row in batch:
+                row.category = 'Coffee'
+            Expense.objects.bulk_update(batch, ['category'])
+            return {'updated': len(batch)}
+
+        out = io.StringIO()
+        totals = run_in_batches(Expense.objects.all(), handle, batch_size=10, stdout=out)
+
+        self.assertEqual(totals, {'updated': 25, 'rows': 25})
+        self.assertEqual(Expense.objects.filter(category='Coffee').count(), 25)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('expenses: 25/25 rows (100%)', lines[-1])
+
+    def test_queries_per_batch_not_per_row(self):
+        """Test the query count depends on the number of batches only"""
+        def handle(batch):
+            Expense.objects.bulk_update(batch, ['category'])
+
+        queries = count_queries(
+            lambda: run_in_batches(Expense.objects.all(), handle, batch_size=10, stdout=io.StringIO())
+        )
+
+        # count + 3 x (select + bulk update)
+        self.assertEqual(len(queries), 7)
+
+    def test_empty_queryset(self):
+        """Test an empty queryset runs only the count"""
+        out = io.StringIO()
+
+        queries = count_queries(
+            lambda: run_in_batches(Expense.objects.none(), lambda batch: None, stdout=out)
+        )
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(out.getvalue(), '')
+
+
+class UserForeignKeyDataMigrationTest(TestCase):
+    """Test migrate_user_ids_to_foreign_key against the models as of 0002."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        loader = MigrationLoader(connection)
+        cls.apps = loader.project_state(('auth_app', '0002_remove_expense_user_id_expense_user')).apps
+        cls.migration = importlib.import_module(MIGRATION)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner@example.com', email='owner@example.com')
+
+    def seed(self, rows: int) -> None:
+        """Add rows owned expenses plus two orphans: no user, and a user that does not exist."""
+        Expense.objects.bulk_create(
+            [Expense(user=self.user, amount=index + 1, category='Food') for index in range(rows)]
+            + [Expense(user=None, amount=1, category='Food'), Expense(user_id=999999, amount=1, category='Food')]
+        )
+
+    def migrate(self) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.migration.migrate_user_ids_to_foreign_key(self.apps, None)
+        return out.getvalue()
+
+    def test_orphans_deleted_and_owned_kept(self):
+        """Test owned expenses keep their user and orphans are deleted with a warning"""
+        self.seed(3)
+
+        output = self.migrate()
+
+        self.assertEqual(list(Expense.objects.values_list('user_id', flat=True)), [self.user.pk] * 3)
+        self.assertIn("invalid user_id='None'", output)
+        self.assertIn("user_id='999999' (user not found)", output)
+        self.assertIn('Migrated: 3 expenses to User ForeignKey', output)
+        self.assertIn('Deleted: 2 orphaned expenses', output)
+
+    def test_query_count_independent_of_rows(self):
+        """Test one batch costs the same queries for 3 or 300 expenses"""
+        counts = []
+        for rows in (3, 300):
+            Expense.objects.all().delete()
+            self.seed(rows)
+            with redirect_stdout(io.StringIO()):
+                counts.append(len(count_queries(lambda: self.migration.migrate_user_ids_to_foreign_key(self.apps, None))))
+
+        # count, select, user in_bulk, orphan delete
+        self.assertEqual(counts, [4, 4])
+
+    def test_reverse_keeps_user(self):
+        """Test the reverse step leaves each expense's user in place"""
+        self.seed(3)
+        self.migrate()
+
+        with redirect_stdout(io.StringIO()):
+            self.migration.reverse_migrate(self.apps, None)
+
+        self.assertEqual(list(Expense.objects.values_list('user_id', flat=True)), [self.user.pk] * 3)
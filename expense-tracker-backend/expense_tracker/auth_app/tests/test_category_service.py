@@ -0,0 +1,104 @@
+"""Unit tests for category_service module (CategoryDictionary, CategoryIndex)."""
+
+from unittest.mock import Mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from auth_app.services.category_service import CategoryDictionary, CategoryIndex
+
+
+class CategoryDictionaryTest(SimpleTestCase):
+    """Test sorted-array prefix lookups."""
+
+    def setUp(self):
+        self.dictionary = CategoryDictionary({
+            'Food': 5,
+            'Fuel': 9,
+            'Furniture': 1,
+            'Travel': 3,
+        })
+
+    def test_lookup_prefix_most_used_first(self):
+        """Test prefix lookup orders matches by usage"""
+        result = self.dictionary.lookup('fu', 10)
+
+        self.assertEqual([c['name'] for c in result], ['Fuel', 'Furniture'])
+        self.assertEqual(result[0]['count'], 9)
+
+    def test_lookup_is_case_insensitive(self):
+        """Test prefix lookup ignores case"""
+        self.assertEqual(self.dictionary.lookup('TRA', 10), [{'name': 'Travel', 'count': 3}])
+
+    def test_lookup_empty_prefix_returns_all(self):
+        """Test empty prefix returns every category up to the limit"""
+        result = self.dictionary.lookup('', 2)
+
+        self.assertEqual([c['name'] for c in result], ['Fuel', 'Food'])
+
+    def test_lookup_no_match(self):
+        """Test unknown prefix returns nothing"""
+        self.assertEqual(self.dictionary.lookup('zz', 10), [])
+
+    def test_lookup_non_bmp_characters(self):
+        """Test names continuing with characters beyond U+FFFF still match the prefix"""
+        self.dictionary.add('Fun \U0001F3AE', 2)
+        self.dictionary.add('Fu\U0001F354', 4)
+
+        result = self.dictionary.lookup('fu', 10)
+
+        self.assertEqual(
+            [c['name'] for c in result], ['Fuel', 'Fu\U0001F354', 'Fun \U0001F3AE', 'Furniture']
+        )
+
+    def test_add_existing_and_new(self):
+        """Test adding increments existing names and inserts new ones in order"""
+        self.dictionary.add('Food')
+        self.dictionary.add('Fitness')
+
+        self.assertEqual(self.dictionary.lookup('foo', 10), [{'name': 'Food', 'count': 6}])
+        self.assertEqual(self.dictionary.lookup('fi', 10), [{'name': 'Fitness', 'count': 1}])
+        self.assertEqual(self.dictionary.keys, sorted(self.dictionary.keys))
+
+
+class CategoryIndexTest(SimpleTestCase):
+    """Test cached dictionaries maintained on write."""
+
+    def setUp(self):
+        cache.clear()
+        self.index = CategoryIndex(timeout=60)
+        self.loader = Mock(return_value={'Food': 2})
+
+    def test_suggest_loads_once(self):
+        """Test the repository is only queried on a cache miss"""
+        self.index.suggest(1, 'f', self.loader)
+        result = self.index.suggest(1, 'f', self.loader)
+
+        self.assertEqual(result, [{'name': 'Food', 'count': 2}])
+        self.loader.assert_called_once_with(1)
+
+    def test_record_drops_cached_dictionary(self):
+        """Test a write makes the next lookup reload the counts"""
+        self.index.suggest(1, '', self.loader)
+        self.loader.return_value = {'Food': 3, 'Fees': 1}
+        self.index.record(1)
+
+        result = self.index.suggest(1, 'f', self.loader)
+
+        self.assertEqual(result, [{'name': 'Food', 'count': 3}, {'name': 'Fees', 'count': 1}])
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_record_without_cached_dictionary(self):
+        """Test writes for uncached users do not populate the cache"""
+        self.index.record(1)
+
+        self.index.suggest(1, '', self.loader)
+        self.loader.assert_called_once_with(1)
+
+    def test_invalidate(self):
+        """Test invalidation forces a reload"""
+        self.index.suggest(1, '', self.loader)
+        self.index.invalidate(1)
+        self.index.suggest(1, '', self.loader)
+
+        self.assertEqual(self.loader.call_count, 2)
@@ -0,0 +1,111 @@
+"""Unit tests for event_service module (in-process broker and SSE encoding)."""
+
+import asyncio
+import json
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_app.services import event_service
+from auth_app.services.event_service import (
+    EVENT_CREATED,
+    InProcessEventBroker,
+    RedisEventBroker,
+    encode_sse,
+    get_event_broker,
+    publish_expense_event,
+)
+
+
+class InProcessEventBrokerTest(SimpleTestCase):
+    """Test the in-process broker."""
+
+    def setUp(self):
+        self.broker = InProcessEventBroker(queue_size=2)
+
+    def test_delivers_to_user_subscribers(self):
+        """Test events published from another thread reach only that user's subscriber"""
+        async def scenario():
+            events = self.broker.listen(1)
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0)
+
+            thread = threading.Thread(target=lambda: (
+                self.broker.publish(2, {'type': 'other'}),
+                self.broker.publish(1, {'type': EVENT_CREATED}),
+            ))
+            thread.start()
+            thread.join()
+
+            event = await asyncio.wait_for(pending, 1)
+            await events.aclose()
+            return event
+
+        self.assertEqual(asyncio.run(scenario()), {'type': EVENT_CREATED})
+        self.assertEqual(self.broker.subscriber_count(1), 0)
+
+    def test_heartbeat_when_idle(self):
+        """Test None is yielded after the heartbeat interval without events"""
+        async def scenario():
+            events = self.broker.listen(1, heartbeat=0.01)
+            event = await events.__anext__()
+            await events.aclose()
+            return event
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+    def test_slow_subscriber_keeps_latest(self):
+        """Test a full queue drops the oldest events"""
+        async def scenario():
+            events = self.broker.listen(1)
+            first = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0)
+            for number in range(4):
+                self.broker.publish(1, {'type': 'n', 'number': number})
+            await asyncio.sleep(0)
+            received = [await first, await events.__anext__()]
+            await events.aclose()
+            return [event['number'] for event in received]
+
+        self.assertEqual(asyncio.run(scenario()), [2, 3])
+
+
+class EventHelpersTest(SimpleTestCase):
+    """Test SSE encoding, broker selection and publishing."""
+
+    def tearDown(self):
+        event_service._event_broker = None
+
+    def test_encode_sse(self):
+        """Test events are framed with their type and JSON data"""
+        message = encode_sse({'type': EVENT_CREATED, 'expense': {'amount': Decimal('2.5')}})
+
+        self.assertTrue(message.startswith(b'event: expense.created\ndata: '))
+        self.assertTrue(message.endswith(b'\n\n'))
+        self.assertEqual(json.loads(message.split(b'data: ')[1])['expense'], {'amount': 2.5})
+        self.assertEqual(encode_sse(None), b': keep-alive\n\n')
+
+    def test_get_event_broker_default(self):
+        """Test the in-process broker is used without EVENT_BROKER_URL"""
+        event_service._event_broker = None
+        with override_settings(EVENT_BROKER_URL=''):
+            self.assertIsInstance(get_event_broker(), InProcessEventBroker)
+
+    def test_get_event_broker_redis(self):
+        """Test a Redis URL selects the Redis broker"""
+        event_service._event_broker = None
+        with override_settings(EVENT_BROKER_URL='redis://localhost:6379/0'):
+            self.assertIsInstance(get_event_broker(), RedisEventBroker)
+
+    def test_publish_failure_is_swallowed(self):
+        """Test broker errors don't propagate into the write path"""
+        with patch.object(event_service, 'get_event_broker') as mock_get_broker:
+            mock_get_broker.return_value.publish.side_effect = ConnectionError('down')
+
+            publish_expense_event(1, EVENT_CREATED, expense={})
+
+        mock_get_broker.return_value.publish.assert_called_once_with(
+            1, {'type': EVENT_CREATED, 'expense': {}}
+        )
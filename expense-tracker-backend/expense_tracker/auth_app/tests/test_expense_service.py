@@ -0,0 +1,84 @@
+"""Unit tests for expense_service module (ExpenseFilters parsing)."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from auth_app.services.expense_service import ExpenseFilters, parse_fields
+
+
+class ExpenseFiltersTest(SimpleTestCase):
+    """Test building list filters from query parameters."""
+
+    def test_defaults(self):
+        """Test empty parameters mean no filtering, newest first"""
+        filters = ExpenseFilters.from_params({})
+
+        self.assertEqual(filters, ExpenseFilters())
+        self.assertEqual(filters.sort_field, 'timestamp')
+        self.assertTrue(filters.sort_descending)
+
+    def test_parses_all_parameters(self):
+        """Test every supported parameter is parsed"""
+        filters = ExpenseFilters.from_params({
+            'category': 'Food',
+            'from': '2025-01-01',
+            'to': '2025-01-31',
+            'min_amount': '5',
+            'max_amount': '10.50',
+            'q': ' pizza ',
+            'sort': 'amount_asc',
+        })
+
+        self.assertEqual(filters.category, 'Food')
+        self.assertEqual(filters.date_from, datetime(2025, 1, 1, tzinfo=timezone.utc))
+        # A bare 'to' date includes the whole day
+        self.assertEqual(
+            filters.date_to, datetime(2025, 1, 31, 23, 59, 59, 999999, tzinfo=timezone.utc)
+        )
+        self.assertEqual(filters.min_amount, Decimal('5'))
+        self.assertEqual(filters.max_amount, Decimal('10.50'))
+        self.assertEqual(filters.q, 'pizza')
+        self.assertEqual(filters.sort_field, 'amount')
+        self.assertFalse(filters.sort_descending)
+
+    def test_datetime_bounds_converted_to_utc(self):
+        """Test datetimes with offsets are normalized to UTC"""
+        filters = ExpenseFilters.from_params({'from': '2025-01-01T10:00:00+02:00'})
+
+        self.assertEqual(filters.date_from, datetime(2025, 1, 1, 8, tzinfo=timezone.utc))
+
+    def test_invalid_values(self):
+        """Test malformed parameters raise ValueError"""
+        for params in [
+            {'from': 'yesterday'},
+            {'to': '2025-13-01'},
+            {'min_amount': 'ten'},
+            {'max_amount': 'NaN'},
+            {'sort': 'category'},
+        ]:
+            with self.subTest(params=params):
+                with self.assertRaises(ValueError):
+                    ExpenseFilters.from_params(params)
+
+
+class ParseFieldsTest(SimpleTestCase):
+    """Test sparse fieldset parsing."""
+
+    def test_no_fields_means_all(self):
+        """Test missing parameter selects every field"""
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields(''))
+
+    def test_fields_in_canonical_order_with_id(self):
+        """Test requested fields are ordered and always include expense_id"""
+        self.assertEqual(
+            parse_fields('timestamp, amount,category'),
+            ('expense_id', 'amount', 'category', 'timestamp'),
+        )
+
+    def test_unknown_field(self):
+        """Test unknown fields raise ValueError"""
+        with self.assertRaises(ValueError):
+            parse_fields('amount,password')
@@ -0,0 +1,112 @@
+"""Startup import budget, measured with ``python -X importtime`` in a fresh interpreter."""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+from django.test import SimpleTestCase
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+
+# What a local worker does before serving its first request
+STARTUP_CODE = 'from expense_tracker.wsgi import application; import expense_tracker.urls'
+
+# Packages only the cloud implementations may load, on first use
+FORBIDDEN_PREFIXES = ('boto3', 'botocore', 's3transfer', 'google.cloud')
+
+# Cumulative top-level import time allowed for startup; override on slow machines
+DEFAULT_BUDGET_MS = 1000
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+
+def parse_importtime(output: str) -> Tuple[Dict[str, int], int]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        (cumulative microseconds per imported module, total microseconds of
+        the top-level imports, which include everything they imported)
+    """
+    modules = {}
+    total = 0
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative = int(match.group(2))
+        modules[match.group(4)] = cumulative
+        if len(match.group(3)) == 1:
+            total += cumulative
+    return modules, total
+
+
+def measure_startup() -> Tuple[Dict[str, int], int]:
+    """Import the app in a fresh interpreter and parse the timings."""
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='expense_tracker.settings.local',
+        DJANGO_SECRET_KEY=os.environ.get('DJANGO_SECRET_KEY', 'import-time-test'),
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+class ParseImporttimeTest(SimpleTestCase):
+    """Test the -X importtime parser."""
+
+    def test_parse(self):
+        """Test per-module and top-level totals"""
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 |   child',
+            'import time:        50 |        150 | parent',
+            'INFO:root:unrelated log line',
+            'import time:        20 |         20 | other',
+        ])
+
+        modules, total = parse_importtime(output)
+
+        self.assertEqual(modules, {'child': 100, 'parent': 150, 'other': 20})
+        self.assertEqual(total, 170)
+
+
+class StartupImportBudgetTest(SimpleTestCase):
+    """Fail when local startup starts importing heavy modules or gets slower."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Best of three runs to keep scheduler noise out of the budget check
+        cls.runs = [measure_startup() for _ in range(3)]
+
+    def test_cloud_sdks_not_imported(self):
+        """Test boto3/botocore and Google Cloud clients stay unloaded in local mode"""
+        modules, _ = self.runs[0]
+
+        loaded = sorted(
+            name for name in modules
+            if any(name == prefix or name.startswith(prefix + '.') for prefix in FORBIDDEN_PREFIXES)
+        )
+        self.assertEqual(loaded, [])
+
+    def test_within_budget(self):
+        """Test total startup import time stays under IMPORT_TIME_BUDGET_MS"""
+        budget_ms = int(os.environ.get('IMPORT_TIME_BUDGET_MS', DEFAULT_BUDGET_MS))
+        best_ms = min(total for _, total in self.runs) / 1000
+
+        self.assertLess(
+            best_ms, budget_ms,
+            f'Startup imports took {best_ms:.0f}ms (budget {budget_ms}ms); '
+            f'run `python -X importtime -c "{STARTUP_CODE}"` to find the new cost',
+        )
@@ -0,0 +1,218 @@
+"""Unit tests for the mmap-backed metrics, their middleware and the /api/metrics/ endpoint."""
+
+import os
+import tempfile
+import threading
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django_ratelimit.exceptions import Ratelimited
+
+from auth_app.middleware import MetricsMiddleware
+from utils import metrics
+from utils.perf import TimedProxy
+
+# Registered once at import; REGISTRY is process-wide
+TEST_COUNTER = metrics.Counter('test_events', 'Events seen by the tests.', ['kind'])
+TEST_HISTOGRAM = metrics.Histogram('test_latency_seconds', 'Test latency.', ['op'], buckets=(0.1, 1.0))
+TEST_SERVICE_HISTOGRAM = metrics.Histogram('test_service_seconds', 'Test service latency.', ['service', 'operation'])
+
+
+class MetricsTestMixin:
+    """Record into a fresh temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self.addCleanup(metrics.configure, False)
+        metrics.configure(True, self._directory.name)
+
+    def totals(self):
+        return metrics.collect(self._directory.name)
+
+
+class MetricsTest(MetricsTestMixin, SimpleTestCase):
+    """Test counters, histograms, aggregation and rendering."""
+
+    def test_counter(self):
+        """Test counter increments are summed per label set"""
+        TEST_COUNTER.inc(kind='a')
+        TEST_COUNTER.inc(2, kind='a')
+        TEST_COUNTER.inc(kind='b')
+
+        totals = self.totals()
+        self.assertEqual(totals[('test_events_total', (('kind', 'a'),))], 3)
+        self.assertEqual(totals[('test_events_total', (('kind', 'b'),))], 1)
+
+    def test_wrong_labels(self):
+        """Test missing or extra labels are rejected"""
+        with self.assertRaises(ValueError):
+            TEST_COUNTER.inc(other='a')
+
+    def test_disabled_is_noop(self):
+        """Test nothing is written while metrics are disabled"""
+        metrics.configure(False, self._directory.name)
+        TEST_COUNTER.inc(kind='a')
+
+        self.assertEqual(os.listdir(self._directory.name), [])
+
+    def test_aggregates_threads(self):
+        """Test each thread writes its own file and collect() sums them"""
+        barrier = threading.Barrier(4)
+
+        def work():
+            for _ in range(100):
+                TEST_COUNTER.inc(kind='threads')
+            # Keep every thread alive so none continues another's file
+            barrier.wait()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(os.listdir(self._directory.name)), 4)
+        self.assertEqual(self.totals()[('test_events_total', (('kind', 'threads'),))], 400)
+
+    def test_thread_churn_reuses_files(self):
+        """Test threads that have exited hand their file to the next thread"""
+        def work():
+            TEST_COUNTER.inc(kind='churn')
+
+        for _ in range(10):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(os.listdir(self._directory.name)), 1)
+        self.assertEqual(self.totals()[('test_events_total', (('kind', 'churn'),))], 10)
+
+    def test_file_grows(self):
+        """Test the sample file is enlarged when entries no longer fit"""
+        for index in range(3000):
+            TEST_COUNTER.inc(kind=f'label-{index}')
+
+        totals = self.totals()
+        self.assertEqual(len([key for key in totals if key[0] == 'test_events_total']), 3000)
+        self.assertEqual(totals[('test_events_total', (('kind', 'label-2999'),))], 1)
+
+    def test_reopen_keeps_values(self):
+        """Test a reopened sample file continues from its stored values"""
+        filename = os.path.join(self._directory.name, 'reopen.db')
+        samples = metrics.MmapSamples(filename)
+        samples.inc('key', 2.5)
+        samples.close()
+
+        samples = metrics.MmapSamples(filename)
+        samples.inc('key', 1)
+        samples.close()
+
+        self.assertEqual(metrics.MmapSamples.read(filename), [('key', 3.5)])
+
+    def test_render_histogram(self):
+        """Test histogram buckets are rendered cumulatively with sum and count"""
+        TEST_HISTOGRAM.observe(0.05, op='get')
+        TEST_HISTOGRAM.observe(0.5, op='get')
+        TEST_HISTOGRAM.observe(5, op='get')
+
+        text = metrics.render(self._directory.name)
+
+        self.assertIn('# TYPE test_latency_seconds histogram', text)
+        self.assertIn('test_latency_seconds_bucket{op="get",le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{op="get",le="1.0"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{op="get",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_sum{op="get"} 5.55', text)
+        self.assertIn('test_latency_seconds_count{op="get"} 3', text)
+
+    def test_render_escapes_labels(self):
+        """Test label values are escaped"""
+        TEST_COUNTER.inc(kind='say "hi"')
+
+        self.assertIn('test_events_total{kind="say \\"hi\\""} 1', metrics.render(self._directory.name))
+
+    def test_clear_metrics_dir(self):
+        """Test sample files are removed"""
+        TEST_COUNTER.inc(kind='a')
+        metrics.clear_metrics_dir(self._directory.name)
+
+        self.assertEqual(self.totals(), {})
+
+    def test_timed_proxy_histogram(self):
+        """Test TimedProxy observes each call outside of a request"""
+        class Service:
+            def get(self):
+                return 1
+
+        proxy = TimedProxy(Service(), 'repo', histogram=TEST_SERVICE_HISTOGRAM)
+        proxy.get()
+        proxy.get()
+
+        labels = (('operation', 'get'), ('service', 'repo'))
+        self.assertEqual(self.totals()[('test_service_seconds_count', labels)], 2)
+
+
+class MetricsMiddlewareTest(MetricsTestMixin, SimpleTestCase):
+    """Test MetricsMiddleware."""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def test_not_used_when_disabled(self):
+        """Test the middleware removes itself unless metrics are enabled"""
+        metrics.configure(False)
+
+        with self.assertRaises(MiddlewareNotUsed):
+            MetricsMiddleware(lambda request: HttpResponse())
+
+    def test_observes_request(self):
+        """Test latency and status are recorded under the URL name"""
+        request = self.factory.get('/api/healthz/')
+        request.resolver_match = type('Match', (), {'url_name': 'healthz', 'view_name': 'healthz'})()
+        middleware = MetricsMiddleware(lambda request: HttpResponse(status=204))
+
+        middleware(request)
+
+        totals = self.totals()
+        labels = (('method', 'GET'), ('view', 'healthz'))
+        self.assertEqual(totals[('http_request_duration_seconds_count', labels)], 1)
+        self.assertEqual(totals[('http_requests_total', labels[:1] + (('status', '204'),) + labels[1:])], 1)
+
+    def test_counts_ratelimit(self):
+        """Test Ratelimited exceptions are counted per view"""
+        middleware = MetricsMiddleware(lambda request: HttpResponse())
+
+        middleware.process_exception(self.factory.get('/'), Ratelimited())
+
+        self.assertEqual(self.totals()[('ratelimit_rejections_total', (('view', 'unmatched'),))], 1)
+
+
+class MetricsViewTest(MetricsTestMixin, TestCase):
+    """Test the metrics endpoint."""
+
+    def test_not_found_when_disabled(self):
+        """Test the endpoint is hidden unless metrics are enabled"""
+        metrics.configure(False)
+
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+    def test_renders_metrics(self):
+        """Test metrics are rendered in the Prometheus text format"""
+        TEST_COUNTER.inc(kind='view')
+
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn('test_events_total{kind="view"} 1', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        """Test the bearer token is required when configured"""
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 401)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
@@ -0,0 +1,232 @@
+"""Unit tests for API middleware (response compression and Server-Timing)."""
+
+import asyncio
+import gzip
+import json
+
+import brotli
+import zstandard
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from auth_app.middleware import CompressionMiddleware, ServerTimingMiddleware
+from auth_app.middleware.compression import choose_encoding, parse_accept_encoding
+from auth_app.services import FastJsonResponse
+from utils import perf
+
+PAYLOAD = {
+    'expenses': [
+        {'expense_id': str(i), 'amount': 12.5, 'category': 'Food', 'receipt_url': None}
+        for i in range(200)
+    ]
+}
+
+
+def decompress(encoding, data):
+    if encoding == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return gzip.decompress(data)
+
+
+class NegotiationTest(SimpleTestCase):
+    """Test Accept-Encoding parsing and encoding selection."""
+
+    def test_parse_quality_values(self):
+        """Test q-values are parsed and default to 1"""
+        self.assertEqual(
+            parse_accept_encoding('gzip, br;q=0.5, zstd;q=x'),
+            {'gzip': 1.0, 'br': 0.5, 'zstd': 0.0},
+        )
+
+    def test_server_preference_breaks_ties(self):
+        """Test the first server encoding wins among equal q-values"""
+        self.assertEqual(choose_encoding('gzip, deflate, br, zstd', ['zstd', 'br', 'gzip']), 'zstd')
+        self.assertEqual(choose_encoding('gzip, br', ['zstd', 'br', 'gzip']), 'br')
+
+    def test_client_quality_wins(self):
+        """Test a higher client q-value beats server preference"""
+        self.assertEqual(choose_encoding('br;q=0.5, gzip', ['br', 'gzip']), 'gzip')
+
+    def test_wildcard_and_refusal(self):
+        """Test '*' matches any encoding and q=0 refuses it"""
+        self.assertEqual(choose_encoding('*', ['br', 'gzip']), 'br')
+        self.assertEqual(choose_encoding('*, br;q=0', ['br', 'gzip']), 'gzip')
+        self.assertIsNone(choose_encoding('identity', ['br', 'gzip']))
+        self.assertIsNone(choose_encoding('', ['br', 'gzip']))
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    """Test CompressionMiddleware response handling."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _process(self, response, accept='gzip, deflate, br, zstd'):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get('/api/expenses/list/', HTTP_ACCEPT_ENCODING=accept))
+
+    def test_compresses_json_with_each_encoding(self):
+        """Test JSON lists are compressed with the negotiated encoding"""
+        original = JsonResponse(PAYLOAD).content
+        for encoding in ('zstd', 'br', 'gzip'):
+            with self.subTest(encoding=encoding):
+                response = self._process(JsonResponse(PAYLOAD), accept=encoding)
+
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(int(response['Content-Length']), len(response.content))
+                self.assertLess(len(response.content), len(original))
+                self.assertEqual(decompress(encoding, response.content), original)
+
+    def test_small_response_not_compressed(self):
+        """Test bodies under the size threshold are sent as-is"""
+        response = self._process(JsonResponse({'status': 'ok'}))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESSION_MIN_SIZE=10)
+    def test_threshold_setting(self):
+        """Test COMPRESSION_MIN_SIZE lowers the threshold"""
+        response = self._process(HttpResponse(b'a' * 100, content_type='text/plain'))
+
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+
+    def test_skips_compressed_content_types(self):
+        """Test receipt images and PDFs are not recompressed"""
+        for content_type in ('image/jpeg', 'application/pdf'):
+            with self.subTest(content_type=content_type):
+                response = self._process(HttpResponse(b'x' * 5000, content_type=content_type))
+
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_skips_encoded_responses_and_cookies(self):
+        """Test already-encoded responses and responses setting cookies are untouched"""
+        encoded = HttpResponse(b'x' * 5000)
+        encoded['Content-Encoding'] = 'gzip'
+        with_cookie = JsonResponse(PAYLOAD)
+        with_cookie.set_cookie('csrftoken', 'secret')
+
+        self.assertEqual(self._process(encoded).content, b'x' * 5000)
+        self.assertFalse(self._process(with_cookie).has_header('Content-Encoding'))
+
+    def test_no_acceptable_encoding(self):
+        """Test identity clients get the original body with Vary set"""
+        response = self._process(JsonResponse(PAYLOAD), accept='identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(response.content), PAYLOAD)
+
+    def test_weakens_etag(self):
+        """Test strong ETags are weakened on compressed responses"""
+        response = JsonResponse(PAYLOAD)
+        response['ETag'] = '"abc"'
+
+        self.assertEqual(self._process(response)['ETag'], 'W/"abc"')
+
+    def test_streaming_response(self):
+        """Test streaming bodies are compressed chunk by chunk"""
+        chunks = [b'{"chunk": %d}\n' % i * 50 for i in range(5)]
+        response = self._process(StreamingHttpResponse(iter(chunks)), accept='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    def test_async_streaming_response(self):
+        """Test async streaming bodies are compressed"""
+        chunks = [b'data: %d\n' % i * 50 for i in range(3)]
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        response = self._process(StreamingHttpResponse(stream()), accept='br')
+
+        async def collect():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(asyncio.run(collect())), b''.join(chunks))
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingMiddlewareTest(TestCase):
+    """Test ServerTimingMiddleware headers and logging."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_disabled_by_default(self):
+        """Test the middleware removes itself unless SERVER_TIMING is set"""
+        with override_settings(SERVER_TIMING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ServerTimingMiddleware(lambda request: HttpResponse())
+
+    def test_reports_db_service_and_serialization(self):
+        """Test queries, proxied service calls and serialization appear in the header"""
+        service = perf.TimedProxy(type('Repo', (), {'count': lambda self: User.objects.count()})(), 'repo')
+
+        def view(request):
+            return FastJsonResponse({'count': service.count()})
+
+        with self.assertLogs('auth_app.middleware.server_timing', 'INFO') as logs:
+            response = ServerTimingMiddleware(view)(self.factory.get('/api/expenses/'))
+
+        header = response['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="1 queries", repo;dur=[\d.]+;desc="1 calls", ')
+        self.assertIn('serialize;dur=', header)
+        self.assertRegex(header, r'total;dur=[\d.]+$')
+        self.assertIn('GET /api/expenses/ 200 db_ms=', logs.output[0])
+        self.assertEqual(logs.records[0].timings['db_calls'], 1)
+        self.assertIsNone(perf.current_timings())
+
+    def test_async(self):
+        """Test async chains are timed, including ORM calls made in worker threads"""
+        from asgiref.sync import sync_to_async
+
+        async def view(request):
+            await sync_to_async(User.objects.count)()
+            return HttpResponse()
+
+        middleware = ServerTimingMiddleware(view)
+        response = asyncio.run(middleware(self.factory.get('/')))
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+
+class PerfTest(SimpleTestCase):
+    """Test the timing collector and proxies."""
+
+    def test_no_op_outside_request(self):
+        """Test helpers don't record without an active collector"""
+        with perf.timed('work'):
+            pass
+        perf.record('work', 1)
+
+        self.assertIsNone(perf.current_timings())
+
+    def test_timed_proxy(self):
+        """Test sync and async methods are timed and isinstance still works"""
+        class Service:
+            label = 'value'
+
+            def work(self):
+                return 1
+
+            async def awork(self):
+                return 2
+
+        proxy = perf.TimedProxy(Service(), 'svc')
+        token = perf.start_request()
+        self.assertEqual(proxy.work(), 1)
+        self.assertEqual(asyncio.run(proxy.awork()), 2)
+        timings = perf.end_request(token)
+
+        self.assertIsInstance(proxy, Service)
+        self.assertEqual(proxy.label, 'value')
+        self.assertEqual([(name, count) for name, _, count in timings.items()], [('svc', 2)])
@@ -0,0 +1,205 @@
+"""Tests for the migrate_expenses management command (ORM <-> DynamoDB on moto)."""
+
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import boto3
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from moto import mock_aws
+
+from auth_app.management.commands.migrate_expenses import RateLimiter, row_digest
+from auth_app.models import Expense
+from cloud_app.implementations.utils.aws_clients import client_provider
+
+CREDENTIALS = {
+    'region_name': 'us-east-1',
+    'aws_access_key_id': 'testing',
+    'aws_secret_access_key': 'testing',
+}
+TABLE = 'expenses-migration-test'
+
+
+@mock_aws
+@override_settings(
+    AWS_REGION=CREDENTIALS['region_name'],
+    AWS_ACCESS_KEY_ID=CREDENTIALS['aws_access_key_id'],
+    AWS_SECRET_ACCESS_KEY=CREDENTIALS['aws_secret_access_key'],
+    DYNAMODB_ENDPOINT_URL=None,
+    DYNAMODB_TABLE_NAME=TABLE,
+)
+class MigrateExpensesTest(TransactionTestCase):
+    """Copy in both directions; workers run in threads, so rows must be committed."""
+
+    def setUp(self):
+        client_provider.reset()
+        self.addCleanup(client_provider.reset)
+        self.table = boto3.resource('dynamodb', **CREDENTIALS).create_table(
+            TableName=TABLE,
+            KeySchema=[{'AttributeName': 'expense_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'expense_id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        self.user = User.objects.create_user(username='owner@example.com', email='owner@example.com')
+        self.other = User.objects.create_user(username='other@example.com', email='other@example.com')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint.json')
+
+    def migrate(self, *args, **options) -> str:
+        out = io.StringIO()
+        call_command('migrate_expenses', *args, stdout=out, checkpoint=self.checkpoint, **options)
+        return out.getvalue()
+
+    def seed_orm(self, rows: int) -> None:
+        Expense.objects.bulk_create(
+            Expense(user=user, amount=Decimal('10.25') + index, category='Food', description=f'lunch {index}')
+            for user in (self.user, self.other)
+            for index in range(rows)
+        )
+
+    def put_item(self, expense_id: str, user_id: str, timestamp: str = '2024-03-01T12:30:00.123456', **item):
+        self.table.put_item(Item={
+            'expense_id': expense_id,
+            'user_id': user_id,
+            'amount': Decimal('12.5'),
+            'category': 'Food',
+            'description': '',
+            'timestamp': timestamp,
+            'receipt_url': None,
+            'updated_at': timestamp,
+            **item,
+        })
+
+    def test_orm_to_dynamodb(self):
+        """Test expenses are copied keyed by their ORM id and verified"""
+        self.seed_orm(7)
+        Expense.objects.create(user=None, amount=1, category='Food')
+
+        output = self.migrate('--from', 'orm', '--to', 'dynamodb', batch_size=3, workers=2)
+
+        self.assertIn('Copied 14 expenses', output)
+        self.assertIn('Verified 14 expenses for 2 users', output)
+        expense = Expense.objects.filter(user=self.user).earliest('pk')
+        item = self.table.get_item(Key={'expense_id': str(expense.pk)})['Item']
+        self.assertEqual(item['user_id'], str(self.user.pk))
+        self.assertEqual(item['amount'], Decimal('10.25'))
+        self.assertEqual(item['timestamp'], expense.timestamp.astimezone(timezone.utc).replace(tzinfo=None).isoformat())
+        self.assertEqual(json.load(open(self.checkpoint))['last_pk'], Expense.objects.filter(user__isnull=False).latest('pk').pk)
+
+    def test_dynamodb_to_orm(self):
+        """Test items are inserted with their timestamps and unknown users are skipped"""
+        for index in range(5):
+            self.put_item(f'id-{index}', str(self.user.pk), receipt_url='https://example.com/r.jpg')
+        self.put_item('stranger', '999999')
+
+        with self.assertRaisesMessage(CommandError, '1 user(s) differ'):
+            # The stranger's expense cannot be copied, so verification fails
+            self.migrate('--from', 'dynamodb', '--to', 'orm', batch_size=2, workers=3)
+
+        expenses = Expense.objects.filter(user=self.user)
+        self.assertEqual(expenses.count(), 5)
+        self.assertEqual(
+            set(expenses.values_list('timestamp', flat=True)),
+            {datetime(2024, 3, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)},
+        )
+        self.assertEqual(json.load(open(self.checkpoint))['skipped'], 1)
+
+    def test_dynamodb_to_orm_resume_skips_committed_page(self):
+        """Test a page committed before its checkpoint was saved is not inserted twice"""
+        for index in range(4):
+            self.put_item(f'id-{index}', str(self.user.pk))
+        self.migrate('--from', 'dynamodb', '--to', 'orm', workers=1)
+        # As if the run stopped right after committing the segment's only page
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'source': 'dynamodb', 'target': 'orm', 'copied': 0, 'skipped': 0, 'total_segments': 1}, f)
+
+        output = self.migrate('--from', 'dynamodb', '--to', 'orm', '--resume', workers=1)
+
+        self.assertIn('Copied 0 expenses', output)
+        self.assertIn('Verified 4 expenses for 1 users', output)
+        self.assertEqual(Expense.objects.count(), 4)
+
+    def test_resume_continues_after_checkpoint(self):
+        """Test --resume copies only rows after the checkpointed primary key"""
+        self.seed_orm(3)
+        pks = list(Expense.objects.order_by('pk').values_list('pk', flat=True))
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'source': 'orm', 'target': 'dynamodb', 'copied': 2, 'skipped': 0, 'last_pk': pks[1]}, f)
+
+        output = self.migrate('--from', 'orm', '--to', 'dynamodb', '--resume', '--no-verify')
+
+        self.assertIn('Copied 6 expenses', output)
+        copied = {item['expense_id'] for item in self.table.scan()['Items']}
+        self.assertEqual(copied, {str(pk) for pk in pks[2:]})
+
+    def test_resume_rejects_other_direction(self):
+        """Test a checkpoint for the other direction is refused"""
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'source': 'dynamodb', 'target': 'orm', 'copied': 0, 'skipped': 0}, f)
+
+        with self.assertRaisesMessage(CommandError, 'dynamodb -> orm'):
+            self.migrate('--from', 'orm', '--to', 'dynamodb', '--resume')
+
+    def test_verify_only_reports_changed_expense(self):
+        """Test a changed amount fails verification for that user only"""
+        self.seed_orm(2)
+        self.migrate('--from', 'orm', '--to', 'dynamodb')
+        expense = Expense.objects.filter(user=self.other).first()
+        self.table.update_item(
+            Key={'expense_id': str(expense.pk)},
+            UpdateExpression='SET amount = :amount',
+            ExpressionAttributeValues={':amount': Decimal('99')},
+        )
+
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 user(s) differ'):
+            call_command('migrate_expenses', '--from', 'orm', '--to', 'dynamodb', '--verify-only', stdout=out)
+        self.assertIn(f'user {self.other.pk}: 2 in source, 2 in target', out.getvalue())
+
+    def test_same_store_rejected(self):
+        """Test --from and --to must differ"""
+        with self.assertRaisesMessage(CommandError, 'must differ'):
+            self.migrate('--from', 'orm', '--to', 'orm')
+
+
+class MigrateExpensesHelpersTest(SimpleTestCase):
+    """Test the checksum and rate limiter helpers."""
+
+    def test_digest_ignores_store_representation(self):
+        """Test ORM and DynamoDB forms of one expense hash the same"""
+        orm = {
+            'user_id': 1, 'amount': Decimal('12.50'), 'category': 'Food', 'description': None,
+            'timestamp': datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc), 'receipt_url': None,
+        }
+        dynamodb = {**orm, 'amount': Decimal('12.5'), 'description': '', 'timestamp': '2024-03-01T12:30:00'}
+
+        self.assertEqual(row_digest(orm), row_digest(dynamodb))
+        self.assertNotEqual(row_digest(orm), row_digest({**orm, 'user_id': 2}))
+
+    def test_rate_limiter_spaces_batches(self):
+        """Test batches are scheduled rows / rate seconds apart"""
+        limiter = RateLimiter(100)
+        with patch('auth_app.management.commands.migrate_expenses.time.sleep') as sleep:
+            limiter.acquire(50)
+            limiter.acquire(50)
+            limiter.acquire(50)
+
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(waits), 2)
+        self.assertAlmostEqual(waits[0], 0.5, places=2)
+        self.assertAlmostEqual(waits[1], 1.0, places=2)
+
+    def test_no_rate_limit(self):
+        """Test no cap never sleeps"""
+        with patch('auth_app.management.commands.migrate_expenses.time.sleep') as sleep:
+            RateLimiter(None).acquire(10000)
+
+        sleep.assert_not_called()
@@ -6,7 +6,7 @@ from unittest.mock import Mock, patch
 from django.contrib.auth.models import User
 from django.test import TestCase, override_settings
 
-from auth_app.models import DynamoDBExpense, Expense
+from auth_app.models import DynamoDBExpense, Expense, ExpenseTombstone
 
 
 class ExpenseModelTest(TestCase):
@@ -117,6 +117,33 @@ class ExpenseModelTest(TestCase):
 
         self.assertFalse(Expense.objects.filter(id=expense_id).exists())
 
+    def test_expense_updated_at_bumped_on_save(self):
+        """Test updated_at changes when an expense is saved"""
+        expense = Expense.objects.create(user=self.user, amount=10.00, category='Food')
+        created = expense.updated_at
+
+        expense.receipt_url = 'https://example.com/receipt.jpg'
+        expense.save()
+
+        self.assertGreater(expense.updated_at, created)
+
+    def test_expense_delete_records_tombstone(self):
+        """Test deleting an expense leaves a tombstone and publishes an event"""
+        expense = Expense.objects.create(user=self.user, amount=10.00, category='Food')
+        expense_id = expense.id
+
+        with patch('auth_app.services.event_service.publish_expense_event') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                expense.delete()
+                publish.assert_not_called()
+
+        tombstone = ExpenseTombstone.objects.get()
+        self.assertEqual(tombstone.user_id, self.user.id)
+        self.assertEqual(tombstone.expense_id, str(expense_id))
+        publish.assert_called_once_with(
+            self.user.id, 'expense.deleted', expense_id=str(expense_id)
+        )
+
 
 @override_settings(IS_LOCAL_DEMO=True)
 class DynamoDBExpenseLocalTest(TestCase):
@@ -0,0 +1,47 @@
+"""Tests for the purge_tombstones management command."""
+
+import io
+from datetime import datetime, timedelta, timezone
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from auth_app.models import ExpenseTombstone
+
+
+@override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+class PurgeTombstonesTest(TestCase):
+    """Test tombstones are purged by age."""
+
+    def setUp(self):
+        now = datetime.now(timezone.utc)
+        for index, age in enumerate((1, 29, 31, 90, 400)):
+            tombstone = ExpenseTombstone.objects.create(user_id=1, expense_id=str(index))
+            # deleted_at is auto_now_add; backdate it after the insert
+            ExpenseTombstone.objects.filter(pk=tombstone.pk).update(deleted_at=now - timedelta(days=age))
+
+    def purge(self, **options) -> str:
+        out = io.StringIO()
+        call_command('purge_tombstones', stdout=out, **options)
+        return out.getvalue()
+
+    def test_purges_beyond_retention(self):
+        """Test tombstones older than the retention are deleted in batches"""
+        output = self.purge(batch_size=2)
+
+        self.assertIn('Purged 3 tombstones', output)
+        self.assertEqual(
+            sorted(ExpenseTombstone.objects.values_list('expense_id', flat=True)), ['0', '1']
+        )
+
+    def test_days_override(self):
+        """Test --days replaces the configured retention"""
+        self.purge(days=100)
+
+        self.assertEqual(ExpenseTombstone.objects.count(), 4)
+
+    def test_invalid_options(self):
+        """Test a negative retention is refused"""
+        with self.assertRaises(CommandError):
+            self.purge(days=-1)
@@ -0,0 +1,207 @@
+"""
+Query-count regression tests for every API endpoint and admin changelist.
+
+Each test pins the exact number of queries and checks it stays the same as
+the dataset grows, so an N+1 pattern fails here instead of in production.
+When a change legitimately adds or removes a query, update the pinned count.
+"""
+
+import base64
+import itertools
+import json
+
+from django.contrib import admin
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from auth_app.models import Expense
+from utils.testing import QueryCountMixin
+
+CATEGORIES = ('Food', 'Transport', 'Coffee')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryCountTestCase(QueryCountMixin, TestCase):
+    """Logged-in client plus seeding helpers; caches are cleared before every request."""
+
+    password = 'Test_Pass_1!'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner@example.com', email='owner@example.com', password=self.password
+        )
+        self.other = User.objects.create_user(username='other@example.com', email='other@example.com')
+        self.client.force_login(self.user)
+        self.sequence = itertools.count()
+
+    def seed_expenses(self, rows: int) -> None:
+        """Add rows expenses for the user and for someone else."""
+        Expense.objects.bulk_create(
+            Expense(
+                user=user,
+                amount=10 + index,
+                category=CATEGORIES[index % len(CATEGORIES)],
+                description=f'coffee and lunch {index}',
+            )
+            for user in (self.user, self.other)
+            for index in range(rows)
+        )
+
+    def request(self, method: str, name: str, data=None, status: int = 200, **params):
+        """An action performing one request on a cold cache and checking its status."""
+        def action():
+            cache.clear()
+            url = reverse(name)
+            if method == 'get':
+                response = self.client.get(url, params)
+            else:
+                response = getattr(self.client, method)(
+                    url, json.dumps(data() if callable(data) else data or {}),
+                    content_type='application/json',
+                )
+            self.assertEqual(response.status_code, status, response.content)
+        return action
+
+
+class AuthEndpointQueryCountTest(QueryCountTestCase):
+    """Authentication and profile endpoints."""
+
+    def test_signup(self):
+        """Test signup: existence check and insert"""
+        self.client.logout()
+        self.assertConstantQueries(2, self.request('post', 'signup', lambda: {
+            'email': f'new{next(self.sequence)}@example.com', 'password': self.password,
+        }, status=201), self.seed_expenses)
+
+    def test_login(self):
+        """Test login: user lookup, session creation, last_login update and session save"""
+        def seed(rows):
+            self.seed_expenses(rows)
+            self.client.logout()
+
+        self.assertConstantQueries(9, self.request('post', 'login', {
+            'email': self.user.email, 'password': self.password,
+        }), seed)
+
+    def test_logout(self):
+        """Test logout: session, user and session delete"""
+        def seed(rows):
+            self.seed_expenses(rows)
+            self.client.force_login(self.user)
+
+        self.assertConstantQueries(4, self.request('post', 'logout'), seed)
+
+    def test_profile(self):
+        """Test profile read and update"""
+        self.assertConstantQueries(2, self.request('get', 'profile'), self.seed_expenses)
+        self.assertConstantQueries(3, self.request('put', 'profile', {'name': 'Owner'}), self.seed_expenses)
+
+    def test_change_password(self):
+        """Test password change, which also logs the user out"""
+        def seed(rows):
+            self.seed_expenses(rows)
+            # The previous change rotated the password hash the session is tied to
+            self.user.refresh_from_db()
+            self.client.force_login(self.user)
+
+        self.assertConstantQueries(5, self.request('post', 'change_password', {
+            'current_password': self.password, 'new_password': self.password,
+        }), seed)
+
+    def test_static_endpoints(self):
+        """Test endpoints that never touch the database"""
+        self.client.logout()
+        for name in ('csrf_token', 'healthz'):
+            with self.subTest(name):
+                self.assertConstantQueries(0, self.request('get', name), self.seed_expenses)
+        # 404 with metrics disabled; rendering reads sample files, never the database
+        self.assertConstantQueries(0, self.request('get', 'metrics', status=404), self.seed_expenses)
+        for name in ('confirm_signup', 'forgot_password', 'confirm_forgot_password', 'verify_reset_code'):
+            with self.subTest(name):
+                self.assertConstantQueries(0, self.request('post', name), self.seed_expenses)
+
+
+class ExpenseEndpointQueryCountTest(QueryCountTestCase):
+    """Expense, receipt and category endpoints."""
+
+    def test_add_expense(self):
+        """Test creating an expense: session, user and the insert (no User re-read)"""
+        self.assertConstantQueries(3, self.request('post', 'add_expense', {
+            'amount': 12.5, 'category': 'Food', 'description': 'lunch',
+        }, status=201), self.seed_expenses)
+
+    def test_get_expenses(self):
+        """Test listing expenses, with and without filters"""
+        self.assertConstantQueries(3, self.request('get', 'get_expenses'), self.seed_expenses)
+        self.assertConstantQueries(
+            3, self.request('get', 'get_expenses', category='Food', min_amount='11'), self.seed_expenses
+        )
+
+    def test_expense_changes(self):
+        """Test the delta sync snapshot"""
+        self.assertConstantQueries(3, self.request('get', 'expense_changes'), self.seed_expenses)
+
+    def test_expense_events(self):
+        """Test the event stream rejects WSGI requests after authentication"""
+        self.assertConstantQueries(2, self.request('get', 'expense_events', status=501), self.seed_expenses)
+
+    def test_search_expenses(self):
+        """Test full-text search"""
+        self.assertConstantQueries(4, self.request('get', 'search_expenses', q='coffee'), self.seed_expenses)
+
+    def test_list_categories(self):
+        """Test category autocomplete on a cold cache"""
+        self.assertConstantQueries(3, self.request('get', 'list_categories', prefix='f'), self.seed_expenses)
+
+    def test_upload_receipt(self):
+        """Test uploading a receipt and linking it to an expense with one owner-scoped UPDATE"""
+        expense = Expense.objects.create(user=self.user, amount=5, category='Food')
+        self.assertConstantQueries(3, self.request('post', 'upload_receipt', {
+            'file': base64.b64encode(b'receipt').decode(),
+            'filename': 'receipt.txt',
+            'expense_id': str(expense.id),
+        }), self.seed_expenses)
+
+
+class AdminChangelistQueryCountTest(QueryCountTestCase):
+    """Every admin changelist, keyed by model label."""
+
+    # A newly registered ModelAdmin fails test_all_changelists_pinned until pinned here
+    EXPECTED = {
+        'auth.group': 5,
+        'auth.user': 5,
+        'auth_app.expense': 7,
+        'sessions.session': 6,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+    def seed_everything(self, rows: int) -> None:
+        """Add rows users (each with a session), groups and expenses."""
+        for _ in range(rows):
+            index = next(self.sequence)
+            user = User.objects.create_user(username=f'user{index}@example.com', email=f'user{index}@example.com')
+            session = SessionStore()
+            session['_auth_user_id'] = str(user.pk)
+            session.create()
+            Group.objects.create(name=f'group{index}')
+        self.seed_expenses(rows)
+
+    def test_all_changelists_pinned(self):
+        """Test every registered ModelAdmin has a pinned changelist count"""
+        self.assertEqual(set(self.EXPECTED), {model._meta.label_lower for model in admin.site._registry})
+
+    def test_changelists(self):
+        """Test changelists run a fixed number of queries however many rows they show"""
+        for model in admin.site._registry:
+            label = model._meta.label_lower
+            name = f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'
+            with self.subTest(label):
+                self.assertConstantQueries(self.EXPECTED[label], self.request('get', name), self.seed_everything)
@@ -0,0 +1,104 @@
+"""Unit tests for registry module (shared service instances)."""
+
+import threading
+from unittest.mock import Mock, patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from auth_app.services import get_auth_service, get_expense_repository, get_file_storage
+from auth_app.services.registry import AUTH_SERVICE, EXPENSE_REPOSITORY, FILE_STORAGE, ServiceRegistry
+from local_app.implementations.local_auth_service import LocalAuthService
+from local_app.implementations.local_file_storage import LocalFileStorage
+from local_app.implementations.sqlite_expense_repo import SQLiteExpenseRepository
+
+
+class ServiceRegistryTest(SimpleTestCase):
+    """Test building, sharing and resetting services."""
+
+    def setUp(self):
+        self.registry = ServiceRegistry()
+
+    def test_builds_once(self):
+        """Test the builder runs at registration and the instance is reused"""
+        builder = Mock(side_effect=object)
+
+        self.registry.register('service', builder)
+
+        self.assertIs(self.registry.get('service'), self.registry.get('service'))
+        builder.assert_called_once_with()
+
+    def test_lazy_registration(self):
+        """Test eager=False defers building to the first get"""
+        builder = Mock(side_effect=object)
+
+        self.registry.register('service', builder, eager=False)
+        builder.assert_not_called()
+
+        self.registry.get('service')
+        builder.assert_called_once_with()
+
+    def test_concurrent_first_get_builds_once(self):
+        """Test threads racing on the first get share one instance"""
+        builder = Mock(side_effect=object)
+        self.registry.register('service', builder, eager=False)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(self.registry.get('service'))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        builder.assert_called_once_with()
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_reset_rebuilds(self):
+        """Test reset drops instances but keeps builders"""
+        self.registry.register('service', object)
+        first = self.registry.get('service')
+
+        self.registry.reset('service')
+
+        self.assertTrue(self.registry.is_registered('service'))
+        self.assertIsNot(self.registry.get('service'), first)
+
+    def test_unregistered_raises(self):
+        """Test a missing implementation app is reported as a configuration error"""
+        with self.assertRaises(ImproperlyConfigured):
+            self.registry.get('service')
+
+
+class ServiceFactoryTest(SimpleTestCase):
+    """Test the factories return the registered shared instances."""
+
+    def setUp(self):
+        # A fresh registry with the local builders, whichever implementation
+        # app the settings under test installed
+        self.registry = ServiceRegistry()
+        self.registry.register(EXPENSE_REPOSITORY, SQLiteExpenseRepository)
+        self.registry.register(FILE_STORAGE, LocalFileStorage)
+        self.registry.register(AUTH_SERVICE, LocalAuthService)
+        for module in ('auth_service', 'expense_service', 'file_service'):
+            patcher = patch(f'auth_app.services.{module}.service_registry', self.registry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_registered_implementations(self):
+        """Test each factory returns the registered implementation"""
+        self.assertIsInstance(get_expense_repository(), SQLiteExpenseRepository)
+        self.assertIsInstance(get_file_storage(), LocalFileStorage)
+        self.assertIsInstance(get_auth_service(), LocalAuthService)
+
+    def test_shared_across_calls(self):
+        """Test repeated calls don't construct new instances"""
+        self.assertIs(get_expense_repository(), get_expense_repository())
+
+        self.registry.reset(EXPENSE_REPOSITORY)
+
+        self.assertIsInstance(get_expense_repository(), SQLiteExpenseRepository)
@@ -0,0 +1,100 @@
+"""Unit tests for search_service module (tokenizer, query builders, inverted index)."""
+
+from django.test import SimpleTestCase
+
+from auth_app.services.search_service import (
+    MAX_PAGE_SIZE,
+    InvertedIndex,
+    build_fts5_query,
+    build_tsquery,
+    parse_pagination,
+    tokenize,
+)
+
+
+class QueryBuilderTest(SimpleTestCase):
+    """Test tokenization and database query builders."""
+
+    def test_tokenize_lowercases_and_strips_punctuation(self):
+        """Test tokens are lowercase words"""
+        self.assertEqual(tokenize('Coffee & Latte!'), ['coffee', 'latte'])
+
+    def test_tokenize_empty(self):
+        """Test empty input has no tokens"""
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize('  *" '), [])
+
+    def test_build_fts5_query_quotes_tokens(self):
+        """Test FTS5 query quotes every token as a prefix term"""
+        self.assertEqual(build_fts5_query('taxi OR home'), '"taxi"* "or"* "home"*')
+        self.assertIsNone(build_fts5_query('"*'))
+
+    def test_build_tsquery(self):
+        """Test tsquery joins prefix terms with AND"""
+        self.assertEqual(build_tsquery('taxi home'), 'taxi:* & home:*')
+        self.assertIsNone(build_tsquery(''))
+
+    def test_parse_pagination_defaults(self):
+        """Test default page and page size"""
+        self.assertEqual(parse_pagination({}), (1, 20))
+
+    def test_parse_pagination_caps_page_size(self):
+        """Test page size is capped"""
+        self.assertEqual(parse_pagination({'page_size': '1000'}), (1, MAX_PAGE_SIZE))
+
+    def test_parse_pagination_invalid(self):
+        """Test invalid values raise ValueError"""
+        with self.assertRaises(ValueError):
+            parse_pagination({'page': '0'})
+        with self.assertRaises(ValueError):
+            parse_pagination({'page_size': 'x'})
+
+
+class InvertedIndexTest(SimpleTestCase):
+    """Test the in-process inverted index used by the DynamoDB backend."""
+
+    def setUp(self):
+        self.index = InvertedIndex(ttl_seconds=60)
+        self.index.build(1, [
+            {'expense_id': 'a', 'category': 'Coffee', 'description': 'Latte',
+             'timestamp': '2025-01-01T08:00:00'},
+            {'expense_id': 'b', 'category': 'Groceries', 'description': 'Coffee beans',
+             'timestamp': '2025-01-02T08:00:00'},
+        ])
+
+    def test_search_ranks_category_matches_first(self):
+        """Test category matches outrank description matches"""
+        self.assertEqual(self.index.search(1, 'coffee'), ['a', 'b'])
+
+    def test_search_prefix_and_all_terms(self):
+        """Test prefix matching with AND semantics"""
+        self.assertEqual(self.index.search(1, 'cof bea'), ['b'])
+        self.assertEqual(self.index.search(1, 'coffee tea'), [])
+
+    def test_search_ties_newest_first(self):
+        """Test equal scores are ordered newest first"""
+        self.index.add(1, {'expense_id': 'c', 'category': 'Coffee', 'description': 'Latte',
+                           'timestamp': '2025-01-03T08:00:00'})
+
+        self.assertEqual(self.index.search(1, 'latte'), ['c', 'a'])
+
+    def test_add_ignored_for_unloaded_user(self):
+        """Test writes for users without a partition are not indexed"""
+        self.index.add(2, {'expense_id': 'x', 'category': 'Coffee'})
+
+        self.assertFalse(self.index.is_fresh(2))
+        self.assertEqual(self.index.search(2, 'coffee'), [])
+
+    def test_is_fresh_respects_ttl(self):
+        """Test partitions expire after the TTL"""
+        self.assertTrue(self.index.is_fresh(1))
+
+        expired = InvertedIndex(ttl_seconds=0)
+        expired.build(1, [])
+        self.assertFalse(expired.is_fresh(1))
+
+    def test_invalidate(self):
+        """Test dropping a partition"""
+        self.index.invalidate(1)
+
+        self.assertFalse(self.index.is_fresh(1))
@@ -0,0 +1,75 @@
+"""Unit tests for serialization module (JSON encoding and FastJsonResponse)."""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_app.services import serialization
+from auth_app.services.serialization import FastJsonResponse, dumps, get_json_backend
+
+ROW = {
+    'expense_id': '1',
+    'user_id': 7,
+    'amount': Decimal('12.50'),
+    'timestamp': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'receipt_url': None,
+}
+
+
+class DumpsTest(SimpleTestCase):
+    """Test dumps produces the same JSON on both backends."""
+
+    def test_native_types(self):
+        """Test Decimal and datetime are encoded without conversion"""
+        data = json.loads(dumps(ROW))
+
+        self.assertEqual(data['amount'], 12.5)
+        self.assertEqual(data['timestamp'], ROW['timestamp'].isoformat())
+        self.assertIsNone(data['receipt_url'])
+
+    def test_backends_match(self):
+        """Test stdlib fallback output decodes to the same value as orjson output"""
+        naive = dict(ROW, timestamp=datetime(2024, 5, 1, 12, 30))
+
+        with override_settings(API_JSON_ENCODER='stdlib'):
+            self.assertEqual(get_json_backend(), 'stdlib')
+            fallback = dumps([ROW, naive])
+
+        self.assertEqual(json.loads(dumps([ROW, naive])), json.loads(fallback))
+
+    def test_missing_orjson_falls_back(self):
+        """Test the stdlib encoder is used when orjson is not installed"""
+        with patch.object(serialization, 'orjson', None):
+            self.assertEqual(get_json_backend(), 'stdlib')
+            self.assertEqual(json.loads(dumps({'amount': Decimal('1.5')})), {'amount': 1.5})
+
+    def test_unsupported_value_falls_back(self):
+        """Test values orjson rejects are retried with the stdlib encoder"""
+        self.assertEqual(json.loads(dumps({'big': 2 ** 70})), {'big': 2 ** 70})
+
+    def test_unserializable_raises(self):
+        """Test unknown types raise TypeError"""
+        with self.assertRaises(TypeError):
+            dumps({'value': object()})
+
+
+class FastJsonResponseTest(SimpleTestCase):
+    """Test FastJsonResponse behaves like JsonResponse."""
+
+    def test_response(self):
+        """Test content, content type and status"""
+        response = FastJsonResponse({'amount': Decimal('2.25')}, status=201)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), {'amount': 2.25})
+
+    def test_safe_rejects_non_dict(self):
+        """Test non-dict data requires safe=False"""
+        with self.assertRaises(TypeError):
+            FastJsonResponse([1, 2])
+
+        self.assertEqual(json.loads(FastJsonResponse([1, 2], safe=False).content), [1, 2])
@@ -0,0 +1,75 @@
+"""SQLite server mode (SQLITE_SERVER_MODE in settings/local.py), checked in a fresh interpreter."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+
+# Opens the configured connection and reports what it ended up with
+REPORT_CODE = '''
+import json
+import django
+django.setup()
+from django.db import connection
+with connection.cursor() as cursor:
+    pragmas = {
+        name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+        for name in ('journal_mode', 'synchronous', 'mmap_size', 'busy_timeout', 'cache_size', 'temp_store')
+    }
+print(json.dumps({
+    'pragmas': pragmas,
+    'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+    'transaction_mode': connection.transaction_mode,
+}))
+'''
+
+
+class SQLiteServerModeTest(SimpleTestCase):
+    """Test the connection settings SQLITE_SERVER_MODE applies."""
+
+    def report(self, **env) -> dict:
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [sys.executable, '-c', REPORT_CODE],
+                cwd=PROJECT_DIR,
+                env={
+                    **os.environ,
+                    'DJANGO_SETTINGS_MODULE': 'expense_tracker.settings.local',
+                    'DJANGO_SECRET_KEY': 'test-only-secret-key',
+                    'SQLITE_PATH': os.path.join(directory, 'server-mode.sqlite3'),
+                    **env,
+                },
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def test_server_mode_pragmas(self):
+        """Test every new connection gets the server mode pragmas and persists"""
+        report = self.report(SQLITE_SERVER_MODE='true', SQLITE_CACHE_SIZE_KB='32768')
+
+        self.assertEqual(report['pragmas'], {
+            'journal_mode': 'wal',
+            'synchronous': 1,  # NORMAL
+            'mmap_size': 256 * 1024 * 1024,
+            'busy_timeout': 5000,
+            'cache_size': -32768,
+            'temp_store': 2,  # MEMORY
+        })
+        self.assertEqual(report['conn_max_age'], 600)
+        self.assertEqual(report['transaction_mode'], 'IMMEDIATE')
+
+    def test_default_unchanged(self):
+        """Test the local default keeps SQLite's defaults and per-request connections"""
+        report = self.report(SQLITE_SERVER_MODE='false')
+
+        self.assertEqual(report['pragmas']['journal_mode'], 'delete')
+        self.assertEqual(report['conn_max_age'], 0)
+        self.assertIsNone(report['transaction_mode'])
@@ -0,0 +1,50 @@
+"""Unit tests for sync_service module (delta sync tokens)."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_app.services.sync_service import (
+    SyncTokenExpired,
+    decode_sync_token,
+    encode_sync_token,
+    next_sync_token,
+)
+
+
+class SyncTokenTest(SimpleTestCase):
+    """Test sync token encoding."""
+
+    def test_round_trip(self):
+        """Test tokens decode to the encoded moment with microsecond precision"""
+        moment = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+        self.assertEqual(decode_sync_token(encode_sync_token(moment), now=moment), moment)
+
+    def test_invalid_tokens(self):
+        """Test malformed, negative and out-of-range tokens are rejected"""
+        for token in ('abc', '-1', '1.5', str(10 ** 30)):
+            with self.subTest(token=token):
+                with self.assertRaises(ValueError):
+                    decode_sync_token(token)
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_expired_token(self):
+        """Test tokens older than the tombstone retention are refused"""
+        now = datetime(2024, 5, 31, 12, 0, tzinfo=timezone.utc)
+        inside = encode_sync_token(now - timedelta(days=30))
+        outside = encode_sync_token(now - timedelta(days=30, seconds=1))
+
+        self.assertEqual(decode_sync_token(inside, now=now), now - timedelta(days=30))
+        with self.assertRaises(SyncTokenExpired):
+            decode_sync_token(outside, now=now)
+
+    @override_settings(SYNC_TOKEN_OVERLAP_SECONDS=5)
+    def test_next_token_overlaps(self):
+        """Test the next token is moved back by the overlap"""
+        now = datetime(2024, 5, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+        self.assertEqual(
+            decode_sync_token(next_sync_token(now), now=now),
+            datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc),
+        )
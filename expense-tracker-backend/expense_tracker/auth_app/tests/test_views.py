@@ -1,13 +1,22 @@
 """Unit tests for API views using Django's session-based authentication."""
 
+import asyncio
 import json
 import base64
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from unittest.mock import Mock, patch
 
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
 from django.urls import reverse
 
+from auth_app import views
+from auth_app.models import Expense
+from auth_app.services.event_service import publish_expense_event
+from auth_app.services.sync_service import encode_sync_token
+
 
 class AuthEndpointsTest(TestCase):
     """Test authentication endpoints with session-based auth."""
@@ -283,6 +292,69 @@ class ExpenseEndpointsTest(TestCase):
         self.assertIn('expenses', data)
         self.assertEqual(len(data['expenses']), 2)
 
+    @patch('auth_app.views.get_expense_repository')
+    def test_get_expenses_encodes_native_types(self, mock_get_repo):
+        """Test Decimal amounts and datetime timestamps are encoded in the response"""
+        mock_repo = Mock()
+        mock_repo.get_by_user.return_value = [{
+            'expense_id': '1',
+            'amount': Decimal('12.50'),
+            'timestamp': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        }]
+        mock_get_repo.return_value = mock_repo
+
+        response = self.client.get(reverse('get_expenses'))
+
+        self.assertEqual(response.status_code, 200)
+        expense = response.json()['expenses'][0]
+        self.assertEqual(expense['amount'], 12.5)
+        self.assertEqual(expense['timestamp'], '2024-05-01T12:30:00+00:00')
+
+    def test_get_expenses_with_filters(self):
+        """Test list filters and sorting are applied server-side"""
+        for amount, category in [(10.0, 'Food'), (30.0, 'Food'), (20.0, 'Transport')]:
+            self.client.post(
+                reverse('add_expense'),
+                data=json.dumps({'amount': amount, 'category': category}),
+                content_type='application/json',
+            )
+
+        response = self.client.get(
+            reverse('get_expenses'), {'category': 'Food', 'sort': 'amount_desc'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        amounts = [e['amount'] for e in response.json()['expenses']]
+        self.assertEqual(amounts, [30.0, 10.0])
+
+    def test_get_expenses_invalid_filter(self):
+        """Test malformed filter parameters are rejected"""
+        response = self.client.get(reverse('get_expenses'), {'min_amount': 'lots'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_get_expenses_sparse_fields(self):
+        """Test the fields parameter limits the returned attributes"""
+        self.client.post(
+            reverse('add_expense'),
+            data=json.dumps({'amount': 10.0, 'category': 'Food', 'description': 'Lunch'}),
+            content_type='application/json',
+        )
+
+        response = self.client.get(reverse('get_expenses'), {'fields': 'amount,category'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json()['expenses'][0]), {'expense_id', 'amount', 'category'}
+        )
+
+    def test_get_expenses_unknown_field(self):
+        """Test unknown sparse fields are rejected"""
+        response = self.client.get(reverse('get_expenses'), {'fields': 'secret'})
+
+        self.assertEqual(response.status_code, 400)
+
     def test_get_expenses_not_authenticated(self):
         """Test retrieving expenses without authentication"""
         self.client.logout()
@@ -293,6 +365,312 @@ class ExpenseEndpointsTest(TestCase):
         self.assertIn(response.status_code, [301, 302])
 
 
+class ExpenseSearchEndpointTest(TestCase):
+    """Test expense full-text search endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.test_email = 'test@example.com'
+        self.test_password = 'Test_Pass_1!'
+        self.user = User.objects.create_user(
+            username=self.test_email,
+            email=self.test_email,
+            password=self.test_password
+        )
+        # Login
+        self.client.login(username=self.test_email, password=self.test_password)
+
+    def test_search_expenses_success(self):
+        """Test searching returns ranked, paginated results"""
+        for description in ['Pizza night', 'Pizza lunch', 'Sushi']:
+            self.client.post(
+                reverse('add_expense'),
+                data=json.dumps({'amount': 20.0, 'category': 'Food', 'description': description}),
+                content_type='application/json',
+            )
+
+        response = self.client.get(reverse('search_expenses'), {'q': 'pizza', 'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['page'], 1)
+        self.assertEqual(data['page_size'], 1)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIn('Pizza', data['results'][0]['description'])
+
+    def test_search_expenses_missing_query(self):
+        """Test search requires a query"""
+        response = self.client.get(reverse('search_expenses'))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_search_expenses_invalid_page(self):
+        """Test search rejects invalid pagination parameters"""
+        response = self.client.get(reverse('search_expenses'), {'q': 'food', 'page': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_search_expenses_not_authenticated(self):
+        """Test search without authentication"""
+        self.client.logout()
+
+        response = self.client.get(reverse('search_expenses'), {'q': 'food'})
+
+        # Should redirect to login
+        self.assertIn(response.status_code, [301, 302])
+
+
+class CategoryAutocompleteEndpointTest(TestCase):
+    """Test category autocomplete endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.test_email = 'test@example.com'
+        self.test_password = 'Test_Pass_1!'
+        self.user = User.objects.create_user(
+            username=self.test_email,
+            email=self.test_email,
+            password=self.test_password
+        )
+        # Login
+        self.client.login(username=self.test_email, password=self.test_password)
+
+    def _add_expense(self, category):
+        self.client.post(
+            reverse('add_expense'),
+            data=json.dumps({'amount': 10.0, 'category': category}),
+            content_type='application/json',
+        )
+
+    def test_list_categories_by_prefix(self):
+        """Test autocomplete returns matching categories, most used first"""
+        for category in ['Food', 'Fuel', 'Fuel', 'Travel']:
+            self._add_expense(category)
+
+        response = self.client.get(reverse('list_categories'), {'prefix': 'f'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['categories'], [
+            {'name': 'Fuel', 'count': 2},
+            {'name': 'Food', 'count': 1},
+        ])
+
+    def test_list_categories_reflects_new_expenses(self):
+        """Test cached categories pick up committed new expenses"""
+        self._add_expense('Food')
+        self.client.get(reverse('list_categories'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_expense('Gym')
+
+        response = self.client.get(reverse('list_categories'), {'prefix': 'gy'})
+
+        self.assertEqual(response.json()['categories'], [{'name': 'Gym', 'count': 1}])
+
+    def test_list_categories_invalid_limit(self):
+        """Test autocomplete rejects a non-integer limit"""
+        response = self.client.get(reverse('list_categories'), {'limit': 'x'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_categories_not_authenticated(self):
+        """Test autocomplete without authentication"""
+        self.client.logout()
+
+        response = self.client.get(reverse('list_categories'))
+
+        # Should redirect to login
+        self.assertIn(response.status_code, [301, 302])
+
+
+class ExpenseChangesEndpointTest(TestCase):
+    """Test delta sync endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.test_email = 'test@example.com'
+        self.test_password = 'Test_Pass_1!'
+        self.user = User.objects.create_user(
+            username=self.test_email,
+            email=self.test_email,
+            password=self.test_password
+        )
+        # Login
+        self.client.login(username=self.test_email, password=self.test_password)
+
+    def _add_expense(self, category):
+        response = self.client.post(
+            reverse('add_expense'),
+            data=json.dumps({'amount': 10.0, 'category': category}),
+            content_type='application/json',
+        )
+        return response.json()['expense_id']
+
+    @override_settings(SYNC_TOKEN_OVERLAP_SECONDS=0)
+    def test_changes_since_token(self):
+        """Test a sync token returns only later changes and deletes"""
+        self._add_expense('Food')
+        removed_id = self._add_expense('Gym')
+
+        first = self.client.get(reverse('expense_changes')).json()
+        self._add_expense('Transport')
+        Expense.objects.filter(id=removed_id).delete()
+        second = self.client.get(
+            reverse('expense_changes'), {'since': first['sync_token']}
+        ).json()
+
+        self.assertTrue(first['full'])
+        self.assertEqual(len(first['changes']), 2)
+        self.assertFalse(second['full'])
+        self.assertEqual([e['category'] for e in second['changes']], ['Transport'])
+        self.assertEqual(second['deleted'], [removed_id])
+
+    def test_changes_invalid_token(self):
+        """Test a malformed sync token is rejected"""
+        response = self.client.get(reverse('expense_changes'), {'since': 'yesterday'})
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_changes_expired_token(self):
+        """Test a token older than the tombstone retention asks for a full resync"""
+        token = encode_sync_token(datetime.now(timezone.utc) - timedelta(days=31))
+
+        response = self.client.get(reverse('expense_changes'), {'since': token})
+
+        self.assertEqual(response.status_code, 410)
+        self.assertIn('without a token', response.json()['error'])
+
+    def test_changes_not_authenticated(self):
+        """Test delta sync without authentication"""
+        self.client.logout()
+
+        response = self.client.get(reverse('expense_changes'))
+
+        # Should redirect to login
+        self.assertIn(response.status_code, [301, 302])
+
+
+class ExpenseEventsEndpointTest(TestCase):
+    """Test server-sent events endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.test_email = 'test@example.com'
+        self.test_password = 'Test_Pass_1!'
+        self.user = User.objects.create_user(
+            username=self.test_email,
+            email=self.test_email,
+            password=self.test_password
+        )
+
+    async def test_events_stream(self):
+        """Test expense changes are pushed to the user's stream"""
+        await self.async_client.alogin(username=self.test_email, password=self.test_password)
+
+        response = await self.async_client.get(reverse('expense_events'))
+        stream = response.streaming_content
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        publish_expense_event(self.user.id, 'expense.created', expense={'expense_id': '1'})
+        message = await asyncio.wait_for(pending, 1)
+        await stream.aclose()
+
+        self.assertTrue(message.startswith(b'event: expense.created\n'))
+
+    def test_events_require_asgi(self):
+        """Test the stream is refused under WSGI"""
+        self.client.login(username=self.test_email, password=self.test_password)
+
+        response = self.client.get(reverse('expense_events'))
+
+        self.assertEqual(response.status_code, 501)
+
+    def test_events_not_authenticated(self):
+        """Test event stream without authentication"""
+        response = self.client.get(reverse('expense_events'))
+
+        # Should redirect to login
+        self.assertIn(response.status_code, [301, 302])
+
+
+class AsyncExpenseViewsTest(TestCase):
+    """Test async variants of the expense views."""
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(
+            username='test@example.com',
+            email='test@example.com',
+            password='Test_Pass_1!'
+        )
+
+    def _request(self, method, path, data=None, **params):
+        if method == 'post':
+            request = self.factory.post(path, data=json.dumps(data), content_type='application/json')
+        else:
+            request = self.factory.get(path, params)
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        return request
+
+    async def test_add_and_list_expenses(self):
+        """Test expenses created by the async view are listed by the async view"""
+        created = await views.add_expense_async(self._request(
+            'post', '/api/expenses/', {'amount': 12.5, 'category': 'Food'}
+        ))
+        listed = await views.get_expenses_async(self._request(
+            'get', '/api/expenses/list/', fields='amount,category'
+        ))
+
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(listed.status_code, 200)
+        self.assertEqual(json.loads(listed.content)['expenses'], [
+            {'expense_id': json.loads(created.content)['expense_id'], 'amount': 12.5, 'category': 'Food'}
+        ])
+
+    async def test_add_expense_validation(self):
+        """Test the async create view rejects missing fields"""
+        response = await views.add_expense_async(self._request(
+            'post', '/api/expenses/', {'amount': 12.5}
+        ))
+
+        self.assertEqual(response.status_code, 400)
+
+    async def test_get_expenses_invalid_filter(self):
+        """Test the async list view rejects malformed filters"""
+        response = await views.get_expenses_async(self._request(
+            'get', '/api/expenses/list/', sort='sideways'
+        ))
+
+        self.assertEqual(response.status_code, 400)
+
+    async def test_upload_receipt_links_expense(self):
+        """Test the async upload view stores the file and links the expense"""
+        expense = await Expense.objects.acreate(user=self.user, amount=5, category='Food')
+
+        response = await views.upload_receipt_async(self._request('post', '/api/receipts/upload/', {
+            'file': base64.b64encode(b'receipt').decode(),
+            'filename': 'receipt.jpg',
+            'expense_id': str(expense.id),
+        }))
+
+        await expense.arefresh_from_db()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(expense.receipt_url, json.loads(response.content)['file_url'])
+
+
 class ReceiptUploadEndpointTest(TestCase):
     """Test receipt upload endpoint."""
 
@@ -314,6 +692,7 @@ class ReceiptUploadEndpointTest(TestCase):
         mock_storage = Mock()
         mock_storage.upload.return_value = 'https://example.com/receipt.jpg'
         mock_get_storage.return_value = mock_storage
+        expense = Expense.objects.create(user=self.user, amount=5, category='Food')
 
         file_data = base64.b64encode(b'test file content').decode('utf-8')
         response = self.client.post(
@@ -321,7 +700,7 @@ class ReceiptUploadEndpointTest(TestCase):
             data=json.dumps({
                 'file': file_data,
                 'filename': 'test_receipt.jpg',
-                'expense_id': 'test-expense-1'
+                'expense_id': str(expense.id)
             }),
             content_type='application/json',
         )
@@ -330,6 +709,27 @@ class ReceiptUploadEndpointTest(TestCase):
         data = response.json()
         self.assertIn('file_url', data)
         self.assertIn('file_name', data)
+        expense.refresh_from_db()
+        self.assertEqual(expense.receipt_url, 'https://example.com/receipt.jpg')
+
+    def test_upload_receipt_other_users_expense(self):
+        """Test a receipt cannot be linked to another user's expense"""
+        other = User.objects.create_user(username='other@example.com', email='other@example.com')
+        expense = Expense.objects.create(user=other, amount=5, category='Food')
+
+        response = self.client.post(
+            reverse('upload_receipt'),
+            data=json.dumps({
+                'file': base64.b64encode(b'receipt').decode(),
+                'filename': 'receipt.jpg',
+                'expense_id': str(expense.id),
+            }),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 404)
+        expense.refresh_from_db()
+        self.assertIsNone(expense.receipt_url)
 
     def test_upload_receipt_missing_file(self):
         """Test receipt upload with missing file"""
@@ -0,0 +1,41 @@
+"""Unit tests for the pre-fork warm-up and post-fork reset hooks."""
+
+import gc
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from auth_app.services import get_expense_repository
+from auth_app.services.registry import service_registry
+from expense_tracker import warmup
+
+
+class WarmupTest(SimpleTestCase):
+    """Test warm_up and reset_after_fork."""
+
+    def tearDown(self):
+        gc.unfreeze()
+        service_registry.reset()
+
+    def test_warm_up(self):
+        """Test services are built, connections closed and the heap frozen"""
+        service_registry.reset()
+
+        with patch.object(warmup.connections, 'close_all') as mock_close_all:
+            warmup.warm_up()
+
+        mock_close_all.assert_called_once_with()
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertIs(get_expense_repository(), get_expense_repository())
+
+    def test_reset_after_fork(self):
+        """Test the worker gets new service instances and a new event broker"""
+        inherited = get_expense_repository()
+
+        with patch.object(warmup.connections, 'close_all') as mock_close_all, \
+                patch('auth_app.services.event_service.reset_event_broker') as mock_reset_broker:
+            warmup.reset_after_fork()
+
+        mock_close_all.assert_called_once_with()
+        mock_reset_broker.assert_called_once_with()
+        self.assertIsNot(get_expense_repository(), inherited)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
@@ -14,6 +15,9 @@ from .views import (
     verify_reset_code_view,
 )
 
+# Async variants keep I/O-bound requests off worker threads under the ASGI server
+_async_views = getattr(settings, 'ASYNC_VIEWS', False)
+
 urlpatterns = [
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
@@ -26,8 +30,17 @@ urlpatterns = [
     path('verify-reset-code/', verify_reset_code_view, name='verify_reset_code'),
     path('profile/', profile_view, name='profile'),
     path('profile/change-password/', change_password_view, name='change_password'),
-    path('expenses/', views.add_expense, name='add_expense'),
-    path('expenses/list/', views.get_expenses, name='get_expenses'),
-    path('receipts/upload/', views.upload_receipt, name='upload_receipt'),
+    path('expenses/', views.add_expense_async if _async_views else views.add_expense,
+         name='add_expense'),
+    path('expenses/list/', views.get_expenses_async if _async_views else views.get_expenses,
+         name='get_expenses'),
+    path('expenses/changes/', views.expense_changes, name='expense_changes'),
+    path('expenses/events/', views.expense_events, name='expense_events'),
+    path('expenses/search/', views.search_expenses, name='search_expenses'),
+    path('categories/', views.list_categories, name='list_categories'),
+    path('receipts/upload/',
+         views.upload_receipt_async if _async_views else views.upload_receipt,
+         name='upload_receipt'),
     path('healthz/', views.healthz, name='healthz'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
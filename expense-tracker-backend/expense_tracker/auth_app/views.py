@@ -5,20 +5,35 @@ Uses Django's built-in authentication + CSRF protection.
 import json
 import logging
 import base64
+import hmac
 
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 from django_ratelimit.decorators import ratelimit
 
 from auth_app.services import (
+    ExpenseFilters,
     get_expense_repository,
     get_file_storage,
 )
+from auth_app.services.category_service import (
+    DEFAULT_SUGGESTION_LIMIT,
+    MAX_SUGGESTION_LIMIT,
+    get_category_index,
+)
+from auth_app.services.event_service import encode_sse, get_event_broker
+from auth_app.services.expense_service import parse_fields
+from auth_app.services.search_service import parse_pagination
+from auth_app.services.serialization import FastJsonResponse
+from auth_app.services.sync_service import SyncTokenExpired, decode_sync_token, next_sync_token
+from utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -34,17 +49,17 @@ def signup_view(request):
         password = data.get('password')
 
         if not email or not password:
-            return JsonResponse({'error': 'Email and password required'}, status=400)
+            return FastJsonResponse({'error': 'Email and password required'}, status=400)
 
         # Check if user already exists
         if User.objects.filter(username=email).exists():
-            return JsonResponse({'error': 'User already exists'}, status=409)
+            return FastJsonResponse({'error': 'User already exists'}, status=409)
 
         # Create user with email as username
         user = User.objects.create_user(username=email, email=email, password=password)
         logger.info(f"User registered: {email}")
 
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'success',
             'message': 'Sign up successful! You can now log in.',
             'user_id': user.id,
@@ -52,30 +67,30 @@ def signup_view(request):
         }, status=201)
 
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
-        return JsonResponse({'error': 'Registration failed'}, status=500)
+        return FastJsonResponse({'error': 'Registration failed'}, status=500)
 
 
 def confirm_signup_view(request):
     """Placeholder for signup confirmation (not needed for session auth)."""
-    return JsonResponse({'message': 'Already confirmed'})
+    return FastJsonResponse({'message': 'Already confirmed'})
 
 
 def forgot_password_view(request):
     """Placeholder for forgot password (can implement email reset later)."""
-    return JsonResponse({'message': 'Check email for reset link'})
+    return FastJsonResponse({'message': 'Check email for reset link'})
 
 
 def confirm_forgot_password_view(request):
     """Placeholder for confirm forgot password."""
-    return JsonResponse({'message': 'Password reset'})
+    return FastJsonResponse({'message': 'Password reset'})
 
 
 def verify_reset_code_view(request):
     """Placeholder for verify reset code."""
-    return JsonResponse({'message': 'Code verified'})
+    return FastJsonResponse({'message': 'Code verified'})
 
 
 @csrf_exempt
@@ -89,7 +104,7 @@ def login_view(request):
         password = data.get('password')
 
         if not email or not password:
-            return JsonResponse({'error': 'Email and password required'}, status=400)
+            return FastJsonResponse({'error': 'Email and password required'}, status=400)
 
         # Authenticate using Django's auth
         user = authenticate(request, username=email, password=password)
@@ -101,7 +116,7 @@ def login_view(request):
             # Get CSRF token for frontend
             csrf_token = get_token(request)
 
-            return JsonResponse({
+            return FastJsonResponse({
                 'status': 'success',
                 'message': 'Login successful',
                 'user_id': user.id,
@@ -110,13 +125,13 @@ def login_view(request):
             })
         else:
             logger.warning(f"Failed login attempt for: {email}")
-            return JsonResponse({'error': 'Invalid credentials'}, status=401)
+            return FastJsonResponse({'error': 'Invalid credentials'}, status=401)
 
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
-        return JsonResponse({'error': 'Login failed'}, status=500)
+        return FastJsonResponse({'error': 'Login failed'}, status=500)
 
 
 @require_http_methods(["POST"])
@@ -124,7 +139,7 @@ def logout_view(request):
     """Logout user and destroy session."""
     logout(request)
     logger.info("User logged out")
-    return JsonResponse({'message': 'Logged out'})
+    return FastJsonResponse({'message': 'Logged out'})
 
 
 @csrf_exempt
@@ -132,7 +147,7 @@ def logout_view(request):
 def csrf_token_view(request):
     """Return CSRF token for frontend to use in requests."""
     token = get_token(request)
-    return JsonResponse({'csrf_token': token})
+    return FastJsonResponse({'csrf_token': token})
 
 
 @login_required(login_url='/api/login/')
@@ -140,7 +155,7 @@ def csrf_token_view(request):
 def profile_view(request):
     """Get or update user profile."""
     if request.method == 'GET':
-        return JsonResponse({
+        return FastJsonResponse({
             'profile': {
                 'user_id': request.user.id,
                 'email': request.user.email,
@@ -152,10 +167,10 @@ def profile_view(request):
             data = json.loads(request.body)
             request.user.first_name = data.get('name', request.user.first_name)
             request.user.save()
-            return JsonResponse({'message': 'Profile updated'})
+            return FastJsonResponse({'message': 'Profile updated'})
         except Exception as e:
             logger.error(f"Profile update error: {str(e)}")
-            return JsonResponse({'error': 'Update failed'}, status=500)
+            return FastJsonResponse({'error': 'Update failed'}, status=500)
 
 
 @login_required(login_url='/api/login/')
@@ -168,11 +183,11 @@ def change_password_view(request):
         new_password = data.get('new_password')
 
         if not current_password or not new_password:
-            return JsonResponse({'error': 'Both passwords required'}, status=400)
+            return FastJsonResponse({'error': 'Both passwords required'}, status=400)
 
         # Verify current password
         if not request.user.check_password(current_password):
-            return JsonResponse({'error': 'Current password incorrect'}, status=401)
+            return FastJsonResponse({'error': 'Current password incorrect'}, status=401)
 
         # Set new password
         request.user.set_password(new_password)
@@ -183,13 +198,13 @@ def change_password_view(request):
         # Log out the user for security - they must log back in with new password
         logout(request)
 
-        return JsonResponse({'message': 'Password changed successfully. Please log in with your new password.'})
+        return FastJsonResponse({'message': 'Password changed successfully. Please log in with your new password.'})
 
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Password change error: {str(e)}")
-        return JsonResponse({'error': 'Change failed'}, status=500)
+        return FastJsonResponse({'error': 'Change failed'}, status=500)
 
 
 @login_required(login_url='/api/login/')
@@ -202,7 +217,7 @@ def add_expense(request):
 
         # Validate required fields
         if not data.get('amount') or not data.get('category'):
-            return JsonResponse({'error': 'Amount and category required'}, status=400)
+            return FastJsonResponse({'error': 'Amount and category required'}, status=400)
 
         amount = data.get('amount')
         category = data.get('category')
@@ -219,33 +234,248 @@ def add_expense(request):
 
         logger.info(f"Expense added for user {user_id}: ${amount} in {category}")
 
-        return JsonResponse(expense, status=201)
+        return FastJsonResponse(expense, status=201)
 
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Error adding expense: {str(e)}")
-        return JsonResponse({'error': 'Failed to add expense'}, status=500)
+        return FastJsonResponse({'error': 'Failed to add expense'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["POST"])
+async def add_expense_async(request):
+    """Async variant of add_expense, served when ASYNC_VIEWS is enabled."""
+    try:
+        data = json.loads(request.body)
+        user_id = (await request.auser()).id
+
+        # Validate required fields
+        if not data.get('amount') or not data.get('category'):
+            return FastJsonResponse({'error': 'Amount and category required'}, status=400)
+
+        amount = data.get('amount')
+        category = data.get('category')
+        description = data.get('description', '')
+
+        expense_repo = get_expense_repository()
+        expense = await expense_repo.acreate(
+            user_id=user_id,
+            amount=amount,
+            category=category,
+            description=description
+        )
+
+        logger.info(f"Expense added for user {user_id}: ${amount} in {category}")
+
+        return FastJsonResponse(expense, status=201)
+
+    except json.JSONDecodeError:
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        logger.error(f"Error adding expense: {str(e)}")
+        return FastJsonResponse({'error': 'Failed to add expense'}, status=500)
 
 
 @login_required(login_url='/api/login/')
 @require_http_methods(["GET"])
 def get_expenses(request):
-    """Get expenses for a user."""
+    """Get expenses for a user, filtered and sorted by the query parameters."""
     try:
         user_id = request.user.id
 
+        try:
+            filters = ExpenseFilters.from_params(request.GET)
+            fields = parse_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+
         # Use service layer
         expense_repo = get_expense_repository()
-        expenses = expense_repo.get_by_user(user_id)
+        expenses = expense_repo.get_by_user(user_id, filters, fields)
+
+        logger.info(f"Retrieved {len(expenses)} expenses for user {user_id}")
+
+        return FastJsonResponse({'expenses': expenses})
+
+    except Exception as e:
+        logger.error(f"Error retrieving expenses: {str(e)}")
+        return FastJsonResponse({'error': 'Failed to retrieve expenses'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["GET"])
+async def get_expenses_async(request):
+    """Async variant of get_expenses, served when ASYNC_VIEWS is enabled."""
+    try:
+        user_id = (await request.auser()).id
+
+        try:
+            filters = ExpenseFilters.from_params(request.GET)
+            fields = parse_fields(request.GET.get('fields'))
+        except ValueError as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+
+        expense_repo = get_expense_repository()
+        expenses = await expense_repo.aget_by_user(user_id, filters, fields)
 
         logger.info(f"Retrieved {len(expenses)} expenses for user {user_id}")
 
-        return JsonResponse({'expenses': expenses})
+        return FastJsonResponse({'expenses': expenses})
 
     except Exception as e:
         logger.error(f"Error retrieving expenses: {str(e)}")
-        return JsonResponse({'error': 'Failed to retrieve expenses'}, status=500)
+        return FastJsonResponse({'error': 'Failed to retrieve expenses'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["GET"])
+def expense_changes(request):
+    """Delta sync: expenses changed and deleted since the client's sync token."""
+    try:
+        user_id = request.user.id
+        token = request.GET.get('since')
+
+        try:
+            since = decode_sync_token(token) if token else None
+        except SyncTokenExpired as e:
+            # Deletes older than the tombstone retention are gone; 410 tells
+            # the client to drop its sync point and fetch a full snapshot
+            return FastJsonResponse({'error': str(e)}, status=410)
+        except ValueError as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+
+        # Taken before reading so nothing written during the read is skipped
+        sync_token = next_sync_token()
+
+        expense_repo = get_expense_repository()
+        changed, deleted = expense_repo.get_changes(user_id, since)
+
+        logger.info(
+            f"Sync returned {len(changed)} changed and {len(deleted)} deleted "
+            f"expenses for user {user_id}"
+        )
+
+        return FastJsonResponse({
+            'changes': changed,
+            'deleted': deleted,
+            'sync_token': sync_token,
+            # Without a token the changes are a full snapshot to replace local state
+            'full': since is None,
+        })
+
+    except Exception as e:
+        logger.error(f"Error retrieving expense changes: {str(e)}")
+        return FastJsonResponse({'error': 'Failed to retrieve expense changes'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["GET"])
+async def expense_events(request):
+    """Server-sent events stream of the user's expense changes (ASGI only)."""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would be held for the lifetime of the stream
+        return FastJsonResponse({'error': 'Event stream requires the ASGI server'}, status=501)
+
+    user = await request.auser()
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+
+    async def stream():
+        # Ask browsers to wait before reconnecting after a dropped connection
+        yield b'retry: 3000\n\n'
+        async for event in get_event_broker().listen(user.id, heartbeat=heartbeat):
+            yield encode_sse(event)
+
+    logger.info(f"Event stream opened for user {user.id}")
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["GET"])
+def search_expenses(request):
+    """Full-text search over the user's expense categories and descriptions."""
+    try:
+        user_id = request.user.id
+        query = request.GET.get('q', '').strip()
+
+        if not query:
+            return FastJsonResponse({'error': 'Search query required'}, status=400)
+
+        try:
+            page, page_size = parse_pagination(request.GET)
+        except ValueError as e:
+            return FastJsonResponse({'error': str(e)}, status=400)
+
+        expense_repo = get_expense_repository()
+        results, total = expense_repo.search(
+            user_id, query, limit=page_size, offset=(page - 1) * page_size
+        )
+
+        logger.info(f"Search returned {len(results)} of {total} expenses for user {user_id}")
+
+        return FastJsonResponse({
+            'results': results,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+        })
+
+    except Exception as e:
+        logger.error(f"Error searching expenses: {str(e)}")
+        return FastJsonResponse({'error': 'Failed to search expenses'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["GET"])
+def list_categories(request):
+    """Autocomplete the user's categories by prefix, most used first."""
+    try:
+        user_id = request.user.id
+        prefix = request.GET.get('prefix', '').strip()
+
+        try:
+            limit = int(request.GET.get('limit', DEFAULT_SUGGESTION_LIMIT))
+        except ValueError:
+            return FastJsonResponse({'error': 'limit must be an integer'}, status=400)
+        limit = max(1, min(limit, MAX_SUGGESTION_LIMIT))
+
+        expense_repo = get_expense_repository()
+        categories = get_category_index().suggest(
+            user_id, prefix, expense_repo.get_category_counts, limit=limit
+        )
+
+        return FastJsonResponse({'categories': categories})
+
+    except Exception as e:
+        logger.error(f"Error retrieving categories: {str(e)}")
+        return FastJsonResponse({'error': 'Failed to retrieve categories'}, status=500)
+
+
+def _decode_receipt(file_data):
+    """
+    Decode a base64 (or data URL) receipt upload.
+
+    Returns:
+        (file_bytes, None) or (None, error response)
+    """
+    try:
+        if file_data.startswith('data:'):
+            header, encoded = file_data.split(',', 1)
+            file_data = encoded
+
+        file_bytes = base64.b64decode(file_data)
+        if len(file_bytes) > 10 * 1024 * 1024:  # 10MB limit
+            return None, FastJsonResponse({'error': 'File too large (max 10MB)'}, status=400)
+        return file_bytes, None
+    except Exception as e:
+        logger.error(f"File decode error: {str(e)}")
+        return None, FastJsonResponse({'error': 'Invalid file format'}, status=400)
 
 
 @login_required(login_url='/api/login/')
@@ -258,27 +488,17 @@ def upload_receipt(request):
 
         # Validate required fields
         if not data.get('file') or not data.get('filename'):
-            return JsonResponse({
+            return FastJsonResponse({
                 'error': 'Validation failed',
                 'errors': {'file': 'file is required', 'filename': 'filename is required'}
             }, status=400)
 
-        file_data = data.get('file')
         file_name = data.get('filename')
         expense_id = data.get('expense_id')
 
-        # Validate and decode file data
-        try:
-            if file_data.startswith('data:'):
-                header, encoded = file_data.split(',', 1)
-                file_data = encoded
-
-            file_bytes = base64.b64decode(file_data)
-            if len(file_bytes) > 10 * 1024 * 1024:  # 10MB limit
-                return JsonResponse({'error': 'File too large (max 10MB)'}, status=400)
-        except Exception as e:
-            logger.error(f"File decode error: {str(e)}")
-            return JsonResponse({'error': 'Invalid file format'}, status=400)
+        file_bytes, error_response = _decode_receipt(data.get('file'))
+        if error_response:
+            return error_response
 
         # Use service layer for file storage
         file_storage = get_file_storage()
@@ -290,26 +510,102 @@ def upload_receipt(request):
         if expense_id:
             try:
                 expense_repo = get_expense_repository()
-                expense_repo.update_receipt_url(expense_id, file_url)
-                logger.info(f"Receipt URL saved to expense {expense_id}")
+                linked = expense_repo.update_receipt_url(expense_id, file_url, user_id)
+            except Exception as e:
+                logger.error(f"Error updating expense receipt URL: {str(e)}")
+                return FastJsonResponse({'error': 'Receipt uploaded but could not link to expense'}, status=500)
+            # Missing, or owned by someone else; the repository checks both in its write
+            if not linked:
+                return FastJsonResponse({'error': 'Expense not found'}, status=404)
+            logger.info(f"Receipt URL saved to expense {expense_id}")
+
+        return FastJsonResponse({
+            'file_url': file_url,
+            'file_name': file_name,
+            'expense_id': expense_id
+        })
+
+    except json.JSONDecodeError:
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
+    except Exception as e:
+        logger.error(f"Error uploading receipt: {str(e)}")
+        return FastJsonResponse({'error': 'Upload failed'}, status=500)
+
+
+@login_required(login_url='/api/login/')
+@require_http_methods(["POST"])
+async def upload_receipt_async(request):
+    """Async variant of upload_receipt, served when ASYNC_VIEWS is enabled."""
+    try:
+        data = json.loads(request.body)
+        user_id = (await request.auser()).id
+
+        # Validate required fields
+        if not data.get('file') or not data.get('filename'):
+            return FastJsonResponse({
+                'error': 'Validation failed',
+                'errors': {'file': 'file is required', 'filename': 'filename is required'}
+            }, status=400)
+
+        file_name = data.get('filename')
+        expense_id = data.get('expense_id')
+
+        file_bytes, error_response = _decode_receipt(data.get('file'))
+        if error_response:
+            return error_response
+
+        file_storage = get_file_storage()
+        file_url = await file_storage.aupload(file_name, file_bytes, user_id)
+
+        logger.info(f"Receipt uploaded for user {user_id}: {file_name}")
+
+        # Update expense with receipt URL if expense_id provided
+        if expense_id:
+            try:
+                expense_repo = get_expense_repository()
+                linked = await expense_repo.aupdate_receipt_url(expense_id, file_url, user_id)
             except Exception as e:
                 logger.error(f"Error updating expense receipt URL: {str(e)}")
-                return JsonResponse({'error': 'Receipt uploaded but could not link to expense'}, status=500)
+                return FastJsonResponse({'error': 'Receipt uploaded but could not link to expense'}, status=500)
+            # Missing, or owned by someone else; the repository checks both in its write
+            if not linked:
+                return FastJsonResponse({'error': 'Expense not found'}, status=404)
+            logger.info(f"Receipt URL saved to expense {expense_id}")
 
-        return JsonResponse({
+        return FastJsonResponse({
             'file_url': file_url,
             'file_name': file_name,
             'expense_id': expense_id
         })
 
     except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        return FastJsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         logger.error(f"Error uploading receipt: {str(e)}")
-        return JsonResponse({'error': 'Upload failed'}, status=500)
+        return FastJsonResponse({'error': 'Upload failed'}, status=500)
 
 
 @require_http_methods(["GET"])
 def healthz(request):
     """Health check endpoint."""
-    return JsonResponse({'status': 'ok'})
+    return FastJsonResponse({'status': 'ok'})
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Prometheus metrics aggregated across all worker processes.
+
+    404 unless METRICS_ENABLED; requires "Authorization: Bearer <METRICS_TOKEN>"
+    when a token is configured.
+    """
+    if not metrics.is_enabled():
+        return FastJsonResponse({'error': 'Not found'}, status=404)
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return FastJsonResponse({'error': 'Unauthorized'}, status=401)
+
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1 @@
+# Micro-benchmarks for the expense tracker backend
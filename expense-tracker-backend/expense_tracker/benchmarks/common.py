@@ -0,0 +1,125 @@
+"""Shared helpers for the benchmark scripts."""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+
+def setup_django(settings_module: str = 'expense_tracker.settings.local') -> None:
+    """Configure Django for a standalone benchmark run."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+
+    import django
+    django.setup()
+
+
+def measure(
+    func: Callable[[], object],
+    repeat: int = 20,
+    warmup: int = 3,
+    clock: Callable[[], float] = time.perf_counter,
+) -> List[float]:
+    """
+    Time repeated calls to func.
+
+    Args:
+        clock: Timer to use, e.g. time.process_time for CPU time
+
+    Returns:
+        Duration of each measured call in seconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return samples
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0-100)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize samples in milliseconds."""
+    return {
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    """Print benchmark summaries as an aligned table."""
+    width = max(len(name) for name in results)
+    columns = list(next(iter(results.values())))
+    print(f"{'case':<{width}}  " + '  '.join(f'{column:>10}' for column in columns))
+    for name, summary in results.items():
+        print(f'{name:<{width}}  ' + '  '.join(f'{summary[column]:>10.2f}' for column in columns))
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Dict[str, float]]], **parameters) -> None:
+    """
+    Write results to a JSON baseline for later runs to compare against.
+
+    Args:
+        results: Summaries by group (e.g. backend) and case
+        parameters: Run parameters recorded alongside, e.g. dataset size
+    """
+    baseline = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'parameters': parameters,
+        'results': results,
+    }
+    with open(path, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare_baseline(
+    path: str,
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    metric: str = 'p95_ms',
+    threshold: float = 0.2,
+) -> List[str]:
+    """
+    Compare results with a saved baseline and print the change per case.
+
+    Args:
+        metric: Summary column to compare (lower is better)
+        threshold: Relative slowdown reported as a regression (0.2 = 20%)
+
+    Returns:
+        Descriptions of the cases that regressed beyond the threshold
+    """
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+
+    regressions = []
+    print(f'Change in {metric} against {path}:')
+    for group, cases in results.items():
+        for case, summary in cases.items():
+            previous = baseline.get(group, {}).get(case, {}).get(metric)
+            if not previous:
+                print(f'  {group}/{case}: not in baseline')
+                continue
+            change = summary[metric] / previous - 1
+            flag = '  REGRESSION' if change > threshold else ''
+            print(f'  {group}/{case}: {previous:.3f} -> {summary[metric]:.3f} ({change:+.1%}){flag}')
+            if flag:
+                regressions.append(f'{group}/{case} {metric} {change:+.1%}')
+    return regressions
@@ -0,0 +1,58 @@
+"""
+Benchmark response compression of expense list payloads.
+
+Reports bytes on the wire and CPU time per request for each encoding and
+level that CompressionMiddleware can negotiate.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.compression [--rows 100 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import measure, percentile, setup_django
+from benchmarks.serialization import build_rows
+
+# (encoding, level) pairs; the first level of each is the middleware default
+CASES = [
+    ('gzip', 6), ('gzip', 1), ('gzip', 9),
+    ('br', 4), ('br', 1), ('br', 6),
+    ('zstd', 3), ('zstd', 1), ('zstd', 10),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from auth_app.middleware.compression import available_encodings, compress
+    from auth_app.services.serialization import dumps
+
+    encodings = set(available_encodings())
+
+    print(f"{'rows':>6}  {'encoding':<10}  {'bytes':>10}  {'ratio':>6}  {'cpu p50 ms':>10}  {'cpu p95 ms':>10}")
+    for count in args.rows:
+        body = dumps({'expenses': build_rows(count)})
+        print(f"{count:>6}  {'identity':<10}  {len(body):>10}  {1:>6.2f}  {0:>10.2f}  {0:>10.2f}")
+        for encoding, level in CASES:
+            if encoding not in encodings:
+                continue
+            size = len(compress(encoding, body, level))
+            samples = measure(
+                lambda: compress(encoding, body, level),
+                repeat=args.repeat,
+                clock=time.process_time,
+            )
+            print(
+                f"{count:>6}  {f'{encoding}-{level}':<10}  {size:>10}  {len(body) / size:>6.2f}"
+                f"  {percentile(samples, 50) * 1000:>10.2f}  {percentile(samples, 95) * 1000:>10.2f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
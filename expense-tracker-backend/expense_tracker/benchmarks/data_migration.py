@@ -0,0 +1,127 @@
+"""
+Benchmark the 0002 user ForeignKey data migration, per row versus batched.
+
+Seeds --expenses expenses on a scratch SQLite file, --orphans percent of
+them without a valid user, then runs the previous per-row migration and
+the batched one from auth_app/migrations/0002 against the models as of that
+migration. Each run starts from the same seeded rows. Reports rows/s and
+the number of queries.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.data_migration [--expenses 20000] [--users 100]
+        [--orphans 5] [--batch-size 500]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import random
+import tempfile
+import time
+from unittest.mock import patch
+
+from benchmarks.common import setup_django
+
+MIGRATION = 'auth_app.migrations.0002_remove_expense_user_id_expense_user'
+
+
+def previous_migrate(apps, schema_editor):
+    """The per-row forward migration as it was before batching."""
+    Expense = apps.get_model('auth_app', 'Expense')
+    User = apps.get_model('auth', 'User')
+
+    for expense in Expense.objects.all():
+        try:
+            user_pk = int(expense.user_id)
+            try:
+                expense.user = User.objects.get(pk=user_pk)
+                expense.save(update_fields=['user'])
+            except User.DoesNotExist:
+                print(f'Warning: Deleting orphaned expense {expense.id}')
+                expense.delete()
+        except (ValueError, TypeError):
+            print(f'Warning: Deleting orphaned expense {expense.id}')
+            expense.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--expenses', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--orphans', type=float, default=5, help='percent of expenses without a valid user')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from django.db.migrations.loader import MigrationLoader
+
+    from auth_app.models import Expense
+    from utils import batch_migration
+
+    migration = importlib.import_module(MIGRATION)
+
+    def batched_migrate(apps, schema_editor):
+        with patch.object(batch_migration, 'DEFAULT_BATCH_SIZE', args.batch_size):
+            migration.migrate_user_ids_to_foreign_key(apps, schema_editor)
+
+    def count_query(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    cases = {'per row': previous_migrate, f'batched ({args.batch_size})': batched_migrate}
+    queries = [0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        with contextlib.redirect_stdout(io.StringIO()):
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            apps = MigrationLoader(connection).project_state(('auth_app', MIGRATION.rsplit('.', 1)[1])).apps
+            User.objects.bulk_create(
+                User(username=f'bench{index}', email=f'bench{index}@example.com') for index in range(args.users)
+            )
+            user_ids = list(User.objects.values_list('pk', flat=True))
+
+            results = {}
+            for name, func in cases.items():
+                rng = random.Random(args.seed)
+                Expense.objects.all().delete()
+                Expense.objects.bulk_create(
+                    (
+                        Expense(
+                            user_id=None if rng.random() * 100 < args.orphans else rng.choice(user_ids),
+                            amount=round(rng.uniform(1, 200), 2),
+                            category='Food',
+                        )
+                        for _ in range(args.expenses)
+                    ),
+                    batch_size=1000,
+                )
+
+                # One transaction, as RunPython runs on SQLite
+                queries[0] = 0
+                with connection.execute_wrapper(count_query), contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    with transaction.atomic():
+                        func(apps, None)
+                    elapsed = time.perf_counter() - start
+                results[name] = (elapsed, queries[0], Expense.objects.count())
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f'{args.expenses} expenses, {args.orphans:g}% orphaned, {args.users} users\n')
+    print(f"{'':<20}{'seconds':>10}{'rows/s':>12}{'queries':>10}{'kept':>8}")
+    for name, (elapsed, queries, kept) in results.items():
+        print(f'{name:<20}{elapsed:>10.2f}{args.expenses / elapsed:>12,.0f}{queries:>10}{kept:>8}')
+    (previous, *_), (current, *_) = results.values()
+    print(f'\nSpeedup: {previous / current:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
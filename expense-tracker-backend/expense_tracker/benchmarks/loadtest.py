@@ -0,0 +1,349 @@
+"""
+Load-test the API over HTTP with concurrent simulated users.
+
+Each of --users simulated users signs up and logs in, then runs --iterations
+rounds of: add an expense, list expenses, upload a receipt for the expense.
+Expenses and receipts come from sample-receipts/receipt-generator.py. Every
+user keeps its own session cookie and a keep-alive connection. All users run
+concurrently on one asyncio loop, using a small built-in HTTP/1.1 client so
+no extra dependencies are needed. Reports throughput, error rate and latency
+percentiles per endpoint. --save and --compare work as in
+benchmarks.repositories.
+
+Point --url at a running server, or use --serve to start one for the run:
+"runserver" is Django's development server, "gunicorn" uses gunicorn.conf.py.
+A started server uses a freshly migrated scratch SQLite database
+(SQLITE_PATH) with local settings, and RATELIMIT_ENABLE=false so every
+simulated user can sign up and log in from this one IP. Against --url,
+raise or disable the server's signup/login rate limits yourself.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.loadtest [--url http://127.0.0.1:8000 | --serve gunicorn]
+        [--users 20] [--iterations 10] [--save results.json] [--compare results.json]
+"""
+
+import argparse
+import asyncio
+import base64
+import importlib.util
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.common import compare_baseline, print_table, save_baseline, summarize
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+RECEIPT_GENERATOR = PROJECT_DIR.parents[1] / 'sample-receipts' / 'receipt-generator.py'
+CATEGORIES = ('Food', 'Transport', 'Entertainment', 'Utilities', 'Shopping')
+PASSWORD = 'load-test-password-1'
+
+
+def load_receipt_generator(path: Path):
+    """Import receipt-generator.py (not an importable module name) from its path."""
+    spec = importlib.util.spec_from_file_location('receipt_generator', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class HttpClient:
+    """
+    Minimal HTTP/1.1 client over one keep-alive connection with a cookie jar.
+
+    Handles Content-Length and chunked responses; reconnects when the server
+    closes the connection.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.cookies: Dict[str, str] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self, method: str, path: str, body: Optional[dict] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes]:
+        """Send a request (JSON body if given); returns (status, response body)."""
+        payload = json.dumps(body).encode() if body is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            f'Content-Length: {len(payload)}',
+        ]
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{name}={value}' for name, value in self.cookies.items()))
+        lines.extend(f'{name}: {value}' for name, value in (headers or {}).items())
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+        reused = self._writer is not None
+        try:
+            return await self._exchange(message)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+        # The server closed an idle keep-alive connection; retry once on a new one
+        return await self._exchange(message)
+
+    async def _exchange(self, message: bytes) -> Tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(message)
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        response_headers = []
+        while True:
+            line = await self._reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.append((name.strip().lower(), value.strip()))
+
+        headers = dict(response_headers)
+        for name, value in response_headers:
+            if name == 'set-cookie':
+                cookie_name, _, cookie_value = value.split(';', 1)[0].partition('=')
+                self.cookies[cookie_name] = cookie_value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            content = await self._read_chunked()
+        elif 'content-length' in headers:
+            content = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            content = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, content
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                # Skip trailers up to the terminating blank line
+                while await self._reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._reader = self._writer = None
+
+
+class Stats:
+    """Latencies and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_samples: Dict[str, str] = {}
+
+    def record(self, endpoint: str, seconds: float, error: Optional[str] = None) -> None:
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        if error is not None:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            self.error_samples.setdefault(endpoint, error)
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for endpoint, samples in self.latencies.items():
+            errors = self.errors.get(endpoint, 0)
+            results[endpoint] = {
+                'requests': len(samples),
+                'error_pct': errors / len(samples) * 100,
+                'req_per_sec': len(samples) / elapsed,
+                **summarize(samples),
+            }
+        return results
+
+
+class SimulatedUser:
+    """One user going through signup, login and the expense flow."""
+
+    def __init__(self, client: HttpClient, stats: Stats, generator, email: str, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.generator = generator
+        self.email = email
+        self.rng = rng
+        self.csrf_token = ''
+
+    async def call(self, method: str, path: str, body: Optional[dict] = None, expected=(200,)):
+        """Make a timed request; returns the decoded JSON body, or None on failure."""
+        headers = {'X-CSRFToken': self.csrf_token} if self.csrf_token and method != 'GET' else None
+        endpoint = f'{method} {path.split("?")[0]}'
+        start = time.perf_counter()
+        try:
+            status, content = await self.client.request(method, path, body, headers)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.stats.record(endpoint, time.perf_counter() - start, f'{type(e).__name__}: {e}')
+            return None
+        elapsed = time.perf_counter() - start
+        if status not in expected:
+            self.stats.record(endpoint, elapsed, f'HTTP {status}: {content[:200]!r}')
+            return None
+        self.stats.record(endpoint, elapsed)
+        return json.loads(content) if content else {}
+
+    async def run(self, iterations: int) -> None:
+        credentials = {'email': self.email, 'password': PASSWORD}
+        if await self.call('POST', '/api/signup/', credentials, expected=(201,)) is None:
+            return
+        login = await self.call('POST', '/api/login/', credentials)
+        if login is None:
+            return
+        self.csrf_token = login['csrf_token']
+
+        for _ in range(iterations):
+            receipt, metadata = self.generator.generate_receipt()
+            expense = await self.call('POST', '/api/expenses/', {
+                'amount': metadata['total'],
+                'category': self.rng.choice(CATEGORIES),
+                'description': metadata['merchant'],
+            }, expected=(201,))
+            await self.call('GET', '/api/expenses/list/')
+            if expense is not None:
+                await self.call('POST', '/api/receipts/upload/', {
+                    'file': base64.b64encode(receipt.encode()).decode(),
+                    'filename': 'receipt.txt',
+                    'expense_id': expense['expense_id'],
+                })
+
+
+async def run_load(host: str, port: int, users: int, iterations: int, generator, seed: int):
+    """Run all simulated users concurrently; returns (stats, elapsed seconds)."""
+    stats = Stats()
+    run_id = uuid.uuid4().hex[:8]
+    rng = random.Random(seed)
+    clients = [HttpClient(host, port) for _ in range(users)]
+    simulated = [
+        SimulatedUser(client, stats, generator, f'loadtest-{run_id}-{index}@example.com', rng)
+        for index, client in enumerate(clients)
+    ]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(user.run(iterations) for user in simulated))
+    finally:
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*(client.close() for client in clients))
+    return stats, elapsed
+
+
+def start_server(kind: str, port: int, database: str) -> subprocess.Popen:
+    """Start runserver or gunicorn on port with a migrated database at path; waits for /api/healthz/."""
+    env = dict(os.environ, PORT=str(port), RATELIMIT_ENABLE='false', SQLITE_PATH=database)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'expense_tracker.settings.local')
+    env.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+        cwd=PROJECT_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py']
+    else:
+        command = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+
+    server = subprocess.Popen(
+        command, cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'{kind} exited during startup')
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/healthz/', timeout=5).read()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    stop_server(server)
+    raise TimeoutError(f'{kind} not ready after 60s')
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='server to test')
+    parser.add_argument('--serve', choices=('runserver', 'gunicorn'), help='start a server for the run')
+    parser.add_argument('--port', type=int, default=8766, help='port for --serve')
+    parser.add_argument('--users', type=int, default=20, help='concurrent simulated users')
+    parser.add_argument('--iterations', type=int, default=10, help='expense flows per user')
+    parser.add_argument('--receipts', type=Path, default=RECEIPT_GENERATOR, help='receipt-generator.py')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare p95 with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    generator = load_receipt_generator(args.receipts)
+    random.seed(args.seed)
+
+    with ExitStack() as stack:
+        if args.serve:
+            host, port = '127.0.0.1', args.port
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            server = start_server(args.serve, port, os.path.join(directory, 'loadtest.sqlite3'))
+            stack.callback(stop_server, server)
+        else:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        stats, elapsed = asyncio.run(
+            run_load(host, port, args.users, args.iterations, generator, args.seed)
+        )
+
+    results = stats.summary(elapsed)
+    total = sum(len(samples) for samples in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f'{args.users} users x {args.iterations} iterations against '
+          f'{args.serve or args.url}: {total} requests in {elapsed:.2f}s '
+          f'({total / elapsed:.1f} req/s), {errors} errors')
+    if results:
+        print_table(results)
+    for endpoint, error in stats.error_samples.items():
+        print(f'First error for {endpoint}: {error}')
+
+    parameters = {'users': args.users, 'iterations': args.iterations, 'server': args.serve or args.url}
+    if args.save:
+        save_baseline(args.save, {'loadtest': results}, **parameters)
+        print(f'\nSaved baseline to {args.save}')
+    if args.compare:
+        print()
+        regressions = compare_baseline(args.compare, {'loadtest': results}, threshold=args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark the expense repository backends operation by operation.
+
+Seeds --users users with --expenses expenses each, then times single calls
+to create, get_by_user, get_by_id, update_receipt_url and
+add_expense_with_receipt. SQLiteExpenseRepository runs against a scratch
+SQLite file; DynamoDBExpenseRepository runs against moto, or against
+DynamoDB Local when --dynamodb-endpoint is given. Reports per-call
+percentiles and throughput, and can save the results as a JSON baseline or
+compare them with one (exiting 1 on a regression).
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.repositories [--backends sqlite dynamodb]
+        [--users 10] [--expenses 100] [--calls 500]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from benchmarks.common import compare_baseline, print_table, save_baseline, setup_django, summarize
+
+CATEGORIES = ('Food', 'Transport', 'Entertainment', 'Utilities', 'Coffee')
+TABLE_NAME = 'benchmark-expenses'
+
+
+@contextmanager
+def sqlite_repository(users: int):
+    """SQLiteExpenseRepository on a scratch database file with ``users`` users."""
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    from local_app.implementations.sqlite_expense_repo import SQLiteExpenseRepository
+
+    with tempfile.TemporaryDirectory() as directory:
+        # A file rather than :memory: so commits pay for disk I/O as in production
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            User.objects.bulk_create(
+                User(username=f'bench{index}', email=f'bench{index}@example.com')
+                for index in range(users)
+            )
+            user_ids = list(User.objects.values_list('pk', flat=True))
+            yield SQLiteExpenseRepository(), user_ids
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def dynamodb_repository(users: int, endpoint_url=None):
+    """DynamoDBExpenseRepository on a fresh table in moto or DynamoDB Local."""
+    import boto3
+    from django.test import override_settings
+
+    from cloud_app.implementations.dynamodb_expense_repo import DynamoDBExpenseRepository
+    from cloud_app.implementations.utils.aws_clients import client_provider
+
+    if endpoint_url is None:
+        from moto import mock_aws
+        mock = mock_aws()
+    else:
+        mock = None
+
+    aws = {
+        'region_name': 'us-east-1',
+        'aws_access_key_id': 'benchmark',
+        'aws_secret_access_key': 'benchmark',
+        'endpoint_url': endpoint_url,
+    }
+    overrides = override_settings(
+        AWS_REGION=aws['region_name'],
+        AWS_ACCESS_KEY_ID=aws['aws_access_key_id'],
+        AWS_SECRET_ACCESS_KEY=aws['aws_secret_access_key'],
+        DYNAMODB_ENDPOINT_URL=endpoint_url,
+        DYNAMODB_TABLE_NAME=TABLE_NAME,
+        DYNAMODB_USER_INDEX='user_id-index',
+    )
+
+    if mock is not None:
+        mock.start()
+    overrides.enable()
+    client_provider.reset()
+    try:
+        # Same schema as archive/scripts/cloud/setup_dynamodb.py
+        table = boto3.resource('dynamodb', **aws).create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'expense_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'expense_id', 'AttributeType': 'S'},
+                {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'user_id-index',
+                'KeySchema': [{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'},
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        table.wait_until_exists()
+        try:
+            yield DynamoDBExpenseRepository(), list(range(1, users + 1))
+        finally:
+            table.delete()
+    finally:
+        client_provider.reset()
+        overrides.disable()
+        if mock is not None:
+            mock.stop()
+
+
+def seed(repository, user_ids, expenses: int, rng: random.Random):
+    """Create ``expenses`` expenses per user; returns (expense id, owner) pairs."""
+    created = []
+    for user_id in user_ids:
+        for index in range(expenses):
+            expense = repository.create(
+                user_id, round(rng.uniform(1, 200), 2), rng.choice(CATEGORIES), f'seeded expense {index}'
+            )
+            created.append((expense['expense_id'], user_id))
+    return created
+
+
+def operations(repository, user_ids, expenses, rng: random.Random):
+    """Zero-argument callables for each benchmarked operation, on random keys."""
+    def update_receipt_url(expense):
+        # Owner-scoped, as the upload view calls it
+        expense_id, user_id = expense
+        return repository.update_receipt_url(expense_id, 'https://example.com/receipt.jpg', user_id)
+
+    return {
+        'create': lambda: repository.create(
+            rng.choice(user_ids), 12.5, rng.choice(CATEGORIES), 'benchmark'
+        ),
+        'get_by_user': lambda: repository.get_by_user(rng.choice(user_ids)),
+        'get_by_id': lambda: repository.get_by_id(rng.choice(expenses)[0]),
+        'update_receipt_url': lambda: update_receipt_url(rng.choice(expenses)),
+        'add_expense_with_receipt': lambda: repository.add_expense_with_receipt(
+            rng.choice(user_ids), 12.5, rng.choice(CATEGORIES), 'benchmark',
+            'https://example.com/receipt.jpg',
+        ),
+    }
+
+
+def time_calls(func, calls: int, warmup: int = 10):
+    """Time ``calls`` individual calls; returns the summary plus throughput."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    summary = summarize(samples)
+    summary['ops_per_sec'] = calls / sum(samples)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backends', nargs='+', choices=('sqlite', 'dynamodb'), default=['sqlite', 'dynamodb'])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--expenses', type=int, default=100, help='seeded expenses per user')
+    parser.add_argument('--calls', type=int, default=500, help='timed calls per operation')
+    parser.add_argument('--dynamodb-endpoint', help='DynamoDB Local URL (default: moto)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare p95 with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    setup_django()
+    # Measure the repositories, not the console handler writing their info logs
+    for name in ('local_app', 'cloud_app', 'auth_app', 'botocore'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    backends = {
+        'sqlite': lambda: sqlite_repository(args.users),
+        'dynamodb': lambda: dynamodb_repository(args.users, args.dynamodb_endpoint),
+    }
+
+    results = {}
+    for backend in args.backends:
+        rng = random.Random(args.seed)
+        with ExitStack() as stack:
+            try:
+                repository, user_ids = stack.enter_context(backends[backend]())
+            except ImportError as e:
+                print(f'Skipping {backend}: {e}')
+                continue
+            expenses = seed(repository, user_ids, args.expenses, rng)
+            results[backend] = {
+                name: time_calls(func, args.calls)
+                for name, func in operations(repository, user_ids, expenses, rng).items()
+            }
+
+        print(f'\n{backend}: {args.users} users x {args.expenses} expenses, {args.calls} calls per operation')
+        print_table(results[backend])
+
+    parameters = {'users': args.users, 'expenses': args.expenses, 'calls': args.calls}
+    if args.save:
+        save_baseline(args.save, results, **parameters)
+        print(f'\nSaved baseline to {args.save}')
+    if args.compare:
+        print()
+        regressions = compare_baseline(args.compare, results, threshold=args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark JSON serialization of a large expense list.
+
+Compares the previous path (per-row Decimal/datetime conversion followed by
+JsonResponse) with FastJsonResponse on the orjson and stdlib backends.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.serialization [--rows 10000] [--repeat 20]
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from benchmarks.common import measure, print_table, setup_django, summarize
+
+
+def build_rows(count: int):
+    """Build expense rows as the ORM repository returns them."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    categories = ['Food', 'Transport', 'Groceries', 'Entertainment', 'Utilities']
+    return [
+        {
+            'expense_id': str(i),
+            'user_id': 1,
+            'amount': Decimal(f'{(i % 5000) / 100 + 1:.2f}'),
+            'category': categories[i % len(categories)],
+            'description': f'Expense number {i}',
+            'timestamp': start + timedelta(minutes=i),
+            'receipt_url': None if i % 3 else f'/media/receipts/1/{i}.jpg',
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.http import JsonResponse
+    from django.test import override_settings
+
+    from auth_app.services.serialization import FastJsonResponse, get_json_backend
+
+    rows = build_rows(args.rows)
+
+    def previous():
+        converted = [
+            dict(
+                row,
+                amount=float(row['amount']),
+                timestamp=row['timestamp'].isoformat(),
+            )
+            for row in rows
+        ]
+        return JsonResponse({'expenses': converted})
+
+    def fast():
+        return FastJsonResponse({'expenses': rows})
+
+    results = {'JsonResponse + per-row conversion': summarize(measure(previous, args.repeat))}
+    with override_settings(API_JSON_ENCODER='stdlib'):
+        results['FastJsonResponse (stdlib)'] = summarize(measure(fast, args.repeat))
+    if get_json_backend() == 'orjson':
+        results['FastJsonResponse (orjson)'] = summarize(measure(fast, args.repeat))
+    else:
+        print('orjson is not installed; skipping the orjson case')
+
+    print(f'Serializing {args.rows} expenses, {args.repeat} runs')
+    print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the per-request overhead of ServerTimingMiddleware.
+
+Runs a view that makes two repository calls and returns a FastJsonResponse,
+with and without the middleware (and its timing proxy). No database is
+touched, so the difference is the instrumentation itself.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.server_timing [--requests 10000] [--repeat 20]
+"""
+
+import argparse
+import logging
+
+from benchmarks.common import measure, print_table, setup_django, summarize
+
+
+class Repository:
+    """Stand-in for an expense repository with no I/O."""
+
+    def get_by_user(self, user_id):
+        return [{'expense_id': '1', 'amount': 1.5}]
+
+    def get_categories(self, user_id):
+        return ['Food']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import RequestFactory, override_settings
+
+    from auth_app.middleware import ServerTimingMiddleware
+    from auth_app.services import FastJsonResponse
+    from utils.perf import TimedProxy
+
+    # Measure the log call, not the handler writing it out
+    logging.getLogger('auth_app.middleware.server_timing').setLevel(logging.WARNING)
+    request = RequestFactory().get('/api/expenses/')
+
+    def make_view(repo):
+        def view(request):
+            return FastJsonResponse({
+                'expenses': repo.get_by_user(1),
+                'categories': repo.get_categories(1),
+            })
+        return view
+
+    with override_settings(SERVER_TIMING=True):
+        handlers = {
+            'no instrumentation': make_view(Repository()),
+            'ServerTimingMiddleware': ServerTimingMiddleware(make_view(TimedProxy(Repository(), 'repo'))),
+        }
+
+    def run(handler):
+        def batch():
+            for _ in range(args.requests):
+                handler(request)
+        return batch
+
+    results = {name: summarize(measure(run(handler), args.repeat)) for name, handler in handlers.items()}
+
+    print(f'{args.requests} requests per run, {args.repeat} runs')
+    print_table(results)
+    baseline, instrumented = (results[name]['p50_ms'] for name in handlers)
+    print(f'Overhead per request: {(instrumented - baseline) / args.requests * 1000:.1f} us')
+
+
+if __name__ == '__main__':
+    main()
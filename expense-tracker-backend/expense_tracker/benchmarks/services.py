@@ -0,0 +1,80 @@
+"""
+Benchmark service lookup overhead per request.
+
+Compares the previous factories (settings check, lazy import and a new
+instance on every call) with the shared instances from the service registry.
+Each sample resolves the repository, file storage and auth service for
+--requests simulated requests.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.services [--requests 10000] [--repeat 20]
+"""
+
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django, summarize
+
+
+def previous_factories():
+    """The per-call factories as they were before the registry."""
+    from django.conf import settings
+
+    def get_expense_repository():
+        is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
+        if is_local_demo:
+            from local_app.implementations.sqlite_expense_repo import SQLiteExpenseRepository
+            return SQLiteExpenseRepository()
+        from cloud_app.implementations.dynamodb_expense_repo import DynamoDBExpenseRepository
+        return DynamoDBExpenseRepository()
+
+    def get_file_storage():
+        is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
+        if is_local_demo:
+            from local_app.implementations.local_file_storage import LocalFileStorage
+            return LocalFileStorage()
+        from cloud_app.implementations.s3_file_storage import S3FileStorage
+        return S3FileStorage()
+
+    def get_auth_service():
+        is_local_demo = settings.IS_LOCAL_DEMO if hasattr(settings, 'IS_LOCAL_DEMO') else False
+        if is_local_demo:
+            from local_app.implementations.local_auth_service import LocalAuthService
+            return LocalAuthService()
+        from cloud_app.implementations.cognito_service import CognitoAuthService
+        return CognitoAuthService()
+
+    return get_expense_repository, get_file_storage, get_auth_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from auth_app.services import get_auth_service, get_expense_repository, get_file_storage
+
+    def run(factories):
+        def batch():
+            for _ in range(args.requests):
+                for factory in factories:
+                    factory()
+        return batch
+
+    cases = {
+        'per-call construction': previous_factories(),
+        'service registry': (get_expense_repository, get_file_storage, get_auth_service),
+    }
+    results = {name: summarize(measure(run(factories), args.repeat)) for name, factories in cases.items()}
+
+    print(f'Resolving 3 services for {args.requests} requests, {args.repeat} runs')
+    print_table(results)
+    previous, current = (results[name]['p50_ms'] for name in cases)
+    print(f'Per-request overhead: {previous / args.requests * 1000:.2f} us -> '
+          f'{current / args.requests * 1000:.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark concurrent reads and writes on SQLite, default vs server mode.
+
+For each mode, migrates and seeds a scratch database file, then runs
+--processes worker processes with --threads threads each (like gunicorn
+workers) for --duration seconds. Every operation is one simulated request:
+a write (SQLiteExpenseRepository.create) with probability --write-ratio,
+otherwise a read (get_by_user), followed by the end-of-request connection
+cleanup. Reports per-operation latency, throughput and the operations that
+failed with "database is locked". Server mode is SQLITE_SERVER_MODE in
+settings/local.py.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.sqlite_concurrency [--modes default server]
+        [--processes 4] [--threads 2] [--duration 10] [--write-ratio 0.2]
+        [--users 20] [--expenses 200]
+        [--save baseline.json] [--compare baseline.json] [--threshold 0.2]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import compare_baseline, print_table, save_baseline, setup_django, summarize
+
+CATEGORIES = ('Food', 'Transport', 'Entertainment', 'Utilities', 'Coffee')
+
+
+def prepare(users: int, expenses: int) -> None:
+    """Migrate the scratch database and seed users with expenses (runs in a child process)."""
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    from auth_app.models import Expense
+
+    # Data migrations print summaries even at verbosity 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        call_command('migrate', verbosity=0)
+    rng = random.Random(0)
+    User.objects.bulk_create(
+        User(username=f'bench{index}', email=f'bench{index}@example.com') for index in range(users)
+    )
+    Expense.objects.bulk_create(
+        (
+            Expense(user=user, amount=round(rng.uniform(1, 200), 2), category=rng.choice(CATEGORIES))
+            for user in User.objects.all()
+            for _ in range(expenses)
+        ),
+        batch_size=1000,
+    )
+
+
+def worker(index: int, threads: int, duration: float, write_ratio: float, barrier, results) -> None:
+    """Run simulated requests from ``threads`` threads until the shared deadline; report samples."""
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, close_old_connections
+
+    from local_app.implementations.sqlite_expense_repo import SQLiteExpenseRepository
+
+    # Measure the database, not the console handler writing the repository's info logs
+    for name in ('local_app', 'auth_app'):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    repository = SQLiteExpenseRepository()
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    close_old_connections()
+    samples = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+
+    barrier.wait()
+    deadline = time.monotonic() + duration
+
+    def run(thread: int) -> None:
+        rng = random.Random(index * 1000 + thread)
+        while time.monotonic() < deadline:
+            operation = 'write' if rng.random() < write_ratio else 'read'
+            user_id = rng.choice(user_ids)
+            start = time.perf_counter()
+            try:
+                if operation == 'write':
+                    repository.create(user_id, 12.5, rng.choice(CATEGORIES), 'benchmark')
+                else:
+                    repository.get_by_user(user_id)
+            except OperationalError:
+                with lock:
+                    errors[operation] += 1
+                continue
+            finally:
+                # What request_finished does after every request
+                close_old_connections()
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[operation].append(elapsed)
+
+    pool = [threading.Thread(target=run, args=(thread,)) for thread in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((samples, errors))
+
+
+def run_mode(server_mode: bool, args) -> dict:
+    """Benchmark one mode on a fresh database; returns summaries per operation."""
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        # Spawned children read settings from the environment they start with
+        os.environ['SQLITE_PATH'] = os.path.join(directory, 'concurrency.sqlite3')
+        os.environ['SQLITE_SERVER_MODE'] = 'true' if server_mode else 'false'
+
+        setup = context.Process(target=prepare, args=(args.users, args.expenses))
+        setup.start()
+        setup.join()
+        if setup.exitcode:
+            sys.exit(f'Preparing the database failed (exit code {setup.exitcode})')
+
+        barrier = context.Barrier(args.processes)
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=worker,
+                args=(index, args.threads, args.duration, args.write_ratio, barrier, results),
+            )
+            for index in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    summaries = {}
+    for operation in ('read', 'write'):
+        samples = [sample for report, _ in reports for sample in report[operation]]
+        failed = sum(errors[operation] for _, errors in reports)
+        summary = summarize(samples) if samples else dict.fromkeys(('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'), 0.0)
+        summary['ops_per_sec'] = len(samples) / args.duration
+        summary['locked'] = failed
+        summaries[operation] = summary
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--modes', nargs='+', choices=('default', 'server'), default=['default', 'server'])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=2, help='threads per process')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--expenses', type=int, default=200, help='seeded expenses per user')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare p95 with a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    # Children call setup_django themselves; this only fixes the settings they inherit
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expense_tracker.settings.local')
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+
+    results = {}
+    for mode in args.modes:
+        results[mode] = run_mode(mode == 'server', args)
+        print(
+            f'\n{mode}: {args.processes} processes x {args.threads} threads, '
+            f'{args.write_ratio:.0%} writes, {args.duration:g}s'
+        )
+        print_table(results[mode])
+
+    parameters = {
+        'processes': args.processes, 'threads': args.threads, 'duration': args.duration,
+        'write_ratio': args.write_ratio, 'users': args.users, 'expenses': args.expenses,
+    }
+    if args.save:
+        save_baseline(args.save, results, **parameters)
+        print(f'\nSaved baseline to {args.save}')
+    if args.compare:
+        print()
+        regressions = compare_baseline(args.compare, results, threshold=args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
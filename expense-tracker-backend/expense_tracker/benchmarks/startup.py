@@ -0,0 +1,107 @@
+"""
+Benchmark gunicorn time-to-ready and memory with and without preloading.
+
+Starts gunicorn from gunicorn.conf.py with GUNICORN_PRELOAD on and off,
+waits until every worker answers /api/healthz/, then reads proportional set
+size (PSS, shared pages split between processes) from /proc. Linux only.
+
+Usage (from the directory containing manage.py):
+    python -m benchmarks.startup [--workers 4] [--port 8765]
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import print_table
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+
+def child_pids(pid: int) -> List[int]:
+    """PIDs of a process's direct children."""
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [int(child) for child in children.read().split()]
+
+
+def pss_mb(pid: int) -> float:
+    """Proportional set size of a process in MB."""
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def wait_until_ready(url: str, master: subprocess.Popen, workers: int, timeout: float) -> float:
+    """Seconds until all workers are up and the app answers."""
+    start = time.perf_counter()
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        if master.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            if len(child_pids(master.pid)) == workers:
+                # Each request may land on any worker, so probe a few times
+                for _ in range(workers * 2):
+                    urllib.request.urlopen(url, timeout=5).read()
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f'gunicorn not ready after {timeout}s')
+
+
+def run_case(preload: bool, workers: int, port: int) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD='true' if preload else 'false',
+        WEB_CONCURRENCY=str(workers),
+        PORT=str(port),
+    )
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'expense_tracker.settings.local')
+    env.setdefault('DJANGO_SECRET_KEY', 'benchmark-only-secret-key')
+
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        ready = wait_until_ready(f'http://127.0.0.1:{port}/api/healthz/', master, workers, 60)
+        worker_pss = [pss_mb(pid) for pid in child_pids(master.pid)]
+        return {
+            'ready_s': ready,
+            'worker_mb': sum(worker_pss) / len(worker_pss),
+            'total_mb': pss_mb(master.pid) + sum(worker_pss),
+        }
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {
+        'no preload': run_case(False, args.workers, args.port),
+        'preload + warm-up': run_case(True, args.workers, args.port),
+    }
+
+    print(f'gunicorn with {args.workers} sync workers')
+    print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,27 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CloudAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cloud_app'
     verbose_name = 'Cloud Deployment'
+
+    def ready(self):
+        if getattr(settings, 'IS_LOCAL_DEMO', False):
+            return
+
+        from auth_app.services.registry import (
+            AUTH_SERVICE,
+            EXPENSE_REPOSITORY,
+            FILE_STORAGE,
+            service_registry,
+        )
+
+        from .implementations.cognito_service import CognitoAuthService
+        from .implementations.dynamodb_expense_repo import DynamoDBExpenseRepository
+        from .implementations.s3_file_storage import S3FileStorage
+
+        service_registry.register(EXPENSE_REPOSITORY, DynamoDBExpenseRepository)
+        service_registry.register(FILE_STORAGE, S3FileStorage)
+        service_registry.register(AUTH_SERVICE, CognitoAuthService)
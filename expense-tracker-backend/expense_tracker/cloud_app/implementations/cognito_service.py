@@ -7,13 +7,14 @@ import logging
 import os
 from typing import Dict, Optional, Tuple
 
-import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
 
 from auth_app.services.auth_service import AuthService
 from auth_app.services.response_service import ErrorMapper
 
+from .utils.aws_clients import client_provider
+
 logger = logging.getLogger(__name__)
 
 # Cognito configuration
@@ -21,16 +22,10 @@ COGNITO_REGION = settings.AWS_REGION
 COGNITO_CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
 COGNITO_CLIENT_SECRET = os.environ.get('COGNITO_CLIENT_SECRET')
 
-# Lazy-load Cognito client
-_cognito_client = None
-
 
 def get_cognito_client():
-    """Get or create Cognito client."""
-    global _cognito_client
-    if _cognito_client is None:
-        _cognito_client = boto3.client('cognito-idp', region_name=COGNITO_REGION)
-    return _cognito_client
+    """Get the shared Cognito client (thread-safe)."""
+    return client_provider.get_client('cognito-idp', region_name=COGNITO_REGION)
 
 
 def calculate_secret_hash(username: str) -> str:
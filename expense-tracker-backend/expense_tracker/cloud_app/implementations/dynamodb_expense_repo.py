@@ -2,42 +2,98 @@
 
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from django.conf import settings
 
-from auth_app.services.expense_service import ExpenseRepository
+from auth_app.metrics import CACHE_REQUESTS
+from auth_app.services.category_service import get_category_index
+from auth_app.services.event_service import (
+    EVENT_CREATED,
+    EVENT_UPDATED,
+    publish_expense_event_on_commit,
+)
+from auth_app.services.expense_service import (
+    EXPENSE_FIELDS,
+    ExpenseFilters,
+    ExpenseRepository,
+)
+from auth_app.services.search_service import InvertedIndex
+
+from .utils.aws_clients import client_provider
 
 logger = logging.getLogger(__name__)
 
-# Lazy-load DynamoDB resource
-_dynamodb_resource = None
-_dynamodb_table = None
+# BatchGetItem accepts at most 100 keys per request
+_BATCH_GET_LIMIT = 100
+
+# Process-wide search index; partitions are rebuilt after the TTL so writes
+# made by other workers become searchable
+_search_index = InvertedIndex(ttl_seconds=getattr(settings, 'SEARCH_INDEX_TTL', 300))
+
+
+def _to_item_timestamp(value: datetime) -> str:
+    """Format an aware datetime like stored timestamps (naive UTC ISO 8601)."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _filter_condition(filters: ExpenseFilters):
+    """Build a FilterExpression for the non-key list filters (None if unfiltered)."""
+    conditions = []
+    if filters.category:
+        conditions.append(Attr('category').eq(filters.category))
+    if filters.date_from:
+        conditions.append(Attr('timestamp').gte(_to_item_timestamp(filters.date_from)))
+    if filters.date_to:
+        conditions.append(Attr('timestamp').lte(_to_item_timestamp(filters.date_to)))
+    if filters.min_amount is not None:
+        conditions.append(Attr('amount').gte(filters.min_amount))
+    if filters.max_amount is not None:
+        conditions.append(Attr('amount').lte(filters.max_amount))
+
+    condition = None
+    for part in conditions:
+        condition = part if condition is None else condition & part
+    return condition
+
+
+def _projection(fields) -> Tuple[str, Dict[str, str]]:
+    """Build a ProjectionExpression with name placeholders (several names are reserved words)."""
+    names = {f'#f{i}': field for i, field in enumerate(fields)}
+    return ', '.join(names), names
 
 
 def get_dynamodb_table():
-    """Get DynamoDB table (only used in production mode)."""
-    global _dynamodb_resource, _dynamodb_table
-    if _dynamodb_table is None:
-        _dynamodb_resource = boto3.resource(
-            'dynamodb',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
-        )
-        _dynamodb_table = _dynamodb_resource.Table(settings.DYNAMODB_TABLE_NAME)
-    return _dynamodb_table
+    """
+    Get the calling thread's DynamoDB Table.
+
+    boto3 resources are not thread-safe, so each thread gets its own Table;
+    they all share one low-level client and connection pool.
+    """
+    return client_provider.thread_local('dynamodb-table', lambda: client_provider.get_resource(
+        'dynamodb',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
+    ).Table(settings.DYNAMODB_TABLE_NAME))
 
 
 class DynamoDBExpenseRepository(ExpenseRepository):
     """Expense storage using AWS DynamoDB with integer user_id interface."""
 
-    def __init__(self):
-        self.table = get_dynamodb_table()
+    @property
+    def table(self):
+        """
+        The calling thread's Table.
+
+        One repository instance serves every thread, so the Table is looked up
+        per access rather than stored on the instance.
+        """
+        return get_dynamodb_table()
 
     def create(
         self, user_id: int, amount: float, category: str, description: str = ''
@@ -56,12 +112,11 @@ class DynamoDBExpenseRepository(ExpenseRepository):
                 'description': description,
                 'timestamp': timestamp,
                 'receipt_url': None,
+                'updated_at': timestamp,
             }
 
             self.table.put_item(Item=item)
-            logger.info(f'Expense created: {expense_id} for user: {user_id}')
-
-            return {
+            result = {
                 'expense_id': expense_id,
                 'user_id': user_id,
                 'amount': float(item['amount']),
@@ -70,27 +125,57 @@ class DynamoDBExpenseRepository(ExpenseRepository):
                 'timestamp': timestamp,
                 'receipt_url': None,
             }
+            _search_index.add(user_id, item)
+            get_category_index().record(user_id)
+            publish_expense_event_on_commit(user_id, EVENT_CREATED, expense=result)
+            logger.info(f'Expense created: {expense_id} for user: {user_id}')
+
+            return result
 
         except Exception as e:
             logger.error(f'Error creating expense: {str(e)}', exc_info=True)
             raise
 
-    def get_by_user(self, user_id: int) -> List[Dict]:
-        """Get all expenses for a user from DynamoDB, converting user_id to string for query."""
+    def get_by_user(
+        self,
+        user_id: int,
+        filters: Optional[ExpenseFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Dict]:
+        """Query a user's expenses by key, with filters and projection applied by DynamoDB."""
         try:
-            user_id_str = str(user_id)
-            response = self.table.scan(
-                FilterExpression='user_id = :user_id',
-                ExpressionAttributeValues={':user_id': user_id_str},
+            filters = filters or ExpenseFilters()
+            fields = fields or EXPENSE_FIELDS
+
+            # Attributes needed for ordering are read even if not requested
+            read_fields = [field for field in EXPENSE_FIELDS if field in fields or field in (
+                'expense_id', 'timestamp', filters.sort_field
+            )]
+            projection, names = _projection(read_fields)
+            items = self._query_user_items(
+                user_id,
+                projection=projection,
+                names=names,
+                condition=_filter_condition(filters),
             )
 
-            expenses = []
-            for item in response.get('Items', []):
-                # Convert Decimal to float for JSON serialization
-                item['amount'] = float(item['amount'])
-                # Ensure user_id is returned as integer
-                item['user_id'] = int(item['user_id'])
-                expenses.append(item)
+            if filters.q:
+                self._ensure_search_index(user_id)
+                matching_ids = set(_search_index.search(user_id, filters.q))
+                items = [item for item in items if item['expense_id'] in matching_ids]
+
+            # The user index has no sort key, so order the filtered items here.
+            # Sorting newest-first before the stable re-sort breaks ties by recency.
+            items.sort(key=lambda item: item['timestamp'], reverse=True)
+            if (filters.sort_field, filters.sort_descending) != ('timestamp', True):
+                items.sort(key=lambda item: item[filters.sort_field], reverse=filters.sort_descending)
+
+            # Amounts stay Decimal for the JSON response layer to encode; every
+            # item belongs to user_id, so the stored string is not parsed per row
+            expenses = [
+                {field: user_id if field == 'user_id' else item.get(field) for field in fields}
+                for item in items
+            ]
 
             logger.info(f'Retrieved {len(expenses)} expenses for user: {user_id}')
             return expenses
@@ -119,17 +204,47 @@ class DynamoDBExpenseRepository(ExpenseRepository):
             logger.error(f'Error retrieving expense {expense_id}: {str(e)}', exc_info=True)
             raise
 
-    def update_receipt_url(self, expense_id: str, receipt_url: str) -> bool:
-        """Update an expense with a receipt URL."""
+    def update_receipt_url(
+        self, expense_id: str, receipt_url: str, user_id: Optional[int] = None
+    ) -> bool:
+        """
+        Link a receipt URL to an expense with one conditional UpdateItem.
+
+        The condition requires the item to exist (UpdateItem would otherwise
+        create it) and, with user_id, to belong to that user.
+        """
+        condition = Attr('expense_id').exists()
+        if user_id is not None:
+            condition &= Attr('user_id').eq(str(user_id))
+        updated_at = datetime.utcnow().isoformat()
         try:
-            self.table.update_item(
+            response = self.table.update_item(
                 Key={'expense_id': expense_id},
-                UpdateExpression='SET receipt_url = :receipt_url',
-                ExpressionAttributeValues={':receipt_url': receipt_url},
+                UpdateExpression='SET receipt_url = :receipt_url, updated_at = :updated_at',
+                ConditionExpression=condition,
+                ExpressionAttributeValues={
+                    ':receipt_url': receipt_url,
+                    ':updated_at': updated_at,
+                },
+                # Unscoped callers need the owner back to address the event
+                ReturnValues='NONE' if user_id is not None else 'ALL_NEW',
             )
+            if user_id is None:
+                owner = response.get('Attributes', {}).get('user_id')
+                user_id = int(owner) if owner is not None else None
+            if user_id is not None:
+                publish_expense_event_on_commit(user_id, EVENT_UPDATED, expense={
+                    'expense_id': expense_id,
+                    'user_id': user_id,
+                    'receipt_url': receipt_url,
+                    'updated_at': updated_at,
+                })
             logger.info(f'Receipt URL updated for expense: {expense_id}')
             return True
 
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.warning(f'Expense not found: {expense_id}')
+            return False
         except Exception as e:
             logger.error(f'Error updating receipt URL for {expense_id}: {str(e)}', exc_info=True)
             return False
@@ -156,12 +271,11 @@ class DynamoDBExpenseRepository(ExpenseRepository):
                 'description': description,
                 'timestamp': timestamp,
                 'receipt_url': receipt_url,
+                'updated_at': timestamp,
             }
 
             self.table.put_item(Item=item)
-            logger.info(f'Expense with receipt created: {expense_id} for user: {user_id}')
-
-            return {
+            result = {
                 'expense_id': expense_id,
                 'user_id': user_id,
                 'amount': float(item['amount']),
@@ -170,6 +284,12 @@ class DynamoDBExpenseRepository(ExpenseRepository):
                 'timestamp': timestamp,
                 'receipt_url': receipt_url,
             }
+            _search_index.add(user_id, item)
+            get_category_index().record(user_id)
+            publish_expense_event_on_commit(user_id, EVENT_CREATED, expense=result)
+            logger.info(f'Expense with receipt created: {expense_id} for user: {user_id}')
+
+            return result
 
         except Exception as e:
             logger.error(
@@ -177,3 +297,153 @@ class DynamoDBExpenseRepository(ExpenseRepository):
                 exc_info=True,
             )
             raise
+
+    def search(
+        self, user_id: int, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """Ranked search using the in-process inverted index, hydrating the page from DynamoDB."""
+        try:
+            self._ensure_search_index(user_id)
+
+            ranked_ids = _search_index.search(user_id, query)
+            page_ids = ranked_ids[offset:offset + limit]
+            items = self._batch_get(page_ids)
+
+            expenses = []
+            for expense_id in page_ids:
+                item = items.get(expense_id)
+                if item is None:
+                    continue
+                item['amount'] = float(item['amount'])
+                item['user_id'] = int(item['user_id'])
+                expenses.append(item)
+
+            logger.info(
+                f'Search returned {len(expenses)} of {len(ranked_ids)} expenses for user: {user_id}'
+            )
+            return expenses, len(ranked_ids)
+
+        except Exception as e:
+            logger.error(f'Error searching expenses for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    def get_category_counts(self, user_id: int) -> Dict[str, int]:
+        """Count expenses per category from a category-only projection."""
+        try:
+            counts: Dict[str, int] = {}
+            for item in self._query_user_items(user_id, projection='category'):
+                counts[item['category']] = counts.get(item['category'], 0) + 1
+            return counts
+
+        except Exception as e:
+            logger.error(f'Error counting categories for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    def get_changes(
+        self, user_id: int, since: Optional[datetime] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        Read items modified since a sync point.
+
+        Items written before updated_at was introduced fall back to their
+        creation timestamp. Expenses are never deleted through this
+        repository, so there are no tombstones to report.
+        """
+        try:
+            condition = None
+            if since is not None:
+                since_value = _to_item_timestamp(since)
+                condition = Attr('updated_at').gte(since_value) | (
+                    Attr('updated_at').not_exists() & Attr('timestamp').gte(since_value)
+                )
+
+            changed = []
+            for item in self._query_user_items(user_id, condition=condition):
+                expense = {
+                    field: user_id if field == 'user_id' else item.get(field)
+                    for field in EXPENSE_FIELDS
+                }
+                expense['updated_at'] = item.get('updated_at') or item['timestamp']
+                changed.append(expense)
+            changed.sort(key=lambda expense: (expense['updated_at'], expense['expense_id']))
+
+            logger.info(f'Retrieved {len(changed)} changed expenses for user: {user_id}')
+            return changed, []
+
+        except Exception as e:
+            logger.error(f'Error retrieving changes for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    def _ensure_search_index(self, user_id: int) -> None:
+        """Build the user's search index partition if it is missing or expired."""
+        fresh = _search_index.is_fresh(user_id)
+        CACHE_REQUESTS.inc(cache='search_index', result='hit' if fresh else 'miss')
+        if not fresh:
+            _search_index.build(user_id, self._query_user_items(
+                user_id,
+                projection='expense_id, category, description, #ts',
+                names={'#ts': 'timestamp'},
+            ))
+
+    def _query_user_items(
+        self,
+        user_id: int,
+        projection: Optional[str] = None,
+        names: Optional[Dict[str, str]] = None,
+        condition=None,
+    ) -> List[Dict]:
+        """
+        Read every item for a user, following pagination.
+
+        Queries the user_id GSI named by DYNAMODB_USER_INDEX; without one,
+        falls back to a filtered Scan of the whole table.
+        """
+        index_name = getattr(settings, 'DYNAMODB_USER_INDEX', None)
+        if index_name:
+            operation = self.table.query
+            kwargs = {
+                'IndexName': index_name,
+                'KeyConditionExpression': Key('user_id').eq(str(user_id)),
+            }
+            if condition is not None:
+                kwargs['FilterExpression'] = condition
+        else:
+            operation = self.table.scan
+            user_condition = Attr('user_id').eq(str(user_id))
+            kwargs = {
+                'FilterExpression': (
+                    user_condition if condition is None else user_condition & condition
+                ),
+            }
+        if projection:
+            kwargs['ProjectionExpression'] = projection
+        if names:
+            kwargs['ExpressionAttributeNames'] = names
+
+        items = []
+        while True:
+            response = operation(**kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def _batch_get(self, expense_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch items by id with BatchGetItem, retrying unprocessed keys."""
+        items = {}
+        client = self.table.meta.client
+        for start in range(0, len(expense_ids), _BATCH_GET_LIMIT):
+            request = {
+                self.table.name: {
+                    'Keys': [
+                        {'expense_id': expense_id}
+                        for expense_id in expense_ids[start:start + _BATCH_GET_LIMIT]
+                    ]
+                }
+            }
+            while request:
+                response = client.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self.table.name, []):
+                    items[item['expense_id']] = item
+                request = response.get('UnprocessedKeys')
+        return items
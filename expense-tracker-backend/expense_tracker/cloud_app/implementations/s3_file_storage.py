@@ -5,29 +5,25 @@ import os
 import uuid
 from datetime import datetime
 
-import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
 
+from auth_app.metrics import S3_UPLOADED_BYTES
 from auth_app.services.file_service import FileStorage
 
-logger = logging.getLogger(__name__)
+from .utils.aws_clients import client_provider
 
-# Lazy-load S3 client
-_s3_client = None
+logger = logging.getLogger(__name__)
 
 
 def get_s3_client():
-    """Get or create S3 client."""
-    global _s3_client
-    if _s3_client is None:
-        _s3_client = boto3.client(
-            's3',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        )
-    return _s3_client
+    """Get the shared S3 client (thread-safe)."""
+    return client_provider.get_client(
+        's3',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    )
 
 
 class S3FileStorage(FileStorage):
@@ -63,6 +59,7 @@ class S3FileStorage(FileStorage):
                 Body=file_data,
                 ContentType=self._get_content_type(file_ext),
             )
+            S3_UPLOADED_BYTES.inc(len(file_data))
 
             # Construct public URL
             url = f'https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{unique_filename}'
@@ -0,0 +1,239 @@
+"""
+Shared boto3 client/resource factory with tuned botocore config and call latency metrics.
+
+Low-level clients are thread-safe and shared by all threads through
+client_provider. boto3 resources are not, so each thread gets its own
+resource object bound to the shared client (and its connection pool).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+
+from auth_app.metrics import AWS_CALL_ERRORS, AWS_CALL_LATENCY, DYNAMODB_CONSUMED_CAPACITY
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the AWS_* client settings. The pool matches the async executor
+# (ASYNC_EXECUTOR_WORKERS) so concurrent calls never queue for a connection.
+DEFAULT_MAX_POOL_CONNECTIONS = 32
+DEFAULT_RETRY_MODE = 'adaptive'
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_CONNECT_TIMEOUT = 2
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_TCP_KEEPALIVE = True
+
+# Calls slower than this are logged at WARNING
+DEFAULT_SLOW_CALL_MS = 500
+
+_START_KEY = 'latency_start'
+
+# DynamoDB operations that can report the capacity they consumed
+_CAPACITY_OPERATIONS = frozenset({
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems',
+})
+
+
+def get_client_config() -> Config:
+    """
+    Build the botocore Config used by every client.
+
+    Settings (all optional): AWS_MAX_POOL_CONNECTIONS, AWS_RETRY_MODE,
+    AWS_MAX_ATTEMPTS, AWS_CONNECT_TIMEOUT, AWS_READ_TIMEOUT, AWS_TCP_KEEPALIVE.
+    """
+    return Config(
+        max_pool_connections=getattr(settings, 'AWS_MAX_POOL_CONNECTIONS', DEFAULT_MAX_POOL_CONNECTIONS),
+        retries={
+            'mode': getattr(settings, 'AWS_RETRY_MODE', DEFAULT_RETRY_MODE),
+            'max_attempts': getattr(settings, 'AWS_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+        },
+        connect_timeout=getattr(settings, 'AWS_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=getattr(settings, 'AWS_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+        tcp_keepalive=getattr(settings, 'AWS_TCP_KEEPALIVE', DEFAULT_TCP_KEEPALIVE),
+    )
+
+
+class ClientMetrics:
+    """Thread-safe per-operation call counts and latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], Dict] = {}
+
+    def record(self, service: str, operation: str, elapsed_ms: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                (service, operation), {'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            )
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def snapshot(self) -> Dict[Tuple[str, str], Dict]:
+        """Copy of the stats keyed by (service, operation), with mean_ms added."""
+        with self._lock:
+            return {
+                key: dict(stats, mean_ms=stats['total_ms'] / stats['count'])
+                for key, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+client_metrics = ClientMetrics()
+
+
+def _start_timer(model, context, **kwargs) -> None:
+    context[_START_KEY] = (time.perf_counter(), model.name)
+
+
+def _stop_timer(service: str, context, error: bool) -> None:
+    started = context.pop(_START_KEY, None)
+    if started is None:
+        return
+    start, operation = started
+    elapsed = time.perf_counter() - start
+    elapsed_ms = elapsed * 1000
+    client_metrics.record(service, operation, elapsed_ms, error)
+    AWS_CALL_LATENCY.observe(elapsed, service=service, operation=operation)
+    if error:
+        AWS_CALL_ERRORS.inc(service=service, operation=operation)
+
+    slow_ms = getattr(settings, 'AWS_SLOW_CALL_MS', DEFAULT_SLOW_CALL_MS)
+    if elapsed_ms >= slow_ms:
+        logger.warning(f'Slow AWS call {service}.{operation}: {elapsed_ms:.1f}ms')
+    else:
+        logger.debug(f'AWS call {service}.{operation}: {elapsed_ms:.1f}ms')
+
+
+def _instrument(client) -> None:
+    """Time every API call, including retries, through botocore's event hooks."""
+    service = client.meta.service_model.service_name
+    events = client.meta.events
+
+    def on_response(http_response, parsed, model, context, **kwargs):
+        # Error responses (e.g. ConditionalCheckFailed) arrive here too
+        _stop_timer(service, context, error=http_response.status_code >= 300)
+        if 'ConsumedCapacity' in parsed:
+            _record_capacity(model.name, parsed['ConsumedCapacity'])
+
+    def on_exception(context, **kwargs):
+        # Connection errors and timeouts after the last retry
+        _stop_timer(service, context, error=True)
+
+    # Each client has its own copy of the event emitter, so these only see its calls
+    events.register('before-call', _start_timer)
+    events.register('after-call', on_response)
+    events.register('after-call-error', on_exception)
+    if service == 'dynamodb':
+        events.register('provide-client-params.dynamodb', _request_capacity)
+
+
+def _request_capacity(params, model, **kwargs) -> None:
+    """Ask DynamoDB to report consumed capacity unless the caller chose a level."""
+    if model.name in _CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+
+def _record_capacity(operation: str, consumed) -> None:
+    # A dict for single-table operations, a list for batch/transact calls
+    for entry in consumed if isinstance(consumed, list) else [consumed]:
+        DYNAMODB_CONSUMED_CAPACITY.inc(
+            entry.get('CapacityUnits', 0),
+            table=entry.get('TableName', ''),
+            operation=operation,
+        )
+
+
+def create_client(service_name: str, **kwargs):
+    """Create an instrumented boto3 client with the shared config (kwargs go to boto3)."""
+    client = boto3.client(service_name, config=get_client_config(), **kwargs)
+    _instrument(client)
+    return client
+
+
+def create_resource(service_name: str, **kwargs):
+    """Create a boto3 resource whose underlying client uses the shared config and metrics."""
+    resource = boto3.resource(service_name, config=get_client_config(), **kwargs)
+    _instrument(resource.meta.client)
+    return resource
+
+
+class ClientProvider:
+    """
+    Thread-safe home for the process's AWS clients.
+
+    Clients are created once per (service, arguments) under a lock and shared.
+    Resources and objects derived from them (e.g. a DynamoDB Table) are cached
+    per thread. reset() drops everything, e.g. in a freshly forked worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple, Any] = {}
+        self._resource_classes: Dict[Tuple, type] = {}
+        self._local = threading.local()
+        # Bumped by reset() so other threads' cached objects are rebuilt
+        self._generation = 0
+
+    @staticmethod
+    def _key(service_name: str, kwargs: Dict) -> Tuple:
+        return (service_name, tuple(sorted(kwargs.items())))
+
+    def get_client(self, service_name: str, **kwargs):
+        """Get the shared client for a service (kwargs as for boto3.client)."""
+        key = self._key(service_name, kwargs)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = create_client(service_name, **kwargs)
+        return client
+
+    def get_resource(self, service_name: str, **kwargs):
+        """Get this thread's resource for a service, using the shared client."""
+        key = self._key(service_name, kwargs)
+        return self.thread_local(('resource',) + key, lambda: self._build_resource(key, kwargs))
+
+    def _build_resource(self, key: Tuple, kwargs: Dict):
+        service_name = key[0]
+        resource_class = self._resource_classes.get(key)
+        if resource_class is None:
+            with self._lock:
+                resource_class = self._resource_classes.get(key)
+                if resource_class is None:
+                    # boto3 generates resource classes on first use; build one
+                    # once to get the class, then bind instances to our client
+                    template = boto3.resource(service_name, config=get_client_config(), **kwargs)
+                    resource_class = self._resource_classes[key] = type(template)
+        return resource_class(client=self.get_client(service_name, **kwargs))
+
+    def thread_local(self, key: Any, factory: Callable[[], Any]):
+        """Get an object cached for the calling thread, building it with factory."""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.objects = {}
+            local.generation = self._generation
+        if key not in local.objects:
+            local.objects[key] = factory()
+        return local.objects[key]
+
+    def reset(self) -> None:
+        """Drop all clients and per-thread objects."""
+        with self._lock:
+            self._clients.clear()
+            self._resource_classes.clear()
+            self._generation += 1
+
+
+client_provider = ClientProvider()
@@ -1,32 +1,178 @@
+import json
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
 
 # Determine environment
 CLOUD_RUN = os.environ.get('CLOUD_RUN', 'false').lower() == 'true'
 
-if CLOUD_RUN:
-    # Import only in Cloud Run to avoid requiring credentials in CI/local
-    from google.cloud import secretmanager
-    _client = secretmanager.SecretManagerServiceClient()
-    _project_id = os.environ.get('GCP_PROJECT_ID')
+_project_id = os.environ.get('GCP_PROJECT_ID')
 
-def get_secret(secret_id: str, version_id: str = "latest") -> str | None:
-    """Fetch a secret from Google Cloud Secret Manager."""
-    # Always prefer environment variable value (works for local dev & CI)
-    env_val = os.getenv(secret_id)
-    if env_val:
-        return env_val
+# Secrets are cached in a file shared by every worker on the instance.
+# /dev/shm keeps them in memory; set SECRET_CACHE_TTL=0 to disable caching.
+_default_cache_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+SECRET_CACHE_PATH = os.environ.get(
+    'SECRET_CACHE_PATH', os.path.join(_default_cache_dir, 'expense-tracker-secrets.json')
+)
+SECRET_CACHE_TTL = int(os.environ.get('SECRET_CACHE_TTL', '300'))
+SECRET_FETCH_WORKERS = int(os.environ.get('SECRET_FETCH_WORKERS', '8'))
 
-    # If not running on Cloud Run, return None (caller should handle missing secret)
-    if not CLOUD_RUN:
-        return None
+# Lazy-load the Secret Manager client; fully cached startups never build it
+_client = None
+_client_lock = threading.Lock()
 
-    if CLOUD_RUN and not _project_id:
-        raise RuntimeError("GCP_PROJECT_ID env var must be set in Cloud Run")
-        raise Exception("GCP_PROJECT_ID environment variable is not set!")
+# Secrets already resolved by this process
+_secrets: Dict[str, str] = {}
+
+
+def get_secret_client():
+    """Get or create the Secret Manager client (thread-safe, shareable)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Import only in Cloud Run to avoid requiring credentials in CI/local
+                from google.cloud import secretmanager
+                _client = secretmanager.SecretManagerServiceClient()
+    return _client
+
+
+def reset_secret_client():
+    """Drop the client; gRPC channels must not be reused across fork."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def _cache_key(secret_id: str, version_id: str) -> str:
+    return f'{_project_id}/{secret_id}/{version_id}'
 
+
+def _fetch_secret(secret_id: str, version_id: str) -> str:
+    """Read one secret version from Secret Manager."""
     name = f"projects/{_project_id}/secrets/{secret_id}/versions/{version_id}"
     try:
-        response = _client.access_secret_version(request={"name": name})
+        response = get_secret_client().access_secret_version(request={"name": name})
         return response.payload.data.decode()
     except Exception as exc:
         raise RuntimeError(f"Unable to fetch secret '{secret_id}': {exc}") from exc
+
+
+@contextmanager
+def _cache_lock():
+    """Serialize cache refreshes across worker processes on this instance."""
+    if fcntl is None or SECRET_CACHE_TTL <= 0:
+        yield
+        return
+    fd = os.open(SECRET_CACHE_PATH + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _read_cache() -> Dict[str, str]:
+    """Load unexpired cached secrets; anything unexpected counts as a miss."""
+    if SECRET_CACHE_TTL <= 0:
+        return {}
+    try:
+        with open(SECRET_CACHE_PATH, encoding='utf-8') as cache_file:
+            stat = os.fstat(cache_file.fileno())
+            # Only trust a private file written by this user
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                return {}
+            if time.time() - stat.st_mtime > SECRET_CACHE_TTL:
+                return {}
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    return cached if isinstance(cached, dict) else {}
+
+
+def _write_cache(values: Dict[str, str]) -> None:
+    """Atomically replace the cache file with owner-only permissions."""
+    if SECRET_CACHE_TTL <= 0:
+        return
+    directory = os.path.dirname(SECRET_CACHE_PATH) or '.'
+    try:
+        # mkstemp creates the file with mode 0600
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.secrets-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as cache_file:
+            json.dump(values, cache_file)
+        os.replace(temp_path, SECRET_CACHE_PATH)
+    except OSError:
+        # The cache is an optimization; a read-only filesystem just skips it
+        pass
+
+
+def prefetch_secrets(
+    secret_ids: Iterable[str], version_id: str = "latest"
+) -> Dict[str, Optional[str]]:
+    """
+    Resolve several secrets at once, fetching the missing ones concurrently.
+
+    Environment variables win, then this process's memory, then the shared
+    cache file, then Secret Manager (one thread per secret, up to
+    SECRET_FETCH_WORKERS). Fetched values refresh the cache file so other
+    workers starting on the same instance skip the round trips.
+
+    Returns:
+        Mapping of secret_id to value (None when unavailable outside Cloud Run)
+
+    Raises:
+        RuntimeError: If a secret cannot be fetched in Cloud Run
+    """
+    results = {}
+    pending = []
+    for secret_id in secret_ids:
+        env_val = os.getenv(secret_id)
+        key = _cache_key(secret_id, version_id)
+        if env_val:
+            results[secret_id] = env_val
+        elif key in _secrets:
+            results[secret_id] = _secrets[key]
+        elif not CLOUD_RUN:
+            results[secret_id] = None
+        else:
+            pending.append(secret_id)
+
+    if not pending:
+        return results
+
+    if not _project_id:
+        raise RuntimeError("GCP_PROJECT_ID env var must be set in Cloud Run")
+
+    with _cache_lock():
+        cached = _read_cache()
+        missing = [s for s in pending if _cache_key(s, version_id) not in cached]
+
+        if missing:
+            with ThreadPoolExecutor(
+                max_workers=min(SECRET_FETCH_WORKERS, len(missing)),
+                thread_name_prefix='secret-fetch',
+            ) as executor:
+                fetched = dict(zip(
+                    missing, executor.map(lambda s: _fetch_secret(s, version_id), missing)
+                ))
+            cached.update({_cache_key(s, version_id): value for s, value in fetched.items()})
+            _write_cache(cached)
+
+    for secret_id in pending:
+        key = _cache_key(secret_id, version_id)
+        _secrets[key] = results[secret_id] = cached[key]
+    return results
+
+
+def get_secret(secret_id: str, version_id: str = "latest") -> str | None:
+    """Fetch a secret from Google Cloud Secret Manager (cached after prefetch_secrets)."""
+    return prefetch_secrets([secret_id], version_id)[secret_id]
@@ -3,26 +3,22 @@ import os
 import uuid
 from datetime import datetime
 
-import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
 
-logger = logging.getLogger(__name__)
+from .aws_clients import client_provider
 
-# Lazy-load S3 client
-_s3_client = None
+logger = logging.getLogger(__name__)
 
 
 def get_s3_client():
-    global _s3_client
-    if _s3_client is None:
-        _s3_client = boto3.client(
-            's3',
-            region_name=settings.S3_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-    return _s3_client
+    """Get the shared S3 client (thread-safe)."""
+    return client_provider.get_client(
+        's3',
+        region_name=settings.S3_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+    )
 
 
 class S3Handler:
@@ -0,0 +1,128 @@
+"""Unit tests for aws_clients module (shared botocore config and call metrics)."""
+
+import os
+import threading
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from django.test import SimpleTestCase, override_settings
+from moto import mock_aws
+
+from cloud_app.implementations.utils.aws_clients import (
+    ClientProvider,
+    client_metrics,
+    create_client,
+    create_resource,
+    get_client_config,
+)
+
+CREDENTIALS = {
+    'region_name': 'us-east-1',
+    'aws_access_key_id': 'testing',
+    'aws_secret_access_key': 'testing',
+}
+
+
+class ClientConfigTest(SimpleTestCase):
+    """Test the botocore Config built from settings."""
+
+    def test_defaults(self):
+        """Test pooling, adaptive retries, keepalive and timeouts are set"""
+        config = get_client_config()
+
+        self.assertEqual(config.max_pool_connections, 32)
+        self.assertEqual(config.retries, {'mode': 'adaptive', 'max_attempts': 5})
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual((config.connect_timeout, config.read_timeout), (2, 10))
+
+    @override_settings(AWS_MAX_POOL_CONNECTIONS=64, AWS_RETRY_MODE='standard', AWS_READ_TIMEOUT=3)
+    def test_settings_override(self):
+        """Test AWS_* settings replace the defaults"""
+        config = get_client_config()
+
+        self.assertEqual(config.max_pool_connections, 64)
+        self.assertEqual(config.retries['mode'], 'standard')
+        self.assertEqual(config.read_timeout, 3)
+
+    def test_clients_use_config(self):
+        """Test created clients carry the shared config"""
+        client = create_client('s3', **CREDENTIALS)
+
+        self.assertEqual(client.meta.config.max_pool_connections, 32)
+        self.assertEqual(client.meta.config.retries['mode'], 'adaptive')
+
+
+@patch.dict(os.environ, {'AWS_DEFAULT_REGION': 'us-east-1'})
+class ClientMetricsTest(SimpleTestCase):
+    """Test per-call latency metrics recorded through botocore events."""
+
+    def setUp(self):
+        client_metrics.reset()
+
+    def tearDown(self):
+        client_metrics.reset()
+
+    @mock_aws
+    def test_records_calls_and_errors(self):
+        """Test successful and failed calls are counted per operation"""
+        dynamodb = create_resource('dynamodb', **CREDENTIALS)
+        dynamodb.meta.client.list_tables()
+        with self.assertRaises(ClientError):
+            dynamodb.meta.client.describe_table(TableName='missing')
+
+        stats = client_metrics.snapshot()
+
+        self.assertEqual(stats[('dynamodb', 'ListTables')]['count'], 1)
+        self.assertEqual(stats[('dynamodb', 'ListTables')]['errors'], 0)
+        self.assertEqual(stats[('dynamodb', 'DescribeTable')]['errors'], 1)
+        self.assertGreaterEqual(stats[('dynamodb', 'ListTables')]['max_ms'], 0)
+
+    @mock_aws
+    def test_clients_are_instrumented_independently(self):
+        """Test a client's hooks don't fire for other clients"""
+        create_client('s3', **CREDENTIALS)
+        plain = create_client('dynamodb', **CREDENTIALS)
+        plain.list_tables()
+
+        self.assertEqual(list(client_metrics.snapshot()), [('dynamodb', 'ListTables')])
+
+
+class ClientProviderTest(SimpleTestCase):
+    """Test shared clients and per-thread resources."""
+
+    def setUp(self):
+        self.provider = ClientProvider()
+
+    def in_thread(self, func):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_clients_shared_across_threads(self):
+        """Test every thread gets the same client for the same arguments"""
+        client = self.provider.get_client('s3', **CREDENTIALS)
+
+        self.assertIs(self.in_thread(lambda: self.provider.get_client('s3', **CREDENTIALS)), client)
+        self.assertIsNot(self.provider.get_client('s3', **dict(CREDENTIALS, region_name='eu-west-1')), client)
+
+    def test_resources_per_thread(self):
+        """Test each thread gets its own resource bound to the shared client"""
+        resource = self.provider.get_resource('dynamodb', **CREDENTIALS)
+        other = self.in_thread(lambda: self.provider.get_resource('dynamodb', **CREDENTIALS))
+
+        self.assertIs(self.provider.get_resource('dynamodb', **CREDENTIALS), resource)
+        self.assertIsNot(other, resource)
+        self.assertIs(other.meta.client, resource.meta.client)
+        self.assertIs(resource.meta.client, self.provider.get_client('dynamodb', **CREDENTIALS))
+
+    def test_reset(self):
+        """Test reset rebuilds clients and per-thread objects"""
+        client = self.provider.get_client('s3', **CREDENTIALS)
+        cached = self.provider.thread_local('key', object)
+
+        self.provider.reset()
+
+        self.assertIsNot(self.provider.get_client('s3', **CREDENTIALS), client)
+        self.assertIsNot(self.provider.thread_local('key', object), cached)
@@ -0,0 +1,65 @@
+"""Unit tests for DynamoDBExpenseRepository against moto."""
+
+import boto3
+from django.test import SimpleTestCase, override_settings
+from moto import mock_aws
+
+from cloud_app.implementations.dynamodb_expense_repo import DynamoDBExpenseRepository
+from cloud_app.implementations.utils.aws_clients import client_provider
+
+CREDENTIALS = {
+    'region_name': 'us-east-1',
+    'aws_access_key_id': 'testing',
+    'aws_secret_access_key': 'testing',
+}
+
+
+@mock_aws
+@override_settings(
+    AWS_REGION=CREDENTIALS['region_name'],
+    AWS_ACCESS_KEY_ID=CREDENTIALS['aws_access_key_id'],
+    AWS_SECRET_ACCESS_KEY=CREDENTIALS['aws_secret_access_key'],
+    DYNAMODB_ENDPOINT_URL=None,
+    DYNAMODB_TABLE_NAME='expenses-test',
+    DYNAMODB_USER_INDEX='user_id-index',
+)
+class DynamoDBUpdateReceiptUrlTest(SimpleTestCase):
+    """Test the conditional receipt URL update."""
+
+    def setUp(self):
+        client_provider.reset()
+        self.addCleanup(client_provider.reset)
+        boto3.resource('dynamodb', **CREDENTIALS).create_table(
+            TableName='expenses-test',
+            KeySchema=[{'AttributeName': 'expense_id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'expense_id', 'AttributeType': 'S'},
+                {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'user_id-index',
+                'KeySchema': [{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'},
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        self.repo = DynamoDBExpenseRepository()
+        self.expense_id = self.repo.create(1, 12.5, 'Food', 'lunch')['expense_id']
+
+    def test_owner_update(self):
+        """Test the owner can link a receipt"""
+        self.assertTrue(self.repo.update_receipt_url(self.expense_id, 'https://example.com/r.jpg', 1))
+
+        self.assertEqual(self.repo.get_by_id(self.expense_id)['receipt_url'], 'https://example.com/r.jpg')
+
+    def test_other_user_rejected(self):
+        """Test the condition refuses another user's expense"""
+        self.assertFalse(self.repo.update_receipt_url(self.expense_id, 'https://example.com/r.jpg', 2))
+
+        self.assertIsNone(self.repo.get_by_id(self.expense_id)['receipt_url'])
+
+    def test_missing_expense_not_created(self):
+        """Test updating an unknown id fails instead of creating an item"""
+        self.assertFalse(self.repo.update_receipt_url('missing', 'https://example.com/r.jpg'))
+
+        self.assertIsNone(self.repo.get_by_id('missing'))
@@ -0,0 +1,105 @@
+"""Unit tests for gcp_secrets module (prefetching and the shared cache file)."""
+
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from cloud_app.implementations.utils import gcp_secrets
+from cloud_app.implementations.utils.gcp_secrets import get_secret, prefetch_secrets
+
+
+class SecretPrefetchTest(SimpleTestCase):
+    """Test secrets are fetched concurrently and shared through the cache file."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.directory, 'secrets.json')
+        self.fetch_threads = set()
+
+        def access_secret_version(request):
+            self.fetch_threads.add(threading.current_thread().name)
+            response = Mock()
+            response.payload.data = request['name'].split('/')[3].lower().encode()
+            return response
+
+        self.client = Mock()
+        self.client.access_secret_version.side_effect = access_secret_version
+        patches = [
+            patch.object(gcp_secrets, 'CLOUD_RUN', True),
+            patch.object(gcp_secrets, '_project_id', 'project'),
+            patch.object(gcp_secrets, '_client', self.client),
+            patch.object(gcp_secrets, '_secrets', {}),
+            patch.object(gcp_secrets, 'SECRET_CACHE_PATH', self.cache_path),
+            patch.object(gcp_secrets, 'SECRET_CACHE_TTL', 300),
+            patch.dict(os.environ, {}, clear=False),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.environ.pop('SECRET_A', None)
+        os.environ.pop('SECRET_B', None)
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_fetches_in_parallel_and_caches(self):
+        """Test missing secrets are fetched on pool threads and written to a private file"""
+        result = prefetch_secrets(['SECRET_A', 'SECRET_B'])
+
+        self.assertEqual(result, {'SECRET_A': 'secret_a', 'SECRET_B': 'secret_b'})
+        self.assertTrue(all(name.startswith('secret-fetch') for name in self.fetch_threads))
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_path).st_mode), 0o600)
+
+    def test_memory_then_file_cache(self):
+        """Test later lookups in this process and in new workers skip Secret Manager"""
+        prefetch_secrets(['SECRET_A', 'SECRET_B'])
+        self.assertEqual(get_secret('SECRET_A'), 'secret_a')
+
+        # A fresh worker process has an empty memory cache
+        gcp_secrets._secrets.clear()
+        self.assertEqual(get_secret('SECRET_B'), 'secret_b')
+        self.assertEqual(self.client.access_secret_version.call_count, 2)
+
+    def test_expired_cache_refetches(self):
+        """Test a cache file older than the TTL is ignored"""
+        prefetch_secrets(['SECRET_A'])
+        stale = time.time() - 301
+        os.utime(self.cache_path, (stale, stale))
+        gcp_secrets._secrets.clear()
+
+        get_secret('SECRET_A')
+
+        self.assertEqual(self.client.access_secret_version.call_count, 2)
+
+    def test_shared_cache_file_ignored(self):
+        """Test a cache file readable by other users is not trusted"""
+        prefetch_secrets(['SECRET_A'])
+        os.chmod(self.cache_path, 0o644)
+        gcp_secrets._secrets.clear()
+
+        get_secret('SECRET_A')
+
+        self.assertEqual(self.client.access_secret_version.call_count, 2)
+
+    def test_environment_wins(self):
+        """Test environment variables are used without fetching"""
+        os.environ['SECRET_A'] = 'from-env'
+
+        self.assertEqual(get_secret('SECRET_A'), 'from-env')
+        self.client.access_secret_version.assert_not_called()
+
+    def test_fetch_error(self):
+        """Test Secret Manager failures raise RuntimeError"""
+        self.client.access_secret_version.side_effect = Exception('denied')
+
+        with self.assertRaises(RuntimeError):
+            prefetch_secrets(['SECRET_A'])
+
+    def test_outside_cloud_run(self):
+        """Test unset secrets are None outside Cloud Run"""
+        with patch.object(gcp_secrets, 'CLOUD_RUN', False):
+            self.assertEqual(prefetch_secrets(['SECRET_A']), {'SECRET_A': None})
@@ -2,6 +2,9 @@
 ASGI config for expense_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn expense_tracker.asgi:application``)
+for the server-sent events endpoint (/api/expenses/events/), which streams
+without holding a worker thread per connection.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
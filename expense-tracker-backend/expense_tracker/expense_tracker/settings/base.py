@@ -36,7 +36,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so its total covers the rest of the chain; inactive unless SERVER_TIMING
+    'auth_app.middleware.ServerTimingMiddleware',
+    'auth_app.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Listed early so it compresses bodies after the middleware below is done with them
+    'auth_app.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -153,3 +158,46 @@ CSRF_TRUSTED_ORIGINS = [
 
 # django-ratelimit should use the configured default cache
 RATELIMIT_USE_CACHE = "default"
+# Only for load tests (benchmarks/loadtest.py), whose virtual users all sign up
+# and log in from one IP
+RATELIMIT_ENABLE = os.environ.get('RATELIMIT_ENABLE', 'true').lower() == 'true'
+
+# Seconds a user's cached category dictionary (autocomplete) is kept
+CATEGORY_CACHE_TIMEOUT = 3600
+
+# JSON encoder for API responses: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+API_JSON_ENCODER = os.environ.get('API_JSON_ENCODER', 'auto')
+
+# Response compression (auth_app.middleware.CompressionMiddleware)
+COMPRESSION_ENCODINGS = ['zstd', 'br', 'gzip']
+COMPRESSION_MIN_SIZE = 1024
+
+# Seconds each delta sync token is moved back to cover in-flight writes and clock skew
+SYNC_TOKEN_OVERLAP_SECONDS = 5
+
+# Days deleted-expense tombstones are kept (purge_tombstones removes older
+# ones). Sync tokens older than this are rejected so clients resync in full.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Expense change events (server-sent events). Set EVENT_BROKER_URL to a Redis
+# URL when running several server instances; otherwise events stay in-process.
+EVENT_BROKER_URL = os.environ.get('EVENT_BROKER_URL', '')
+SSE_HEARTBEAT_SECONDS = 15
+
+# Serve the expense list, create and receipt upload endpoints with async views.
+# Enable when running the ASGI application; under WSGI each async view call
+# pays for an event loop round trip.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
+# Threads for blocking service calls (boto3) awaited by async views
+ASYNC_EXECUTOR_WORKERS = int(os.environ.get('ASYNC_EXECUTOR_WORKERS', '32'))
+
+# Per-request Server-Timing headers and timing log lines
+# (auth_app.middleware.ServerTimingMiddleware); off by default
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'false').lower() == 'true'
+
+# Prometheus metrics at /api/metrics/ (utils.metrics); off by default. Each
+# process writes samples to METRICS_DIR (default: /dev/shm), which all gunicorn
+# workers must share. Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
@@ -21,7 +21,7 @@ TEMPLATES = BASE_TEMPLATES
 INSTALLED_APPS.append('cloud_app')
 
 # Import after adding cloud_app to INSTALLED_APPS
-from cloud_app.implementations.utils.gcp_secrets import get_secret  # noqa: E402
+from cloud_app.implementations.utils.gcp_secrets import get_secret, prefetch_secrets  # noqa: E402
 
 # DEBUG mode disabled for production
 DEBUG = False
@@ -38,6 +38,17 @@ CSRF_TRUSTED_ORIGINS = [
     'https://expense-tracker-frontend-1a909.firebaseapp.com',
 ]
 
+# Fetch every secret in one concurrent batch (cached across workers);
+# the get_secret() calls below are then served from memory
+prefetch_secrets([
+    'DJANGO_SECRET_KEY',
+    'AWS_ACCESS_KEY_ID',
+    'AWS_SECRET_ACCESS_KEY',
+    'COGNITO_USER_POOL_ID',
+    'COGNITO_CLIENT_ID',
+    'COGNITO_CLIENT_SECRET',
+])
+
 # Secret key from Google Secret Manager
 SECRET_KEY = get_secret('DJANGO_SECRET_KEY')
 
@@ -65,9 +76,23 @@ AWS_ACCESS_KEY_ID = get_secret('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = get_secret('AWS_SECRET_ACCESS_KEY')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 
+# botocore client tuning shared by DynamoDB, S3 and Cognito (see aws_clients.py)
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '32'))
+AWS_RETRY_MODE = os.environ.get('AWS_RETRY_MODE', 'adaptive')
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '10'))
+AWS_TCP_KEEPALIVE = os.environ.get('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+AWS_SLOW_CALL_MS = float(os.environ.get('AWS_SLOW_CALL_MS', '500'))
+
 # DynamoDB Configuration
 DYNAMODB_TABLE_NAME = os.environ.get('DYNAMODB_TABLE_NAME', 'expense-tracker-table')
 DYNAMODB_ENDPOINT_URL = os.environ.get('DYNAMODB_ENDPOINT_URL', None)
+# GSI with user_id as partition key; set to an empty string to fall back to Scan
+DYNAMODB_USER_INDEX = os.environ.get('DYNAMODB_USER_INDEX', 'user_id-index')
+
+# Seconds before a user's in-process search index is rebuilt from DynamoDB
+SEARCH_INDEX_TTL = int(os.environ.get('SEARCH_INDEX_TTL', '300'))
 
 # Cognito Configuration
 COGNITO_USER_POOL_ID = get_secret('COGNITO_USER_POOL_ID')
@@ -4,6 +4,8 @@ Local development settings for expense_tracker.
 Used for local development with SQLite, local authentication, and local file storage.
 """
 
+import os
+
 from .base import *  # noqa: F401, F403
 
 # Add local app for local development implementations
@@ -13,13 +15,40 @@ INSTALLED_APPS.append('local_app')  # noqa: F405
 DEBUG = True
 
 # Database Configuration - SQLite for local development
+# (SQLITE_PATH points elsewhere, e.g. a scratch database for load tests)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',  # noqa: F405
+        'NAME': os.environ.get('SQLITE_PATH') or BASE_DIR / 'db.sqlite3',  # noqa: F405
     }
 }
 
+# SQLite server mode, for small deployments serving real traffic from SQLite.
+# WAL lets readers proceed while one writer commits, synchronous=NORMAL
+# syncs at checkpoints rather than on every commit (still safe in WAL mode),
+# and connections persist across requests so the pragmas and page cache are
+# paid for once per thread. Transactions start IMMEDIATE so a writer takes
+# the write lock up front and waits out busy_timeout, instead of failing
+# with "database is locked" when it upgrades a read transaction.
+SQLITE_SERVER_MODE = os.environ.get('SQLITE_SERVER_MODE', 'false').lower() == 'true'
+if SQLITE_SERVER_MODE:
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.environ.get('SQLITE_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join((
+                'PRAGMA journal_mode=WAL',
+                'PRAGMA synchronous=NORMAL',
+                f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+                f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+                # Negative: size in KiB rather than pages
+                f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_SIZE_KB', '65536'))}",
+                'PRAGMA temp_store=MEMORY',
+            )),
+        },
+    })
+
 # Caching configuration - In-memory cache for local development
 CACHES = {
     "default": {
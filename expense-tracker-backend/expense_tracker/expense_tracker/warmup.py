@@ -0,0 +1,93 @@
+"""
+Pre-fork warm-up and post-fork reset for preloading servers (see gunicorn.conf.py).
+
+With ``preload_app`` the master imports Django, loads settings (fetching
+secrets once) and calls warm_up() before forking, so workers start with that
+work done and share the memory copy-on-write. Network clients and database
+connections must not cross the fork, so each worker calls
+reset_after_fork() to drop them and build its own.
+"""
+
+import gc
+import logging
+
+from django.conf import settings
+from django.db import connections
+
+from auth_app.services.registry import (
+    AUTH_SERVICE,
+    EXPENSE_REPOSITORY,
+    FILE_STORAGE,
+    service_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+SERVICES = (EXPENSE_REPOSITORY, FILE_STORAGE, AUTH_SERVICE)
+
+
+def _is_cloud() -> bool:
+    return not getattr(settings, 'IS_LOCAL_DEMO', False)
+
+
+def _build_services() -> None:
+    for name in SERVICES:
+        service_registry.get(name)
+
+
+def _prime_cloud_clients() -> None:
+    """Create the boto3 clients, loading botocore's service models into the shared session."""
+    from cloud_app.implementations.cognito_service import get_cognito_client
+    from cloud_app.implementations.dynamodb_expense_repo import get_dynamodb_table
+    from cloud_app.implementations.s3_file_storage import get_s3_client
+
+    get_dynamodb_table()
+    get_s3_client()
+    get_cognito_client()
+
+
+def _reset_clients() -> None:
+    """Drop every cached network client so the next use builds a fresh one."""
+    from auth_app.services.event_service import reset_event_broker
+
+    reset_event_broker()
+    if _is_cloud():
+        from cloud_app.implementations.utils.aws_clients import client_provider
+        from cloud_app.implementations.utils.gcp_secrets import reset_secret_client
+
+        client_provider.reset()
+        reset_secret_client()
+    service_registry.reset()
+
+
+def warm_up() -> None:
+    """
+    Do the per-process startup work once, in the master before forking.
+
+    Builds the services and (in cloud mode) the boto3 clients so their modules
+    and service models are loaded, then closes database connections and
+    freezes the heap so workers keep sharing those pages.
+    """
+    _build_services()
+    if _is_cloud():
+        _prime_cloud_clients()
+
+    # No socket may be shared with the workers
+    connections.close_all()
+
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.collect()
+    gc.freeze()
+    logger.info(f'Warm-up complete; {gc.get_freeze_count()} objects frozen')
+
+
+def reset_after_fork() -> None:
+    """
+    Give a freshly forked worker its own clients and connections.
+
+    boto3 clients are rebuilt from the service models the master already
+    loaded, so this costs far less than a cold start.
+    """
+    connections.close_all()
+    _reset_clients()
+    _build_services()
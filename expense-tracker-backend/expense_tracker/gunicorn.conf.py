@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration (loaded automatically from this directory).
+
+The app is preloaded in the master and warmed up before forking, so workers
+share its memory copy-on-write and start serving without repeating Django
+setup, secret fetching or client creation. See expense_tracker/warmup.py.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+# AWS clients are thread-safe (see cloud_app/implementations/utils/aws_clients.py),
+# so GUNICORN_WORKER_CLASS=gthread with GUNICORN_THREADS > 1 is supported
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = 120
+
+wsgi_app = 'expense_tracker.wsgi:application'
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def on_starting(server):
+    """Runs in the master before the app loads; metrics restart from zero with the server."""
+    from utils.metrics import clear_metrics_dir
+
+    clear_metrics_dir()
+
+
+def when_ready(server):
+    """Runs in the master once the (preloaded) app is loaded, before workers fork."""
+    if server.cfg.preload_app:
+        from expense_tracker.warmup import warm_up
+
+        warm_up()
+
+
+def post_fork(server, worker):
+    """Runs in each new worker; nothing network-bound may be inherited."""
+    if server.cfg.preload_app:
+        from expense_tracker.warmup import reset_after_fork
+
+        reset_after_fork()
@@ -1,7 +1,27 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class LocalAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'local_app'
     verbose_name = 'Local Development'
+
+    def ready(self):
+        if not getattr(settings, 'IS_LOCAL_DEMO', False):
+            return
+
+        from auth_app.services.registry import (
+            AUTH_SERVICE,
+            EXPENSE_REPOSITORY,
+            FILE_STORAGE,
+            service_registry,
+        )
+
+        from .implementations.local_auth_service import LocalAuthService
+        from .implementations.local_file_storage import LocalFileStorage
+        from .implementations.sqlite_expense_repo import SQLiteExpenseRepository
+
+        service_registry.register(EXPENSE_REPOSITORY, SQLiteExpenseRepository)
+        service_registry.register(FILE_STORAGE, LocalFileStorage)
+        service_registry.register(AUTH_SERVICE, LocalAuthService)
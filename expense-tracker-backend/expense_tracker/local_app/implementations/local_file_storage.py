@@ -41,6 +41,10 @@ class LocalFileStorage(FileStorage):
             logger.error(f'Unexpected error during file upload: {str(e)}', exc_info=True)
             raise
 
+    async def aupload(self, filename: str, file_data: bytes, user_id: int) -> str:
+        """Nothing blocks in mock uploads, so skip the executor."""
+        return self.upload(filename, file_data, user_id)
+
     def get_url(self, file_key: str) -> str:
         """
         Get the mock URL for a file.
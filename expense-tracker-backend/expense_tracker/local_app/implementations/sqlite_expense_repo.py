@@ -1,70 +1,200 @@
 """SQLite expense repository implementation for local development."""
 
 import logging
-from typing import Dict, List, Optional
+from datetime import datetime
+from functools import reduce
+from operator import and_
+from typing import Dict, List, Optional, Tuple
 
-from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.db.models import BooleanField, CharField, Count, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils import timezone
 
-from auth_app.models import Expense
-from auth_app.services.expense_service import ExpenseRepository
+from auth_app.models import Expense, ExpenseTombstone
+from auth_app.services.async_utils import run_blocking
+from auth_app.services.category_service import get_category_index
+from auth_app.services.event_service import (
+    EVENT_CREATED,
+    EVENT_UPDATED,
+    publish_expense_event_on_commit,
+)
+from auth_app.services.expense_service import (
+    EXPENSE_FIELDS,
+    ExpenseFilters,
+    ExpenseRepository,
+)
+from auth_app.services.search_service import (
+    build_fts5_query,
+    build_tsquery,
+    tokenize,
+)
 
 logger = logging.getLogger(__name__)
 
+# Keep in sync with the index created in migration 0003_expense_search_index
+_PG_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(category, '') || ' ' || coalesce(description, ''))"
+)
+
+
+def _token_condition(tokens: List[str]) -> Q:
+    """Every token must appear in the category or description (LIKE fallback)."""
+    return reduce(and_, (
+        Q(category__icontains=token) | Q(description__icontains=token)
+        for token in tokens
+    ))
+
+
+def _filter_text(queryset, query: str):
+    """Restrict a queryset to rows matching a full-text query, using the search index."""
+    if connection.vendor == 'sqlite':
+        match = build_fts5_query(query)
+        if match is None:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            'SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH %s', [match]
+        ))
+
+    if connection.vendor == 'postgresql':
+        tsquery = build_tsquery(query)
+        if tsquery is None:
+            return queryset
+        # A boolean expression filters as a bare WHERE condition; spelled out
+        # rather than SearchVector so it matches the GIN index expression
+        return queryset.filter(RawSQL(
+            f"{_PG_SEARCH_VECTOR} @@ to_tsquery('english', %s)", [tsquery], output_field=BooleanField()
+        ))
+
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+    return queryset.filter(_token_condition(tokens))
+
+
+def _apply_filters(queryset, filters: ExpenseFilters):
+    """Push list filters and sorting down into WHERE / ORDER BY."""
+    if filters.category:
+        queryset = queryset.filter(category=filters.category)
+    if filters.date_from:
+        queryset = queryset.filter(timestamp__gte=filters.date_from)
+    if filters.date_to:
+        queryset = queryset.filter(timestamp__lte=filters.date_to)
+    if filters.min_amount is not None:
+        queryset = queryset.filter(amount__gte=filters.min_amount)
+    if filters.max_amount is not None:
+        queryset = queryset.filter(amount__lte=filters.max_amount)
+    if filters.q:
+        queryset = _filter_text(queryset, filters.q)
+
+    prefix = '-' if filters.sort_descending else ''
+    ordering = [f'{prefix}{filters.sort_field}']
+    if filters.sort_field != 'timestamp':
+        ordering.append('-timestamp')
+    return queryset.order_by(*ordering, f'{prefix}id')
+
+
+# Expense dictionary fields read with .values(). Rows are returned as read
+# (Decimal amount, datetime timestamp) and encoded by the JSON response layer;
+# only the primary key needs renaming and casting.
+_FIELD_EXPRESSIONS = {
+    'expense_id': Cast('id', output_field=CharField()),
+}
+
+
+def _values_arguments(fields) -> Tuple[List[str], Dict]:
+    """Split requested fields into .values() column names and expressions."""
+    names = [field for field in fields if field not in _FIELD_EXPRESSIONS]
+    expressions = {
+        field: _FIELD_EXPRESSIONS[field] for field in fields if field in _FIELD_EXPRESSIONS
+    }
+    return names, expressions
+
+
+def _is_foreign_key_violation(error: Exception) -> bool:
+    """
+    Whether an insert failed on a foreign key rather than another constraint.
+
+    Matches the SQLite ("FOREIGN KEY constraint failed") and PostgreSQL
+    ("violates foreign key constraint") messages; the expense's only foreign
+    key is its user.
+    """
+    return isinstance(error, IntegrityError) and 'foreign key' in str(error).lower()
+
+
+def _unknown_user(user_id: int) -> ValueError:
+    """
+    The error for an insert whose user_id the foreign key rejected.
+
+    The constraint is checked when the insert commits: immediately in
+    autocommit mode (views), but only at the end of an enclosing atomic()
+    block, where the IntegrityError surfaces from the commit instead.
+    """
+    logger.error(f'User not found: {user_id}')
+    return ValueError(f'User with id {user_id} does not exist')
+
+
+def _expense_to_dict(expense: Expense) -> Dict:
+    """Convert an Expense row to the repository dictionary format."""
+    return {
+        'expense_id': str(expense.id),
+        'user_id': expense.user_id,
+        'amount': float(expense.amount),
+        'category': expense.category,
+        'description': expense.description,
+        'timestamp': expense.timestamp.isoformat(),
+        'receipt_url': expense.receipt_url,
+    }
+
 
 class SQLiteExpenseRepository(ExpenseRepository):
     """Expense storage using Django ORM with SQLite and proper User relationships."""
 
+    # Async variants without a native override must run on Django's sync thread
+    async_thread_sensitive = True
+
     def create(
         self, user_id: int, amount: float, category: str, description: str = ''
     ) -> Dict:
-        """Create a new expense in SQLite using User ForeignKey."""
+        """
+        Create a new expense in SQLite.
+
+        Inserts with the user_id foreign key directly, without reading the
+        User first; an unknown user is rejected by the FK constraint (see
+        _unknown_user).
+        """
         try:
-            user = User.objects.get(pk=user_id)
             expense = Expense.objects.create(
-                user=user,
+                user_id=user_id,
                 amount=amount,
                 category=category,
                 description=description,
             )
 
+            result = self._record_created(user_id, expense)
             logger.info(f'Expense created: {expense.id} for user: {user_id}')
 
-            return {
-                'expense_id': str(expense.id),
-                'user_id': expense.user.id,
-                'amount': float(expense.amount),
-                'category': expense.category,
-                'description': expense.description,
-                'timestamp': expense.timestamp.isoformat(),
-                'receipt_url': expense.receipt_url,
-            }
-
-        except User.DoesNotExist:
-            logger.error(f'User not found: {user_id}')
-            raise ValueError(f'User with id {user_id} does not exist')
+            return result
+
         except Exception as e:
+            if _is_foreign_key_violation(e):
+                raise _unknown_user(user_id) from e
             logger.error(f'Error creating expense: {str(e)}', exc_info=True)
             raise
 
-    def get_by_user(self, user_id: int) -> List[Dict]:
-        """Get all expenses for a user from SQLite using ForeignKey with optimization."""
+    def get_by_user(
+        self,
+        user_id: int,
+        filters: Optional[ExpenseFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Dict]:
+        """Get a user's expenses, selecting only the requested columns."""
         try:
-            expenses = Expense.objects.filter(
-                user_id=user_id
-            ).select_related('user').order_by('-timestamp')
-
-            result = [
-                {
-                    'expense_id': str(exp.id),
-                    'user_id': exp.user.id,
-                    'amount': float(exp.amount),
-                    'category': exp.category,
-                    'description': exp.description,
-                    'timestamp': exp.timestamp.isoformat(),
-                    'receipt_url': exp.receipt_url,
-                }
-                for exp in expenses
-            ]
+            names, expressions = _values_arguments(fields or EXPENSE_FIELDS)
+            result = list(_apply_filters(
+                Expense.objects.filter(user_id=user_id), filters or ExpenseFilters()
+            ).values(*names, **expressions))
 
             logger.info(f'Retrieved {len(result)} expenses for user: {user_id}')
             return result
@@ -76,19 +206,11 @@ class SQLiteExpenseRepository(ExpenseRepository):
     def get_by_id(self, expense_id: str) -> Optional[Dict]:
         """Get a specific expense by ID from SQLite."""
         try:
-            expense = Expense.objects.select_related('user').get(id=expense_id)
+            expense = Expense.objects.get(id=expense_id)
 
             logger.info(f'Retrieved expense: {expense_id}')
 
-            return {
-                'expense_id': str(expense.id),
-                'user_id': expense.user.id if expense.user else None,
-                'amount': float(expense.amount),
-                'category': expense.category,
-                'description': expense.description,
-                'timestamp': expense.timestamp.isoformat(),
-                'receipt_url': expense.receipt_url,
-            }
+            return _expense_to_dict(expense)
 
         except Expense.DoesNotExist:
             logger.warning(f'Expense not found: {expense_id}')
@@ -97,19 +219,31 @@ class SQLiteExpenseRepository(ExpenseRepository):
             logger.error(f'Error retrieving expense {expense_id}: {str(e)}', exc_info=True)
             raise
 
-    def update_receipt_url(self, expense_id: str, receipt_url: str) -> bool:
-        """Update an expense with a receipt URL."""
+    def update_receipt_url(
+        self, expense_id: str, receipt_url: str, user_id: Optional[int] = None
+    ) -> bool:
+        """
+        Link a receipt URL to an expense with a single UPDATE.
+
+        Only receipt_url and updated_at are written, and the owner check is
+        part of the same statement, so there is no read-modify-write race.
+        """
         try:
-            expense = Expense.objects.get(id=expense_id)
-            expense.receipt_url = receipt_url
-            expense.save()
+            expenses = Expense.objects.filter(id=expense_id)
+            if user_id is not None:
+                expenses = expenses.filter(user_id=user_id)
+            updated_at = timezone.now()
+            if not expenses.update(receipt_url=receipt_url, updated_at=updated_at):
+                logger.warning(f'Expense not found: {expense_id}')
+                return False
 
+            if user_id is None:
+                # Unscoped callers: read the owner back to address the event
+                user_id = Expense.objects.filter(id=expense_id).values_list('user_id', flat=True).first()
+            self._record_receipt_updated(expense_id, user_id, receipt_url, updated_at)
             logger.info(f'Receipt URL updated for expense: {expense_id}')
             return True
 
-        except Expense.DoesNotExist:
-            logger.warning(f'Expense not found: {expense_id}')
-            return False
         except Exception as e:
             logger.error(f'Error updating receipt URL for {expense_id}: {str(e)}', exc_info=True)
             return False
@@ -122,35 +256,283 @@ class SQLiteExpenseRepository(ExpenseRepository):
         description: str = '',
         receipt_url: Optional[str] = None,
     ) -> Dict:
-        """Create a new expense with optional receipt URL using User ForeignKey."""
+        """Create a new expense with optional receipt URL, inserting user_id directly like create."""
         try:
-            user = User.objects.get(pk=user_id)
             expense = Expense.objects.create(
-                user=user,
+                user_id=user_id,
                 amount=amount,
                 category=category,
                 description=description,
                 receipt_url=receipt_url,
             )
 
+            result = self._record_created(user_id, expense)
             logger.info(f'Expense with receipt created: {expense.id} for user: {user_id}')
 
-            return {
-                'expense_id': str(expense.id),
-                'user_id': expense.user.id,
-                'amount': float(expense.amount),
-                'category': expense.category,
-                'description': expense.description,
-                'timestamp': expense.timestamp.isoformat(),
-                'receipt_url': expense.receipt_url,
-            }
-
-        except User.DoesNotExist:
-            logger.error(f'User not found: {user_id}')
-            raise ValueError(f'User with id {user_id} does not exist')
+            return result
+
         except Exception as e:
+            if _is_foreign_key_violation(e):
+                raise _unknown_user(user_id) from e
             logger.error(
                 f'Error creating expense with receipt for user {user_id}: {str(e)}',
                 exc_info=True,
             )
             raise
+
+    def search(
+        self, user_id: int, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """
+        Ranked full-text search using the database's native index.
+
+        SQLite uses the FTS5 table kept in sync by triggers, PostgreSQL uses
+        the tsvector GIN index. Other databases fall back to LIKE matching.
+        """
+        try:
+            if connection.vendor == 'sqlite':
+                expenses, total = self._search_sqlite(user_id, query, limit, offset)
+            elif connection.vendor == 'postgresql':
+                expenses, total = self._search_postgres(user_id, query, limit, offset)
+            else:
+                expenses, total = self._search_fallback(user_id, query, limit, offset)
+
+            result = [_expense_to_dict(exp) for exp in expenses]
+            logger.info(f'Search returned {len(result)} of {total} expenses for user: {user_id}')
+            return result, total
+
+        except Exception as e:
+            logger.error(f'Error searching expenses for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    def get_category_counts(self, user_id: int) -> Dict[str, int]:
+        """Count expenses per category with a single GROUP BY query."""
+        try:
+            rows = (
+                Expense.objects.filter(user_id=user_id)
+                .order_by()
+                .values_list('category')
+                .annotate(count=Count('id'))
+            )
+            return dict(rows)
+
+        except Exception as e:
+            logger.error(f'Error counting categories for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    def get_changes(
+        self, user_id: int, since: Optional[datetime] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """Read rows modified since a sync point and the tombstones of deleted rows."""
+        try:
+            queryset = Expense.objects.filter(user_id=user_id)
+            deleted = []
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+                deleted = list(ExpenseTombstone.objects.filter(
+                    user_id=user_id, deleted_at__gte=since
+                ).values_list('expense_id', flat=True))
+
+            names, expressions = _values_arguments(EXPENSE_FIELDS)
+            changed = list(
+                queryset.order_by('updated_at', 'id').values(*names, 'updated_at', **expressions)
+            )
+
+            logger.info(
+                f'Retrieved {len(changed)} changed and {len(deleted)} deleted expenses '
+                f'for user: {user_id}'
+            )
+            return changed, deleted
+
+        except Exception as e:
+            logger.error(f'Error retrieving changes for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    async def acreate(
+        self, user_id: int, amount: float, category: str, description: str = ''
+    ) -> Dict:
+        """Create a new expense with the async ORM, inserting user_id directly like create."""
+        try:
+            expense = await Expense.objects.acreate(
+                user_id=user_id,
+                amount=amount,
+                category=category,
+                description=description,
+            )
+
+            result = await self._arecord_created(user_id, expense)
+            logger.info(f'Expense created: {expense.id} for user: {user_id}')
+
+            return result
+
+        except Exception as e:
+            if _is_foreign_key_violation(e):
+                raise _unknown_user(user_id) from e
+            logger.error(f'Error creating expense: {str(e)}', exc_info=True)
+            raise
+
+    async def aget_by_user(
+        self,
+        user_id: int,
+        filters: Optional[ExpenseFilters] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Dict]:
+        """Get a user's expenses with the async ORM."""
+        try:
+            names, expressions = _values_arguments(fields or EXPENSE_FIELDS)
+            rows = _apply_filters(
+                Expense.objects.filter(user_id=user_id), filters or ExpenseFilters()
+            ).values(*names, **expressions)
+            result = [row async for row in rows]
+
+            logger.info(f'Retrieved {len(result)} expenses for user: {user_id}')
+            return result
+
+        except Exception as e:
+            logger.error(f'Error retrieving expenses for user {user_id}: {str(e)}', exc_info=True)
+            raise
+
+    async def aupdate_receipt_url(
+        self, expense_id: str, receipt_url: str, user_id: Optional[int] = None
+    ) -> bool:
+        """Link a receipt URL to an expense with a single UPDATE, using the async ORM."""
+        try:
+            expenses = Expense.objects.filter(id=expense_id)
+            if user_id is not None:
+                expenses = expenses.filter(user_id=user_id)
+            updated_at = timezone.now()
+            if not await expenses.aupdate(receipt_url=receipt_url, updated_at=updated_at):
+                logger.warning(f'Expense not found: {expense_id}')
+                return False
+
+            if user_id is None:
+                user_id = await Expense.objects.filter(id=expense_id).values_list('user_id', flat=True).afirst()
+            # Publishing may block on the broker's socket; keep it off the event loop
+            await run_blocking(self._record_receipt_updated, expense_id, user_id, receipt_url, updated_at)
+            logger.info(f'Receipt URL updated for expense: {expense_id}')
+            return True
+
+        except Exception as e:
+            logger.error(f'Error updating receipt URL for {expense_id}: {str(e)}', exc_info=True)
+            return False
+
+    async def aadd_expense_with_receipt(
+        self,
+        user_id: int,
+        amount: float,
+        category: str,
+        description: str = '',
+        receipt_url: Optional[str] = None,
+    ) -> Dict:
+        """Create a new expense with optional receipt URL using the async ORM."""
+        try:
+            expense = await Expense.objects.acreate(
+                user_id=user_id,
+                amount=amount,
+                category=category,
+                description=description,
+                receipt_url=receipt_url,
+            )
+
+            result = await self._arecord_created(user_id, expense)
+            logger.info(f'Expense with receipt created: {expense.id} for user: {user_id}')
+
+            return result
+
+        except Exception as e:
+            if _is_foreign_key_violation(e):
+                raise _unknown_user(user_id) from e
+            logger.error(
+                f'Error creating expense with receipt for user {user_id}: {str(e)}',
+                exc_info=True,
+            )
+            raise
+
+    @staticmethod
+    def _record_created(user_id: int, expense: Expense) -> Dict:
+        """Refresh the user's category counts and notify subscribers once the insert commits."""
+        result = _expense_to_dict(expense)
+        get_category_index().record(user_id)
+        publish_expense_event_on_commit(user_id, EVENT_CREATED, expense=result)
+        return result
+
+    async def _arecord_created(self, user_id: int, expense: Expense) -> Dict:
+        """
+        _record_created for the async paths.
+
+        The category index (Django cache) and the event broker (a Redis
+        socket when configured) block, so they run in the executor rather
+        than stalling the event loop while a cache or broker is slow or down.
+        The async ORM inserts in autocommit, so the row has been committed
+        and both run at once.
+        """
+        return await run_blocking(self._record_created, user_id, expense)
+
+    @staticmethod
+    def _record_receipt_updated(expense_id, user_id: Optional[int], receipt_url: str, updated_at) -> None:
+        """Notify subscribers of the changed fields (the full row was never read)."""
+        if user_id is not None:
+            publish_expense_event_on_commit(user_id, EVENT_UPDATED, expense={
+                'expense_id': str(expense_id),
+                'user_id': user_id,
+                'receipt_url': receipt_url,
+                'updated_at': updated_at.isoformat(),
+            })
+
+    @staticmethod
+    def _search_sqlite(user_id: int, query: str, limit: int, offset: int):
+        match = build_fts5_query(query)
+        if match is None:
+            return [], 0
+
+        table = Expense._meta.db_table
+        from_clause = (
+            f'FROM expenses_fts JOIN {table} ON {table}.id = expenses_fts.rowid '
+            f'WHERE expenses_fts MATCH %s AND {table}.user_id = %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {from_clause}', [match, user_id])
+            total = cursor.fetchone()[0]
+
+        # bm25() is lower-is-better; category matches weigh double
+        expenses = list(Expense.objects.raw(
+            f'SELECT {table}.* {from_clause} '
+            f'ORDER BY bm25(expenses_fts, 2.0, 1.0), {table}.timestamp DESC '
+            f'LIMIT %s OFFSET %s',
+            [match, user_id, limit, offset],
+        ))
+        return expenses, total
+
+    @staticmethod
+    def _search_postgres(user_id: int, query: str, limit: int, offset: int):
+        tsquery = build_tsquery(query)
+        if tsquery is None:
+            return [], 0
+
+        table = Expense._meta.db_table
+        from_clause = (
+            f"FROM {table}, to_tsquery('english', %s) query "
+            f'WHERE {table}.user_id = %s AND {_PG_SEARCH_VECTOR} @@ query'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {from_clause}', [tsquery, user_id])
+            total = cursor.fetchone()[0]
+
+        expenses = list(Expense.objects.raw(
+            f'SELECT {table}.* {from_clause} '
+            f'ORDER BY ts_rank({_PG_SEARCH_VECTOR}, query) DESC, {table}.timestamp DESC '
+            f'LIMIT %s OFFSET %s',
+            [tsquery, user_id, limit, offset],
+        ))
+        return expenses, total
+
+    @staticmethod
+    def _search_fallback(user_id: int, query: str, limit: int, offset: int):
+        tokens = tokenize(query)
+        if not tokens:
+            return [], 0
+
+        queryset = Expense.objects.filter(
+            _token_condition(tokens), user_id=user_id
+        ).order_by('-timestamp')
+        return list(queryset[offset:offset + limit]), queryset.count()
@@ -2,9 +2,19 @@
 
 import base64
 import json
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+
+from auth_app.models import Expense
+from auth_app.services.category_service import get_category_index
+from auth_app.services.expense_service import ExpenseFilters
 
 from ..implementations.local_auth_service import LocalAuthService
 from ..implementations.local_file_storage import LocalFileStorage
@@ -164,6 +174,7 @@ class SQLiteExpenseRepositoryTest(TestCase):
             password='testpass123'
         )
         self.repo = SQLiteExpenseRepository()
+        cache.clear()
 
     def test_create_expense(self):
         """Test creating an expense"""
@@ -178,6 +189,13 @@ class SQLiteExpenseRepositoryTest(TestCase):
         self.assertEqual(result['amount'], 25.50)
         self.assertEqual(result['category'], 'Food')
 
+    def test_create_writes_without_user_lookup(self):
+        """Test create and add_expense_with_receipt are a single INSERT"""
+        with self.assertNumQueries(1):
+            self.repo.create(self.user.id, 12.00, 'Food')
+        with self.assertNumQueries(1):
+            self.repo.add_expense_with_receipt(self.user.id, 12.00, 'Food', receipt_url='https://example.com/r.jpg')
+
     def test_create_expense_defaults(self):
         """Test creating expense with default description"""
         result = self.repo.create(
@@ -234,6 +252,26 @@ class SQLiteExpenseRepositoryTest(TestCase):
         updated = self.repo.get_by_id(expense_id)
         self.assertEqual(updated['receipt_url'], 'https://example.com/receipt.jpg')
 
+    def test_update_receipt_url_owner_scoped(self):
+        """Test the owner-scoped update is one UPDATE and refuses other users' expenses"""
+        other = User.objects.create_user(username='other@example.com', email='other@example.com')
+        expense_id = self.repo.create(self.user.id, 25.00, 'Travel')['expense_id']
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.repo.update_receipt_url(expense_id, 'https://example.com/a.jpg', self.user.id))
+        self.assertFalse(self.repo.update_receipt_url(expense_id, 'https://example.com/b.jpg', other.id))
+
+        self.assertEqual(self.repo.get_by_id(expense_id)['receipt_url'], 'https://example.com/a.jpg')
+
+    async def test_aupdate_receipt_url_owner_scoped(self):
+        """Test the async update enforces the owner"""
+        created = await self.repo.acreate(self.user.id, 25.00, 'Travel')
+
+        self.assertFalse(await self.repo.aupdate_receipt_url(created['expense_id'], 'https://example.com/b.jpg', 0))
+        self.assertTrue(
+            await self.repo.aupdate_receipt_url(created['expense_id'], 'https://example.com/a.jpg', self.user.id)
+        )
+
     def test_update_receipt_url_not_found(self):
         """Test updating receipt URL for non-existent expense"""
         success = self.repo.update_receipt_url(99999, 'https://example.com/receipt.jpg')
@@ -281,6 +319,308 @@ class SQLiteExpenseRepositoryTest(TestCase):
         self.assertEqual(expenses[0]['expense_id'], exp2['expense_id'])
         self.assertEqual(expenses[1]['expense_id'], exp1['expense_id'])
 
+    def test_search_matches_category_and_description(self):
+        """Test search finds matches in both category and description"""
+        self.repo.create(self.user.id, 4.50, 'Coffee', 'Morning latte')
+        self.repo.create(self.user.id, 60.00, 'Groceries', 'Weekly shop incl. coffee beans')
+        self.repo.create(self.user.id, 12.00, 'Transport', 'Taxi home')
+
+        results, total = self.repo.search(self.user.id, 'coffee')
+
+        self.assertEqual(total, 2)
+        # Category matches rank above description matches
+        self.assertEqual(results[0]['category'], 'Coffee')
+        self.assertEqual(results[1]['category'], 'Groceries')
+
+    def test_search_prefix_and_all_terms(self):
+        """Test search uses prefix matching and requires every term"""
+        self.repo.create(self.user.id, 4.50, 'Coffee', 'Morning latte')
+        self.repo.create(self.user.id, 5.00, 'Coffee', 'Afternoon espresso')
+
+        results, total = self.repo.search(self.user.id, 'cof morn')
+
+        self.assertEqual(total, 1)
+        self.assertEqual(results[0]['description'], 'Morning latte')
+
+    def test_search_paginates(self):
+        """Test search returns the requested page and the full match count"""
+        for i in range(5):
+            self.repo.create(self.user.id, 10.00 + i, 'Food', f'Meal {i}')
+
+        results, total = self.repo.search(self.user.id, 'food', limit=2, offset=4)
+
+        self.assertEqual(total, 5)
+        self.assertEqual(len(results), 1)
+
+    def test_search_user_isolation(self):
+        """Test search only returns the requesting user's expenses"""
+        other_user = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.repo.create(other_user.id, 10.00, 'Food', 'Pizza')
+
+        results, total = self.repo.search(self.user.id, 'pizza')
+
+        self.assertEqual(total, 0)
+        self.assertEqual(results, [])
+
+    def test_search_ignores_query_syntax(self):
+        """Test FTS operators in user input are treated as plain text"""
+        self.repo.create(self.user.id, 10.00, 'Food', 'Pizza')
+
+        results, total = self.repo.search(self.user.id, 'pizza OR "NEAR(*')
+
+        self.assertEqual(total, 0)
+        results, total = self.repo.search(self.user.id, '"*')
+        self.assertEqual(total, 0)
+
+    def test_search_index_follows_updates(self):
+        """Test the search index is kept in sync when rows change"""
+        created = self.repo.create(self.user.id, 10.00, 'Food', 'Pizza')
+        Expense.objects.filter(id=created['expense_id']).update(description='Sushi')
+
+        self.assertEqual(self.repo.search(self.user.id, 'pizza')[1], 0)
+        self.assertEqual(self.repo.search(self.user.id, 'sushi')[1], 1)
+
+        Expense.objects.filter(id=created['expense_id']).delete()
+        self.assertEqual(self.repo.search(self.user.id, 'sushi')[1], 0)
+
+    def test_get_category_counts(self):
+        """Test counting expenses per category"""
+        self.repo.create(self.user.id, 10.00, 'Food')
+        self.repo.create(self.user.id, 20.00, 'Food')
+        self.repo.create(self.user.id, 30.00, 'Travel')
+
+        self.assertEqual(self.repo.get_category_counts(self.user.id), {'Food': 2, 'Travel': 1})
+
+    def test_create_updates_cached_categories(self):
+        """Test committed writes keep the cached category dictionary current"""
+        index = get_category_index()
+        self.repo.create(self.user.id, 10.00, 'Food')
+        index.suggest(self.user.id, '', self.repo.get_category_counts)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.repo.create(self.user.id, 20.00, 'Food')
+            self.repo.add_expense_with_receipt(self.user.id, 5.00, 'Fees')
+
+        self.assertEqual(
+            index.suggest(self.user.id, 'f', self.repo.get_category_counts),
+            [{'name': 'Food', 'count': 2}, {'name': 'Fees', 'count': 1}],
+        )
+
+    def test_get_by_user_filters(self):
+        """Test category, amount and text filters are applied"""
+        self.repo.create(self.user.id, 10.00, 'Food', 'Pizza')
+        self.repo.create(self.user.id, 30.00, 'Food', 'Sushi')
+        self.repo.create(self.user.id, 20.00, 'Transport', 'Taxi')
+
+        food = self.repo.get_by_user(self.user.id, ExpenseFilters(category='Food'))
+        mid = self.repo.get_by_user(
+            self.user.id, ExpenseFilters(min_amount=Decimal('15'), max_amount=Decimal('25'))
+        )
+        sushi = self.repo.get_by_user(self.user.id, ExpenseFilters(q='sush'))
+
+        self.assertEqual(len(food), 2)
+        self.assertEqual([e['category'] for e in mid], ['Transport'])
+        self.assertEqual([e['description'] for e in sushi], ['Sushi'])
+
+    def test_get_by_user_date_range(self):
+        """Test from/to bounds are inclusive"""
+        old = self.repo.create(self.user.id, 10.00, 'Food')
+        Expense.objects.filter(id=old['expense_id']).update(
+            timestamp=datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+        )
+        self.repo.create(self.user.id, 20.00, 'Food')
+
+        filters = ExpenseFilters.from_params({'from': '2024-06-01', 'to': '2024-06-01'})
+        expenses = self.repo.get_by_user(self.user.id, filters)
+
+        self.assertEqual([e['expense_id'] for e in expenses], [old['expense_id']])
+
+    def test_get_by_user_sort_by_amount(self):
+        """Test sorting by amount in both directions"""
+        for amount in [20.00, 5.00, 40.00]:
+            self.repo.create(self.user.id, amount, 'Food')
+
+        ascending = self.repo.get_by_user(self.user.id, ExpenseFilters(sort='amount'))
+        descending = self.repo.get_by_user(self.user.id, ExpenseFilters(sort='amount_desc'))
+
+        self.assertEqual([e['amount'] for e in ascending], [5.00, 20.00, 40.00])
+        self.assertEqual([e['amount'] for e in descending], [40.00, 20.00, 5.00])
+
+    def test_get_by_user_projection(self):
+        """Test only the requested fields are returned"""
+        self.repo.create(self.user.id, 12.50, 'Food', 'Lunch')
+
+        expenses = self.repo.get_by_user(
+            self.user.id, fields=('expense_id', 'amount', 'timestamp')
+        )
+
+        self.assertEqual(set(expenses[0]), {'expense_id', 'amount', 'timestamp'})
+        self.assertEqual(expenses[0]['amount'], 12.50)
+        self.assertIsInstance(expenses[0]['expense_id'], str)
+        # Rows are returned unconverted; the JSON response layer encodes them
+        self.assertIsInstance(expenses[0]['timestamp'], datetime)
+
+    def test_writes_publish_events(self):
+        """Test creates and receipt updates publish change events"""
+        with patch('auth_app.services.event_service.publish_expense_event') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                created = self.repo.create(self.user.id, 10.00, 'Food')
+                self.repo.update_receipt_url(created['expense_id'], 'https://example.com/r.jpg')
+                # Held back until the surrounding transaction commits
+                publish.assert_not_called()
+
+        self.assertEqual(publish.call_args_list[0].args, (self.user.id, 'expense.created'))
+        self.assertEqual(publish.call_args_list[0].kwargs, {'expense': created})
+        self.assertEqual(publish.call_args_list[1].args, (self.user.id, 'expense.updated'))
+        # Updates carry only the changed fields
+        self.assertEqual(
+            set(publish.call_args_list[1].kwargs['expense']),
+            {'expense_id', 'user_id', 'receipt_url', 'updated_at'},
+        )
+        self.assertEqual(
+            publish.call_args_list[1].kwargs['expense']['receipt_url'], 'https://example.com/r.jpg'
+        )
+
+    async def test_async_variants(self):
+        """Test native and default async variants match the sync methods"""
+        created = await self.repo.aadd_expense_with_receipt(
+            self.user.id, 8.00, 'Coffee', 'Latte', 'https://example.com/r.jpg'
+        )
+
+        expenses = await self.repo.aget_by_user(self.user.id)
+        results, total = await self.repo.asearch(self.user.id, 'latte')
+
+        self.assertEqual(created['receipt_url'], 'https://example.com/r.jpg')
+        self.assertEqual([e['expense_id'] for e in expenses], [created['expense_id']])
+        self.assertEqual((results[0]['expense_id'], total), (created['expense_id'], 1))
+
+    async def test_async_writes_publish_off_event_loop(self):
+        """Test async writes publish from a worker thread, not the event loop's"""
+        loop_thread = threading.get_ident()
+        threads = []
+        with patch(
+            'auth_app.services.event_service.publish_expense_event',
+            side_effect=lambda *args, **kwargs: threads.append(threading.get_ident()),
+        ):
+            created = await self.repo.acreate(self.user.id, 10.00, 'Food')
+            await self.repo.aupdate_receipt_url(created['expense_id'], 'https://example.com/r.jpg')
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_get_changes_full_snapshot(self):
+        """Test changes without a sync point return every expense"""
+        self.repo.create(self.user.id, 10.00, 'Food')
+        self.repo.create(self.user.id, 20.00, 'Transport')
+
+        changed, deleted = self.repo.get_changes(self.user.id)
+
+        self.assertEqual([e['category'] for e in changed], ['Food', 'Transport'])
+        self.assertIn('updated_at', changed[0])
+        self.assertEqual(deleted, [])
+
+    def test_get_changes_since(self):
+        """Test only expenses modified or deleted after the sync point are returned"""
+        old = self.repo.create(self.user.id, 10.00, 'Food')
+        removed = self.repo.create(self.user.id, 15.00, 'Gym')
+        since = datetime.now(timezone.utc)
+
+        new = self.repo.create(self.user.id, 20.00, 'Transport')
+        self.repo.update_receipt_url(old['expense_id'], 'https://example.com/r.jpg')
+        Expense.objects.filter(id=removed['expense_id']).delete()
+
+        changed, deleted = self.repo.get_changes(self.user.id, since)
+
+        self.assertEqual(
+            [e['expense_id'] for e in changed], [new['expense_id'], old['expense_id']]
+        )
+        self.assertEqual(changed[1]['receipt_url'], 'https://example.com/r.jpg')
+        self.assertEqual(deleted, [removed['expense_id']])
+
+
+class SQLiteExpenseRepositoryIntegrityTest(TransactionTestCase):
+    """Test unknown users are rejected by the foreign key (checked when autocommit inserts commit)."""
+
+    def setUp(self):
+        self.repo = SQLiteExpenseRepository()
+
+    def test_create_unknown_user(self):
+        """Test create raises ValueError and stores nothing"""
+        with self.assertRaisesMessage(ValueError, 'User with id 99999 does not exist'):
+            self.repo.create(99999, 10.00, 'Food')
+
+        self.assertFalse(Expense.objects.exists())
+
+    def test_add_expense_with_receipt_unknown_user(self):
+        """Test add_expense_with_receipt raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.repo.add_expense_with_receipt(99999, 10.00, 'Food', receipt_url='https://example.com/r.jpg')
+
+    async def test_async_create_unknown_user(self):
+        """Test the async variants raise ValueError"""
+        with self.assertRaises(ValueError):
+            await self.repo.acreate(99999, 10.00, 'Food')
+        with self.assertRaises(ValueError):
+            await self.repo.aadd_expense_with_receipt(99999, 10.00, 'Food')
+
+    def test_other_integrity_errors_propagate(self):
+        """Test integrity failures other than the user foreign key are not reported as unknown users"""
+        error = IntegrityError('NOT NULL constraint failed: expenses.amount')
+        with patch.object(Expense.objects, 'create', side_effect=error):
+            with self.assertRaisesMessage(IntegrityError, 'NOT NULL'):
+                self.repo.create(1, None, 'Food')
+            with self.assertRaisesMessage(IntegrityError, 'NOT NULL'):
+                self.repo.add_expense_with_receipt(1, None, 'Food')
+
+    async def test_async_other_integrity_errors_propagate(self):
+        """Test the async variants re-raise integrity failures other than the user foreign key"""
+        error = IntegrityError('NOT NULL constraint failed: expenses.amount')
+        with patch.object(Expense.objects, 'acreate', side_effect=error):
+            with self.assertRaisesMessage(IntegrityError, 'NOT NULL'):
+                await self.repo.acreate(1, None, 'Food')
+            with self.assertRaisesMessage(IntegrityError, 'NOT NULL'):
+                await self.repo.aadd_expense_with_receipt(1, None, 'Food')
+
+
+class SQLiteExpenseRepositoryEventsTest(TransactionTestCase):
+    """Test events and cached categories follow the transaction outcome (needs real commits)."""
+
+    def setUp(self):
+        self.repo = SQLiteExpenseRepository()
+        self.user = User.objects.create_user(username='owner@example.com', email='owner@example.com')
+
+    def test_rolled_back_write_publishes_nothing(self):
+        """Test events for writes in a rolled-back transaction are never published"""
+        with patch('auth_app.services.event_service.publish_expense_event') as publish:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.repo.create(self.user.id, 10.00, 'Food')
+                raise RuntimeError('request failed')
+            self.repo.create(self.user.id, 20.00, 'Food')
+
+        self.assertEqual(publish.call_count, 1)
+        self.assertEqual(publish.call_args.kwargs['expense']['amount'], 20.00)
+
+    def test_rolled_back_write_keeps_cached_categories(self):
+        """Test a rolled-back write leaves the cached dictionary alone and a committed one drops it"""
+        cache.clear()
+        index = get_category_index()
+        index.suggest(self.user.id, '', self.repo.get_category_counts)
+
+        with patch.object(index, 'invalidate') as invalidate:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.repo.create(self.user.id, 10.00, 'Food')
+                raise RuntimeError('request failed')
+            invalidate.assert_not_called()
+
+            with transaction.atomic():
+                self.repo.create(self.user.id, 20.00, 'Food')
+                invalidate.assert_not_called()
+        invalidate.assert_called_once_with(self.user.id)
+
 
 class LocalFileStorageTest(TestCase):
     """Test local file storage implementation (mock storage for local development)."""
@@ -0,0 +1,83 @@
+"""
+Batched helpers for RunPython data migrations.
+
+A data migration that loads, looks up and saves one row at a time costs
+several queries per row, which on a large table means millions of round
+trips inside a single migration. run_in_batches walks a queryset in
+primary-key order and hands each chunk to a handler that works in bulk:
+in_bulk for lookups, bulk_update for changes and one filtered delete for
+removals. The query count then grows with the number of batches, not rows.
+"""
+
+import sys
+import time
+from collections import Counter
+from typing import Callable, Iterator, List, Mapping, Optional, TextIO
+
+from django.db.models import Model, QuerySet
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_batches(queryset: QuerySet, batch_size: Optional[int] = None) -> Iterator[List[Model]]:
+    """
+    Yield the queryset's rows in lists of up to batch_size, in primary-key order.
+
+    Each batch is its own keyset query (pk greater than the last one seen)
+    rather than a slice of one long-lived cursor: SQLite gives no isolation
+    between statements on one connection, and OFFSET pagination skips rows
+    once earlier batches delete some. Handlers may therefore update or
+    delete the rows they are given.
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size].iterator(chunk_size=batch_size))
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_pk = batch[-1].pk
+
+
+def run_in_batches(
+    queryset: QuerySet,
+    handle_batch: Callable[[List[Model]], Optional[Mapping[str, int]]],
+    batch_size: Optional[int] = None,
+    label: Optional[str] = None,
+    stdout: Optional[TextIO] = None,
+) -> Counter:
+    """
+    Apply handle_batch to every batch of the queryset, printing progress.
+
+    Args:
+        queryset: Rows to migrate
+        handle_batch: Processes one batch with bulk queries; may return
+            counts (e.g. {'migrated': 480, 'deleted': 20}) that are summed
+        batch_size: Rows fetched and handled per batch (default: DEFAULT_BATCH_SIZE)
+        label: Name shown in progress lines (default: the model's)
+        stdout: Where progress goes (default: sys.stdout)
+
+    Returns:
+        The summed counts, plus 'rows' for the number of rows handled
+    """
+    stdout = stdout or sys.stdout
+    label = label or queryset.model._meta.verbose_name_plural
+    total = queryset.count()
+    totals = Counter()
+    if not total:
+        return totals
+
+    start = time.perf_counter()
+    for batch in iter_batches(queryset, batch_size):
+        totals.update(handle_batch(batch) or {})
+        totals['rows'] += len(batch)
+        elapsed = time.perf_counter() - start
+        rate = totals['rows'] / elapsed if elapsed else 0.0
+        stdout.write(
+            f"  {label}: {totals['rows']}/{total} rows ({totals['rows'] / total:.0%}), {rate:,.0f} rows/s\n"
+        )
+    return totals
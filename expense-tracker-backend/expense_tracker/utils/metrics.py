@@ -0,0 +1,337 @@
+"""
+Multiprocess Prometheus-style metrics backed by mmap'd files.
+
+Recording is off until configure(enabled=True) (done from settings at app
+ready); disabled metrics cost one global lookup per call.
+
+Each thread writes its samples to a file in METRICS_DIR that no other live
+thread writes, so updates need no locks: each file has one writer at a
+time. When a thread exits its file goes back to a per-process pool and the
+next new thread continues it, so thread churn (runserver, executors) keeps
+at most one open file per concurrently live thread. The metrics endpoint
+sums all files, which aggregates across gunicorn workers (and survives
+worker restarts, like Prometheus counters expect).
+
+File layout: an 8-byte header holding the number of used bytes, followed by
+entries of ``<uint32 key length><key, padded to 8 bytes><float64 value>``.
+A new entry is written before the header is advanced, so readers never see
+a partial entry.
+"""
+
+import glob
+import itertools
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_HEADER = struct.Struct('<Q')
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request/operation latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def default_metrics_dir() -> str:
+    """METRICS_DIR from the environment, else a directory in /dev/shm (or the temp dir)."""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.environ.get('METRICS_DIR') or os.path.join(base, 'expense-tracker-metrics')
+
+
+class _Writers(threading.local):
+    lease = None
+    pid: Optional[int] = None
+
+
+_writers = _Writers()
+_enabled = False
+_directory: Optional[str] = None
+# Sample files of this process's exited threads, and the next file number.
+# list.append/pop and next() are atomic, so the pool needs no lock.
+_free_samples: List['MmapSamples'] = []
+_slots = itertools.count()
+
+
+def configure(enabled: bool, directory: Optional[str] = None) -> None:
+    """Turn recording on or off and set the sample directory (called at app ready)."""
+    global _enabled, _directory
+    _enabled = enabled
+    _directory = directory
+    # Pooled files may be in the old directory; this thread reopens its own
+    _free_samples.clear()
+    _writers.pid = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def metrics_dir() -> str:
+    return _directory or default_metrics_dir()
+
+
+def clear_metrics_dir(path: Optional[str] = None) -> None:
+    """Remove sample files, e.g. when the server master starts."""
+    for filename in glob.glob(os.path.join(path or metrics_dir(), '*.db')):
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+
+def _padded(length: int) -> int:
+    return length + (-length % 8)
+
+
+class MmapSamples:
+    """Single-writer float64 samples keyed by string, stored in an mmap'd file."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map()
+        self._positions: Dict[str, int] = {
+            key: position for key, _, position in self._entries(self._mmap, self._used)
+        }
+
+    def _map(self) -> None:
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or _HEADER.size
+        if self._used == _HEADER.size:
+            _HEADER.pack_into(self._mmap, 0, self._used)
+
+    @staticmethod
+    def _entries(buffer, used: int) -> Iterable[Tuple[str, float, int]]:
+        """Yield (key, value, value position) for each entry."""
+        position = _HEADER.size
+        while position < used:
+            length = _KEY_LENGTH.unpack_from(buffer, position)[0]
+            key_start = position + _KEY_LENGTH.size
+            key = bytes(buffer[key_start:key_start + length]).decode()
+            value_position = key_start + _padded(length + _KEY_LENGTH.size) - _KEY_LENGTH.size
+            yield key, _VALUE.unpack_from(buffer, value_position)[0], value_position
+            position = value_position + _VALUE.size
+
+    def _add_entry(self, key: str) -> int:
+        encoded = key.encode()
+        size = _padded(_KEY_LENGTH.size + len(encoded)) + _VALUE.size
+        if self._used + size > len(self._mmap):
+            new_size = len(self._mmap)
+            while self._used + size > new_size:
+                new_size *= 2
+            self._mmap.close()
+            self._file.truncate(new_size)
+            self._map()
+        position = self._used
+        _KEY_LENGTH.pack_into(self._mmap, position, len(encoded))
+        self._mmap[position + _KEY_LENGTH.size:position + _KEY_LENGTH.size + len(encoded)] = encoded
+        value_position = position + size - _VALUE.size
+        _VALUE.pack_into(self._mmap, value_position, 0.0)
+        # Publish the entry only once it is complete
+        self._used += size
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = value_position
+        return value_position
+
+    def inc(self, key: str, amount: float) -> None:
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add_entry(key)
+        _VALUE.pack_into(self._mmap, position, _VALUE.unpack_from(self._mmap, position)[0] + amount)
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    @classmethod
+    def read(cls, filename: str) -> List[Tuple[str, float]]:
+        """Read all samples from a file another process may be writing."""
+        with open(filename, 'rb') as sample_file:
+            data = sample_file.read()
+        if len(data) < _HEADER.size:
+            return []
+        used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+
+class _Lease:
+    """A thread's claim on a sample file, returned to the pool when the thread exits."""
+
+    def __init__(self, samples: MmapSamples):
+        self.samples = samples
+        self.pid = os.getpid()
+        self.directory = metrics_dir()
+
+    def __del__(self):
+        # Runs when the owning thread's locals are cleared at thread exit (or
+        # when configure() makes it reopen); files inherited across a fork or
+        # left in an old directory are dropped instead
+        try:
+            if self.pid == os.getpid() and self.directory == metrics_dir():
+                _free_samples.append(self.samples)
+        except Exception:
+            # Module globals may already be gone at interpreter shutdown
+            pass
+
+
+def _reset_pool() -> None:
+    """Forget the parent's pooled files in a forked child."""
+    global _slots
+    _free_samples.clear()
+    _slots = itertools.count()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+
+def _samples() -> MmapSamples:
+    """This thread's sample file; reopened after fork so workers never share one."""
+    pid = os.getpid()
+    if _writers.pid != pid:
+        try:
+            samples = _free_samples.pop()
+        except IndexError:
+            directory = metrics_dir()
+            os.makedirs(directory, exist_ok=True)
+            samples = MmapSamples(os.path.join(directory, f'{pid}-{next(_slots)}.db'))
+        _writers.lease = _Lease(samples)
+        _writers.pid = pid
+    return _writers.lease.samples
+
+
+def _sample_key(name: str, labels: Dict[str, str]) -> str:
+    return json.dumps([name, sorted(labels.items())], separators=(',', ':'))
+
+
+class Metric:
+    """Base for metrics; instances register themselves for rendering."""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def _labels(self, labels: Dict) -> Dict[str, str]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return {key: str(value) for key, value in labels.items()}
+
+
+class Counter(Metric):
+    """Monotonic counter, summed across processes."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not _enabled:
+            return
+        _samples().inc(_sample_key(self.name + '_total', self._labels(labels)), amount)
+
+
+class Histogram(Metric):
+    """Latency histogram; per-bucket counts are summed across processes."""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        if not _enabled:
+            return
+        labels = self._labels(labels)
+        samples = _samples()
+        index = bisect_left(self.buckets, value)
+        bound = repr(self.buckets[index]) if index < len(self.buckets) else '+Inf'
+        # Stored per bucket; made cumulative when rendered
+        samples.inc(_sample_key(self.name + '_bucket', dict(labels, le=bound)), 1)
+        samples.inc(_sample_key(self.name + '_sum', labels), value)
+        samples.inc(_sample_key(self.name + '_count', labels), 1)
+
+
+REGISTRY: Dict[str, Metric] = {}
+
+
+def collect(path: Optional[str] = None) -> Dict[Tuple[str, Tuple], float]:
+    """Sum every process's samples, keyed by (sample name, label pairs)."""
+    totals: Dict[Tuple[str, Tuple], float] = {}
+    for filename in glob.glob(os.path.join(path or metrics_dir(), '*.db')):
+        try:
+            samples = MmapSamples.read(filename)
+        except OSError:
+            continue
+        for key, value in samples:
+            name, labels = json.loads(key)
+            sample = (name, tuple(tuple(pair) for pair in labels))
+            totals[sample] = totals.get(sample, 0.0) + value
+    return totals
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render(path: Optional[str] = None) -> str:
+    """Render all registered metrics in the Prometheus text format (0.0.4)."""
+    totals = collect(path)
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        if isinstance(metric, Histogram):
+            lines.extend(_render_histogram(metric, totals))
+            continue
+        for (name, labels), value in sorted(totals.items()):
+            if name == metric.name + '_total':
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(metric: Histogram, totals) -> List[str]:
+    bounds = [repr(bound) for bound in metric.buckets] + ['+Inf']
+    series: Dict[Tuple, Dict[str, float]] = {}
+    for (name, labels), value in totals.items():
+        if name == metric.name + '_bucket':
+            base = tuple(pair for pair in labels if pair[0] != 'le')
+            bound = dict(labels)['le']
+            series.setdefault(base, {})[bound] = value
+
+    lines = []
+    for labels in sorted(series):
+        cumulative = 0.0
+        for bound in bounds:
+            cumulative += series[labels].get(bound, 0.0)
+            lines.append(
+                f'{metric.name}_bucket{_format_labels(labels + (("le", bound),))} '
+                f'{_format_value(cumulative)}'
+            )
+        for suffix in ('_sum', '_count'):
+            value = totals.get((metric.name + suffix, labels), 0.0)
+            lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+    return lines
@@ -0,0 +1,163 @@
+"""
+Per-request timing collection.
+
+A RequestTimings collector lives in a context variable for the duration of a
+request (see auth_app.middleware.ServerTimingMiddleware), so it follows the
+request into sync_to_async threads. Outside a request every helper here is
+a no-op costing one context variable lookup.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+
+class RequestTimings:
+    """Accumulated seconds and call counts per metric for one request."""
+
+    __slots__ = ('_lock', 'metrics')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, list] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        # Service calls awaited concurrently record from several threads
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                self.metrics[name] = [seconds, 1]
+            else:
+                metric[0] += seconds
+                metric[1] += 1
+
+    def items(self) -> Tuple[Tuple[str, float, int], ...]:
+        """(name, milliseconds, count) for each metric, in recording order."""
+        with self._lock:
+            return tuple((name, seconds * 1000, count) for name, (seconds, count) in self.metrics.items())
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def start_request():
+    """Install a fresh collector for the current context; returns a reset token."""
+    return _current.set(RequestTimings())
+
+
+def end_request(token) -> Optional[RequestTimings]:
+    """Remove the collector installed by start_request and return it."""
+    timings = _current.get()
+    _current.reset(token)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record(name: str, seconds: float) -> None:
+    """Add a measurement to the current request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def timed(name: str):
+    """Time the enclosed block under ``name`` for the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper (see connection.execute_wrapper) timing queries as ``db``."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - start)
+
+
+class TimedProxy:
+    """
+    Wraps a service so each public method call is timed under ``name``.
+
+    If ``histogram`` (a utils.metrics.Histogram with service/operation labels)
+    is given, every call is also observed there, in or out of a request.
+    Reports the wrapped object's class, so isinstance checks keep working.
+    Wrapped methods are created once per proxy and cached.
+    """
+
+    def __init__(self, target: Any, name: str, histogram=None):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_histogram', histogram)
+
+    @property
+    def __class__(self):
+        return type(self._target)
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._target, attr)
+        if attr.startswith('_') or not callable(value):
+            return value
+        wrapper = self._wrap(value, attr)
+        # Cache on the proxy; __getattr__ is only consulted on misses
+        object.__setattr__(self, attr, wrapper)
+        return wrapper
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._target, attr, value)
+
+    def _wrap(self, method, operation: str):
+        name = self._name
+        histogram = self._histogram
+
+        def finish(timings, start):
+            elapsed = time.perf_counter() - start
+            if timings is not None:
+                timings.add(name, elapsed)
+            if histogram is not None:
+                histogram.observe(elapsed, service=name, operation=operation)
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(*args, **kwargs):
+                timings = _current.get()
+                if timings is None and histogram is None:
+                    return await method(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    finish(timings, start)
+
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None and histogram is None:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                finish(timings, start)
+
+        return wrapper
@@ -0,0 +1,57 @@
+"""
+Test helpers that pin database query counts.
+
+assertNumQueries pins a count for one dataset; an N+1 pattern can still
+pass it when the fixture happens to be small. QueryCountMixin runs the same
+action against growing datasets and fails if the count changes, so a
+per-row query fails the test however it was introduced.
+"""
+
+from typing import Callable, List, Sequence
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+# Rows added before each measurement; the total grows 1 -> 5 -> 25
+DEFAULT_GROWTH = (1, 4, 20)
+
+
+def count_queries(action: Callable[[], object], using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    """Run action and return the SQL of every query it executed."""
+    with CaptureQueriesContext(connections[using]) as context:
+        action()
+    return [query['sql'] for query in context.captured_queries]
+
+
+class QueryCountMixin:
+    """TestCase mixin asserting an action's query count is fixed and independent of data size."""
+
+    def assertConstantQueries(
+        self,
+        expected: int,
+        action: Callable[[], object],
+        seed: Callable[[int], object],
+        growth: Sequence[int] = DEFAULT_GROWTH,
+        using: str = DEFAULT_DB_ALIAS,
+    ) -> None:
+        """
+        Assert action runs exactly ``expected`` queries at every dataset size.
+
+        Args:
+            expected: Query count pinned for the action
+            action: Performs the request or call under test
+            seed: Adds the given number of rows (expenses, sessions, ...)
+            growth: Rows added before each measurement
+        """
+        counts = []
+        for rows in growth:
+            seed(rows)
+            queries = count_queries(action, using)
+            counts.append(len(queries))
+            if len(queries) != expected:
+                self.fail(
+                    f'{len(queries)} queries after adding {rows} rows (counts so far: {counts}), '
+                    f'expected {expected}:\n' + '\n'.join(
+                        f'{index}. {sql}' for index, sql in enumerate(queries, 1)
+                    )
+                )